@@ -12,12 +12,16 @@ class ActionType(Enum):
     MUTE_VOLUME = auto()
     UNMUTE_VOLUME = auto()
     TAKE_SCREENSHOT = auto()
+    RECORD_SCREEN = auto()
+    STOP_RECORDING = auto()
     SHUTDOWN = auto()
     RESTART = auto()
     LOCK_SCREEN = auto()
     GET_TIME = auto()
     GET_DATE = auto()
     GET_BATTERY = auto()
+    LIST_RUNNING = auto()
+    LIST_DEVICES = auto()
     HELP = auto()
     EXIT = auto()
     ENABLE_SAFE_MODE = auto()
@@ -127,6 +131,18 @@ ACTION_METADATA = {
         "description": "Takes a screenshot and saves it",
         "parameters": ["path"],
     },
+    ActionType.RECORD_SCREEN: {
+        "permission_tier": "restricted",
+        "requires_confirmation": False,
+        "description": "Records the screen or takes screenshots at an interval",
+        "parameters": ["duration", "interval"],
+    },
+    ActionType.STOP_RECORDING: {
+        "permission_tier": "safe",
+        "requires_confirmation": False,
+        "description": "Stops an active screen recording",
+        "parameters": [],
+    },
     ActionType.SHUTDOWN: {
         "permission_tier": "critical",
         "requires_confirmation": True,
@@ -163,6 +179,18 @@ ACTION_METADATA = {
         "description": "Gets battery status",
         "parameters": [],
     },
+    ActionType.LIST_RUNNING: {
+        "permission_tier": "safe",
+        "requires_confirmation": False,
+        "description": "Lists apps launched by the assistant that are still running",
+        "parameters": [],
+    },
+    ActionType.LIST_DEVICES: {
+        "permission_tier": "safe",
+        "requires_confirmation": False,
+        "description": "Lists audio input devices",
+        "parameters": [],
+    },
     ActionType.HELP: {
         "permission_tier": "safe",
         "requires_confirmation": False,
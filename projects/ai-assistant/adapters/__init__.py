@@ -1,4 +1,6 @@
+import time
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
 from actions.schema import Action, ActionResult, ActionType
 
 
@@ -36,7 +38,7 @@ class BaseAdapter(ABC):
         pass
 
     @abstractmethod
-    def take_screenshot(self, path: str) -> ActionResult:
+    def take_screenshot(self, path: str, **options) -> ActionResult:
         pass
 
     @abstractmethod
@@ -55,20 +57,72 @@ class BaseAdapter(ABC):
     def get_battery(self) -> ActionResult:
         pass
 
+    def record_screen(self, duration: Optional[float] = None, interval: Optional[float] = None) -> ActionResult:
+        return ActionResult.failure("Screen recording is not supported on this platform")
+
+    def stop_recording(self) -> ActionResult:
+        return ActionResult.failure("Screen recording is not supported on this platform")
+
+    def adjust_volume_relative(self, delta: int) -> ActionResult:
+        return ActionResult.failure("Relative volume changes are not supported on this platform")
+
+    def list_running(self) -> ActionResult:
+        return ActionResult.failure("Listing launched apps is not supported on this platform")
+
+    def list_audio_inputs(self) -> ActionResult:
+        # PortAudio is the same on every platform, so this is not overridden.
+        from listener.devices import device_manager
+        devices = device_manager.devices(refresh=True)
+        if not devices:
+            return ActionResult.failure("No audio input devices found (is PyAudio installed?)")
+        lines = [f"Audio inputs ({len(devices)}):"]
+        if device_manager.in_use():
+            opened = time.strftime("%H:%M:%S", time.localtime(device_manager.enumerated_at))
+            lines[0] = (f"Audio inputs ({len(devices)}, as listed at {opened} when the microphone opened; "
+                        f"devices plugged in since show up once it reopens):")
+        for device in devices:
+            marker = " (default)" if device.default else ""
+            lines.append(f"  {device.index}: {device.name} - {device.sample_rate} Hz, "
+                         f"{device.channels} ch{marker}")
+        return ActionResult.success(
+            "\n".join(lines),
+            data={"devices": [
+                {"index": d.index, "name": d.name, "sample_rate": d.sample_rate,
+                 "channels": d.channels, "default": d.default} for d in devices
+            ], "enumerated_at": device_manager.enumerated_at}
+        )
+
+    def get_status(self) -> Dict[str, str]:
+        return {}
+
     def dispatch(self, action: Action) -> ActionResult:
         handlers = {
             ActionType.OPEN_APP: lambda: self.open_app(action.parameters.get("app_name", "")),
             ActionType.OPEN_FILE: lambda: self.open_file(action.parameters.get("path", "")),
             ActionType.OPEN_FOLDER: lambda: self.open_folder(action.parameters.get("path", "")),
             ActionType.OPEN_URL: lambda: self.open_url(action.parameters.get("url", "")),
-            ActionType.ADJUST_VOLUME: lambda: self.adjust_volume(action.parameters.get("level", 50)),
+            ActionType.ADJUST_VOLUME: lambda: (
+                self.adjust_volume_relative(action.parameters["delta"])
+                if "delta" in action.parameters
+                else self.adjust_volume(action.parameters.get("level", 50))
+            ),
             ActionType.MUTE_VOLUME: lambda: self.mute_volume(),
             ActionType.UNMUTE_VOLUME: lambda: self.unmute_volume(),
-            ActionType.TAKE_SCREENSHOT: lambda: self.take_screenshot(action.parameters.get("path", "")),
+            ActionType.TAKE_SCREENSHOT: lambda: self.take_screenshot(
+                action.parameters.get("path", ""),
+                **{k: v for k, v in action.parameters.items() if k != "path"}
+            ),
+            ActionType.RECORD_SCREEN: lambda: self.record_screen(
+                action.parameters.get("duration"),
+                action.parameters.get("interval")
+            ),
+            ActionType.STOP_RECORDING: lambda: self.stop_recording(),
             ActionType.SHUTDOWN: lambda: self.shutdown(),
             ActionType.RESTART: lambda: self.restart(),
             ActionType.LOCK_SCREEN: lambda: self.lock_screen(),
             ActionType.GET_BATTERY: lambda: self.get_battery(),
+            ActionType.LIST_RUNNING: lambda: self.list_running(),
+            ActionType.LIST_DEVICES: lambda: self.list_audio_inputs(),
         }
         
         handler = handlers.get(action.action_type)
@@ -0,0 +1,288 @@
+import bisect
+import difflib
+import json
+import os
+import re
+import shlex
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+CACHE_VERSION = 1
+FIELD_CODE_RE = re.compile(r"%[fFuUdDnNickvm]")
+WORD_RE = re.compile(r"[\w+]+", re.UNICODE)
+
+
+@dataclass
+class AppEntry:
+    app_id: str
+    name: str
+    exec: str
+    generic_name: str = ""
+    keywords: List[str] = field(default_factory=list)
+    localized_names: List[str] = field(default_factory=list)
+    path: str = ""
+
+    @property
+    def argv(self) -> List[str]:
+        command = FIELD_CODE_RE.sub("", self.exec).replace("%%", "%")
+        try:
+            return [arg for arg in shlex.split(command) if arg]
+        except ValueError:
+            return command.split()
+
+    def to_row(self) -> list:
+        return [self.app_id, self.name, self.exec, self.generic_name, self.keywords, self.localized_names, self.path]
+
+    @classmethod
+    def from_row(cls, row: list) -> "AppEntry":
+        return cls(*row)
+
+
+def application_dirs() -> List[Path]:
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [Path(data_home) / "applications"]
+    dirs += [Path(d) / "applications" for d in data_dirs.split(":") if d]
+    dirs += [
+        Path(os.path.expanduser("~/.local/share/flatpak/exports/share/applications")),
+        Path("/var/lib/flatpak/exports/share/applications"),
+        Path("/var/lib/snapd/desktop/applications"),
+    ]
+    seen = []
+    for d in dirs:
+        if d not in seen:
+            seen.append(d)
+    return seen
+
+
+def parse_desktop_file(path: Path, app_id: str) -> Optional[AppEntry]:
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+    values: Dict[str, str] = {}
+    localized: List[str] = []
+    in_entry = False
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("["):
+            in_entry = line == "[Desktop Entry]"
+            continue
+        if not in_entry:
+            continue
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        key = key.strip()
+        value = value.strip()
+        if key.startswith("Name[") or key.startswith("GenericName["):
+            localized.append(value)
+        elif "[" not in key:
+            values[key] = value
+
+    if values.get("Type", "Application") != "Application":
+        return None
+    if values.get("NoDisplay", "").lower() == "true" or values.get("Hidden", "").lower() == "true":
+        return None
+    if not values.get("Name") or not values.get("Exec"):
+        return None
+
+    keywords = [k for k in values.get("Keywords", "").split(";") if k]
+    return AppEntry(
+        app_id=app_id,
+        name=values["Name"],
+        exec=values["Exec"],
+        generic_name=values.get("GenericName", ""),
+        keywords=keywords,
+        localized_names=sorted(set(localized) - {values["Name"]}),
+        path=str(path),
+    )
+
+
+def _normalize(text: str) -> str:
+    return " ".join(WORD_RE.findall(text.lower()))
+
+
+class AppIndex:
+    def __init__(self, cache_path: Path, dirs: Optional[List[Path]] = None, recheck_interval: float = 60.0):
+        self.cache_path = cache_path
+        self.dirs = dirs if dirs is not None else application_dirs()
+        self.recheck_interval = recheck_interval
+        self._entries: List[AppEntry] = []
+        self._terms: List[str] = []
+        self._postings: List[List[Tuple[int, int]]] = []
+        self._names: Dict[str, int] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._last_check = 0.0
+        self.build_time = 0.0
+
+    def load_async(self):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._load_and_refresh, daemon=True)
+            self._worker.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._loaded.wait(timeout)
+
+    def is_ready(self) -> bool:
+        return self._loaded.is_set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def names(self) -> List[str]:
+        return [entry.name for entry in self._entries]
+
+    def lookup(self, query: str, limit: int = 5, min_score: float = 3.0) -> List[AppEntry]:
+        if not self._loaded.is_set():
+            self.load_async()
+            return []
+        if time.monotonic() - self._last_check > self.recheck_interval:
+            self._last_check = time.monotonic()
+            self.load_async()
+
+        query = _normalize(query)
+        if not query:
+            return []
+
+        entries, terms, postings, names = self._entries, self._terms, self._postings, self._names
+        scores: Dict[int, float] = {}
+
+        exact = names.get(query)
+        if exact is not None:
+            scores[exact] = 100.0
+
+        for word in query.split():
+            start = bisect.bisect_left(terms, word)
+            end = bisect.bisect_left(terms, word + "\uffff")
+            for term_index in range(start, end):
+                bonus = 1.0 if terms[term_index] == word else 0.6
+                for entry_index, weight in postings[term_index]:
+                    scores[entry_index] = scores.get(entry_index, 0.0) + weight * bonus
+
+        if not scores:
+            for name in difflib.get_close_matches(query, list(names), n=limit, cutoff=0.75):
+                entry_index = names[name]
+                scores[entry_index] = 10.0 * difflib.SequenceMatcher(None, query, name).ratio()
+
+        ranked = sorted(
+            ((index, score) for index, score in scores.items() if score >= min_score),
+            key=lambda item: (-item[1], len(entries[item[0]].name))
+        )
+        return [entries[index] for index, _ in ranked[:limit]]
+
+    def find(self, query: str) -> Optional[AppEntry]:
+        matches = self.lookup(query, limit=1)
+        return matches[0] if matches else None
+
+    def rebuild(self):
+        start = time.perf_counter()
+        entries = self._scan()
+        self._install(entries, self._current_mtimes())
+        self.build_time = time.perf_counter() - start
+        self._save_cache()
+
+    def _load_and_refresh(self):
+        if not self._loaded.is_set():
+            self._load_cache()
+            if self._entries:
+                self._loaded.set()
+        if self._current_mtimes() != self._mtimes or not self._entries:
+            self.rebuild()
+        self._last_check = time.monotonic()
+        self._loaded.set()
+
+    def _current_mtimes(self) -> Dict[str, float]:
+        mtimes = {}
+        for base in self.dirs:
+            for root, _, _ in os.walk(base):
+                try:
+                    mtimes[root] = os.stat(root).st_mtime
+                except OSError:
+                    continue
+        return mtimes
+
+    def _scan(self) -> List[AppEntry]:
+        entries: Dict[str, AppEntry] = {}
+        for base in self.dirs:
+            for root, _, files in os.walk(base):
+                for filename in files:
+                    if not filename.endswith(".desktop"):
+                        continue
+                    path = Path(root) / filename
+                    app_id = str(path.relative_to(base)).replace(os.sep, "-")
+                    if app_id in entries:
+                        continue
+                    entry = parse_desktop_file(path, app_id)
+                    if entry:
+                        entries[app_id] = entry
+        return sorted(entries.values(), key=lambda e: e.app_id)
+
+    def _install(self, entries: List[AppEntry], mtimes: Dict[str, float]):
+        term_map: Dict[str, Dict[int, int]] = {}
+        names: Dict[str, int] = {}
+
+        def add(text: str, index: int, weight: int):
+            for word in _normalize(text).split():
+                bucket = term_map.setdefault(word, {})
+                bucket[index] = max(bucket.get(index, 0), weight)
+
+        for index, entry in enumerate(entries):
+            for name in [entry.name] + entry.localized_names:
+                names.setdefault(_normalize(name), index)
+                add(name, index, 10)
+            binary = os.path.basename(entry.argv[0]) if entry.argv else ""
+            if binary:
+                names.setdefault(_normalize(binary), index)
+            add(binary, index, 8)
+            add(entry.app_id[:-len(".desktop")], index, 6)
+            add(entry.generic_name, index, 4)
+            for keyword in entry.keywords:
+                add(keyword, index, 3)
+
+        terms = sorted(term_map)
+        postings = [sorted(term_map[t].items(), key=lambda item: -item[1]) for t in terms]
+        with self._lock:
+            self._entries = entries
+            self._terms = terms
+            self._postings = postings
+            self._names = names
+            self._mtimes = mtimes
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return
+            entries = [AppEntry.from_row(row) for row in data["entries"]]
+            self._install(entries, data.get("mtimes", {}))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_cache(self):
+        data = {
+            "version": CACHE_VERSION,
+            "mtimes": self._mtimes,
+            "entries": [entry.to_row() for entry in self._entries],
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
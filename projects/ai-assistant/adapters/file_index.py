@@ -0,0 +1,656 @@
+import bisect
+import calendar
+import ctypes
+import ctypes.util
+import difflib
+import mmap
+import os
+import re
+import select
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from utils.config import DEFAULT_EXCLUDE
+
+
+STORE_MAGIC = b"AIFIDX01"
+STORE_HEADER = struct.Struct("<8sIIIIId")
+DIR_FLAG = 0x80000000
+DIR_MASK = 0x7FFFFFFF
+
+STOPWORDS = {"the", "my", "a", "an", "called", "named", "file", "folder"}
+WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+INOTIFY_EVENT = struct.Struct("iIII")
+
+Entry = Tuple[str, int, bool]
+
+
+@dataclass
+class FileMatch:
+    path: str
+    is_dir: bool
+    score: float
+
+
+def _tokens(query: str) -> List[str]:
+    words = WORD_RE.findall(query.lower())
+    kept = [w for w in words if w not in STOPWORDS]
+    return kept or words
+
+
+class IndexStore:
+    """Compact, read-only filename table; saved stores are mmapped, not parsed."""
+    # Names are one newline-separated blob with a parallel offsets array and a
+    # same-length case-folded copy: a substring search is a literal scan and
+    # mapping a hit back to its entry is a bisect.
+
+    def __init__(self, names, folded, offsets: Sequence[int], parents: Sequence[int],
+                 dirs: List[str], words=b"", built: float = 0.0, source: Optional[mmap.mmap] = None):
+        self.names = names
+        self.folded = folded
+        self.offsets = offsets
+        self.parents = parents
+        self.dirs = dirs
+        self.words = words
+        self.built = built
+        self._source = source
+
+    @classmethod
+    def empty(cls) -> "IndexStore":
+        return cls(b"", b"", array("I", [0]), array("I"), [])
+
+    @classmethod
+    def from_entries(cls, dirs: List[str], entries: List[Entry]) -> "IndexStore":
+        offsets = array("I", [0])
+        parents = array("I")
+        chunks = []
+        lexicon: Set[str] = set()
+        position = 0
+        for name, parent, is_dir in entries:
+            encoded = name.encode("utf-8", "surrogateescape") + b"\n"
+            chunks.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+            parents.append(parent | DIR_FLAG if is_dir else parent)
+            lexicon.update(WORD_RE.findall(name.lower()))
+        names = b"".join(chunks)
+        folded = cls._fold(names)
+        words = "\n".join(sorted(w for w in lexicon if len(w) > 2 and w.isalpha()))
+        return cls(names, folded, offsets, parents, dirs, words.encode("utf-8", "surrogateescape"), built=time.time())
+
+    @staticmethod
+    def _fold(names: bytes) -> bytes:
+        folded = names.decode("utf-8", "surrogateescape").lower().encode("utf-8", "surrogateescape")
+        # Unicode lowercasing can change byte lengths; offsets must stay shared.
+        return folded if len(folded) == len(names) else names.lower()
+
+    @classmethod
+    def load(cls, path: Path) -> "IndexStore":
+        with open(path, "rb") as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, count, dir_count, names_len, dirs_len, words_len, built = STORE_HEADER.unpack_from(source, 0)
+            if magic != STORE_MAGIC:
+                raise ValueError("not a file index")
+            view = memoryview(source)
+            position = STORE_HEADER.size
+            offsets = view[position:position + (count + 1) * 4].cast("I")
+            position += (count + 1) * 4
+            parents = view[position:position + count * 4].cast("I")
+            position += count * 4
+            names = view[position:position + names_len]
+            position += names_len
+            folded = view[position:position + names_len]
+            position += names_len
+            dirs = bytes(view[position:position + dirs_len]).decode("utf-8", "surrogateescape").split("\n")
+            position += dirs_len
+            words = view[position:position + words_len]
+        except (struct.error, ValueError, TypeError):
+            source.close()
+            raise ValueError(f"Corrupt file index: {path}")
+        if len(dirs) != dir_count and dir_count:
+            source.close()
+            raise ValueError(f"Corrupt file index: {path}")
+        return cls(names, folded, offsets, parents, dirs if dir_count else [], words, built=built, source=source)
+
+    def save(self, path: Path):
+        dirs_blob = "\n".join(self.dirs).encode("utf-8", "surrogateescape")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(STORE_HEADER.pack(
+                STORE_MAGIC, len(self), len(self.dirs), len(self.names), len(dirs_blob), len(self.words), self.built
+            ))
+            f.write(array("I", self.offsets).tobytes())
+            f.write(array("I", self.parents).tobytes())
+            f.write(self.names)
+            f.write(self.folded)
+            f.write(dirs_blob)
+            f.write(self.words)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        if self._source is not None:
+            self.names = self.folded = self.offsets = self.parents = self.words = None
+            try:
+                self._source.close()
+            except BufferError:
+                pass
+            self._source = None
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def name(self, index: int) -> str:
+        return bytes(self.names[self.offsets[index]:self.offsets[index + 1] - 1]).decode("utf-8", "surrogateescape")
+
+    def is_dir(self, index: int) -> bool:
+        return bool(self.parents[index] & DIR_FLAG)
+
+    def directory(self, index: int) -> str:
+        return self.dirs[self.parents[index] & DIR_MASK]
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.directory(index), self.name(index))
+
+    def entries(self) -> Iterator[Tuple[str, str, bool]]:
+        for index in range(len(self)):
+            yield self.directory(index), self.name(index), self.is_dir(index)
+
+    def search(self, token: str, limit: int) -> List[int]:
+        pattern = re.compile(re.escape(token.encode("utf-8")))
+        folded, offsets = self.folded, self.offsets
+        hits = []
+        position = 0
+        while len(hits) < limit:
+            match = pattern.search(folded, position)
+            if match is None:
+                break
+            index = bisect.bisect_right(offsets, match.start()) - 1
+            hits.append(index)
+            position = offsets[index + 1]
+        return hits
+
+    def correct(self, token: str) -> Optional[str]:
+        """Closest lexicon word within one edit of ``token``."""
+        if len(token) < 4 or not self.words:
+            return None
+        chars = [re.escape(c.encode("utf-8")) for c in token]
+        variants = set()
+        for i in range(len(chars) + 1):
+            variants.add(b"".join(chars[:i] + [b"."] + chars[i:]))
+            if i < len(chars):
+                variants.add(b"".join(chars[:i] + [b"."] + chars[i + 1:]))
+                variants.add(b"".join(chars[:i] + chars[i + 1:]))
+            if i < len(chars) - 1:
+                variants.add(b"".join(chars[:i] + [chars[i + 1], chars[i]] + chars[i + 2:]))
+        pattern = re.compile(b"^(?:" + b"|".join(sorted(variants)) + b")$", re.MULTILINE)
+        found = [m.group().decode("utf-8", "surrogateescape") for m in pattern.finditer(self.words)]
+        if not found:
+            return None
+        return max(found, key=lambda word: difflib.SequenceMatcher(None, token, word).ratio())
+
+
+def crawl(roots: List[str], exclude: Set[str], include_hidden: bool = False,
+          max_entries: int = 2_000_000, threads: int = 8) -> Tuple[List[str], List[Entry]]:
+    dirs: List[str] = []
+    entries: List[Entry] = []
+
+    def skip(name: str) -> bool:
+        return name in exclude or (not include_hidden and name.startswith(".")) or "\n" in name
+
+    def scan(path: str) -> Tuple[List[str], List[str]]:
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if skip(entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="file-crawl") as pool:
+        pending = {}
+        for root in roots:
+            root = os.path.abspath(os.path.expanduser(root))
+            if os.path.isdir(root):
+                dirs.append(root)
+                pending[pool.submit(scan, root)] = len(dirs) - 1
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                parent = pending.pop(future)
+                files, subdirs = future.result()
+                base = dirs[parent]
+                for name in files:
+                    entries.append((name, parent, False))
+                for name in subdirs:
+                    entries.append((name, parent, True))
+                    if len(entries) < max_entries:
+                        dirs.append(os.path.join(base, name))
+                        pending[pool.submit(scan, dirs[-1])] = len(dirs) - 1
+            if len(entries) >= max_entries:
+                for future in pending:
+                    future.cancel()
+                break
+    return dirs, entries[:max_entries]
+
+
+class RecentFiles:
+    def __init__(self, path: Optional[str] = None):
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        self.path = path or os.path.join(data_home, "recently-used.xbel")
+        self._mtime = 0.0
+        self._entries: Dict[str, float] = {}
+
+    def entries(self) -> Dict[str, float]:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            self._entries = self._parse()
+            self._mtime = mtime
+        return self._entries
+
+    def _parse(self) -> Dict[str, float]:
+        entries: Dict[str, float] = {}
+        try:
+            for _, element in ET.iterparse(self.path):
+                if element.tag != "bookmark":
+                    continue
+                href = element.get("href", "")
+                if href.startswith("file://"):
+                    stamp = max(
+                        self._timestamp(element.get(key)) for key in ("added", "modified", "visited")
+                    )
+                    entries[unquote(urlparse(href).path)] = stamp
+                element.clear()
+        except (ET.ParseError, OSError):
+            pass
+        return entries
+
+    @staticmethod
+    def _timestamp(value: Optional[str]) -> float:
+        if not value:
+            return 0.0
+        try:
+            return float(calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")))
+        except ValueError:
+            return 0.0
+
+
+class InotifyWatcher:
+    def __init__(self, on_event: Callable[[str, str, int], None], max_watches: int = 65536):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.on_event = on_event
+        self.max_watches = min(max_watches, self._kernel_limit())
+        self.overflowed = False
+        self._paths: Dict[int, str] = {}
+        self._watched: Set[str] = set()
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _kernel_limit() -> int:
+        try:
+            with open("/proc/sys/fs/inotify/max_user_watches") as f:
+                return int(f.read()) // 2
+        except (OSError, ValueError):
+            return 8192
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def add(self, path: str) -> bool:
+        if path in self._watched:
+            return True
+        if len(self._paths) >= self.max_watches:
+            return False
+        wd = self._add(self.fd, path.encode("utf-8", "surrogateescape"), WATCH_MASK)
+        if wd < 0:
+            return False
+        self._paths[wd] = path
+        self._watched.add(path)
+        return True
+
+    def close(self):
+        if self.fd >= 0:
+            os.write(self._wake_w, b"\0")
+            self._thread.join()
+            os.close(self.fd)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self.fd = -1
+
+    def _loop(self):
+        poller = select.poll()
+        poller.register(self.fd, select.POLLIN)
+        poller.register(self._wake_r, select.POLLIN)
+        while True:
+            for fd, _ in poller.poll():
+                if fd == self._wake_r:
+                    return
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            position = 0
+            while position + INOTIFY_EVENT.size <= len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, position)
+                position += INOTIFY_EVENT.size
+                name = data[position:position + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+                position += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._watched.discard(self._paths.pop(wd, ""))
+                    continue
+                directory = self._paths.get(wd)
+                if directory is not None and name:
+                    self.on_event(directory, name, mask)
+
+
+class FileIndex:
+    def __init__(self, store_path: Path, roots: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, include_hidden: bool = False,
+                 max_entries: int = 2_000_000, max_watches: int = 65536,
+                 rescan_interval: float = 24 * 3600, threads: int = 8,
+                 compact_threshold: int = 20_000, recent: Optional[RecentFiles] = None,
+                 check_exists: bool = True):
+        self.store_path = store_path
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in (roots or ["~"])]
+        self.exclude = set(DEFAULT_EXCLUDE if exclude is None else exclude)
+        self.include_hidden = include_hidden
+        self.max_entries = max_entries
+        self.max_watches = max_watches
+        self.rescan_interval = rescan_interval
+        self.threads = threads
+        self.compact_threshold = compact_threshold
+        self.recent = recent or RecentFiles()
+        self.check_exists = check_exists
+        self.store = IndexStore.empty()
+        self.watcher: Optional[InotifyWatcher] = None
+        self._added: Dict[str, bool] = {}
+        self._removed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        # Replaced stores stay mapped until no lookup is still reading them.
+        self._readers = 0
+        self._retired: List[IndexStore] = []
+        self.crawl_time = 0.0
+        self.last_query_time = 0.0
+
+    def load_async(self):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._load_and_refresh, daemon=True)
+            self._worker.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._loaded.wait(timeout)
+
+    def is_ready(self) -> bool:
+        return self._loaded.is_set()
+
+    def __len__(self) -> int:
+        return len(self.store) + len(self._added)
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        if self._added or self._removed:
+            self._compact()
+
+    def rebuild(self):
+        start = time.perf_counter()
+        dirs, entries = crawl(self.roots, self.exclude, self.include_hidden, self.max_entries, self.threads)
+        store = IndexStore.from_entries(dirs, entries)
+        self.crawl_time = time.perf_counter() - start
+        with self._lock:
+            self._added.clear()
+            self._removed.clear()
+        self._install(store)
+
+    def lookup(self, query: str, kind: Optional[str] = None, limit: int = 5) -> List[FileMatch]:
+        if not self._loaded.is_set():
+            self.load_async()
+        start = time.perf_counter()
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        want_dir = None if kind is None else kind == "dir"
+        with self._lock:
+            store = self._acquire_store()
+            added = list(self._added.items())
+            removed = set(self._removed)
+        try:
+            return self._lookup(store, tokens, want_dir, added, removed, limit, start)
+        finally:
+            self._release_store()
+
+    def _acquire_store(self) -> "IndexStore":
+        # Caller holds _lock; the store stays mapped until _release_store.
+        self._readers += 1
+        return self.store
+
+    def _release_store(self):
+        with self._lock:
+            self._readers -= 1
+            retired = self._retired if not self._readers else []
+            if retired:
+                self._retired = []
+        for old in retired:
+            old.close()
+
+    def _lookup(self, store: "IndexStore", tokens: List[str], want_dir: Optional[bool],
+                added: List[Tuple[str, bool]], removed: Set[str], limit: int, start: float) -> List[FileMatch]:
+        recent = self.recent.entries()
+        now = time.time()
+
+        candidates = self._candidates(store, tokens, added, removed, recent, want_dir)
+        corrected = False
+        if not candidates:
+            fixed = [store.correct(token) or token for token in tokens]
+            if fixed != tokens:
+                tokens, corrected = fixed, True
+                candidates = self._candidates(store, tokens, added, removed, recent, want_dir)
+
+        matches = []
+        for path, (name, is_dir) in candidates.items():
+            score = self._score(tokens, name, path) - (2.0 if corrected else 0.0)
+            if score <= 0:
+                continue
+            visited = recent.get(path)
+            if visited:
+                score += 8.0 / (1.0 + max(0.0, now - visited) / (7 * 86400))
+            matches.append(FileMatch(path, is_dir, score))
+        matches.sort(key=lambda m: -m.score)
+
+        if self.check_exists:
+            matches = [m for m in matches[:limit * 4] if os.path.lexists(m.path)]
+        results = matches[:limit]
+        self.last_query_time = time.perf_counter() - start
+        return results
+
+    def find(self, query: str, kind: Optional[str] = None) -> Optional[str]:
+        matches = self.lookup(query, kind=kind, limit=1)
+        return matches[0].path if matches else None
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self),
+            "dirs": len(self.store.dirs),
+            "pending": len(self._added) + len(self._removed),
+            "watches": len(self.watcher) if self.watcher else 0,
+            "crawl_seconds": self.crawl_time,
+            "last_query_ms": self.last_query_time * 1000,
+            "ready": int(self.is_ready()),
+        }
+
+    @staticmethod
+    def _candidates(store: IndexStore, tokens: List[str], added: List[Tuple[str, bool]], removed: Set[str],
+                    recent: Dict[str, float], want_dir: Optional[bool]) -> Dict[str, Tuple[str, bool]]:
+        candidates: Dict[str, Tuple[str, bool]] = {}
+
+        def consider(directory: str, name: str, is_dir: bool):
+            if want_dir is not None and is_dir != want_dir:
+                return
+            if all(token in name.lower() for token in tokens):
+                path = os.path.join(directory, name)
+                if path not in removed:
+                    candidates[path] = (name, is_dir)
+
+        for index in store.search(max(tokens, key=len), limit=20_000):
+            consider(store.directory(index), store.name(index), store.is_dir(index))
+        for path, is_dir in added:
+            consider(os.path.dirname(path), os.path.basename(path), is_dir)
+        for path in recent:
+            consider(os.path.dirname(path), os.path.basename(path), False)
+        return candidates
+
+    @staticmethod
+    def _score(tokens: List[str], name: str, path: str) -> float:
+        stem = os.path.splitext(name)[0].lower() if not name.startswith(".") else name.lower()
+        words = WORD_RE.findall(stem)
+        score = 10.0
+        if " ".join(words) == " ".join(tokens):
+            score += 6.0
+        score += sum(1.5 for token in tokens if any(word.startswith(token) for word in words))
+        score -= 0.02 * len(name)
+        score -= 0.2 * path.count(os.sep)
+        return score
+
+    def _load_and_refresh(self):
+        fresh = False
+        try:
+            store = IndexStore.load(self.store_path)
+            if store.dirs[:len(self.roots)] == self.roots or not store.dirs:
+                self.store = store
+                fresh = time.time() - store.built < self.rescan_interval
+            else:
+                store.close()
+        except (OSError, ValueError):
+            pass
+        if len(self.store):
+            self._loaded.set()
+            self._start_watching()
+        if not fresh:
+            self.rebuild()
+        self._loaded.set()
+
+    def _install(self, store: IndexStore, replacing: Optional[IndexStore] = None):
+        with self._lock:
+            if replacing is not None and self.store is not replacing:
+                # A rebuild landed meanwhile and already covers these changes.
+                return
+            old, self.store = self.store, store
+            if old is not store:
+                self._retired.append(old)
+            retired = self._retired if not self._readers else []
+            if retired:
+                self._retired = []
+        for previous in retired:
+            previous.close()
+        try:
+            store.save(self.store_path)
+        except OSError:
+            pass
+        self._start_watching()
+
+    def _start_watching(self):
+        if self.watcher is None:
+            try:
+                self.watcher = InotifyWatcher(self._on_event, self.max_watches)
+            except (OSError, AttributeError):
+                return
+        for directory in self.store.dirs:
+            if not self.watcher.add(directory):
+                break
+
+    def _on_event(self, directory: str, name: str, mask: int):
+        if (not self.include_hidden and name.startswith(".")) or name in self.exclude:
+            return
+        path = os.path.join(directory, name)
+        is_dir = bool(mask & IN_ISDIR)
+        with self._lock:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._removed.discard(path)
+                self._added[path] = is_dir
+            else:
+                self._added.pop(path, None)
+                self._removed.add(path)
+            pending = len(self._added) + len(self._removed)
+        if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+            self.watcher.add(path)
+            subdirs, entries = crawl([path], self.exclude, self.include_hidden, 10_000, threads=1)
+            with self._lock:
+                for entry_name, parent, entry_is_dir in entries:
+                    self._added[os.path.join(subdirs[parent], entry_name)] = entry_is_dir
+            for subdir in subdirs[1:]:
+                self.watcher.add(subdir)
+        if pending >= self.compact_threshold:
+            self._compact()
+
+    def _compact(self):
+        with self._lock:
+            added = dict(self._added)
+            removed = set(self._removed)
+            self._added.clear()
+            self._removed.clear()
+            store = self._acquire_store()
+        try:
+            dirs = list(store.dirs)
+            dir_index = {d: i for i, d in enumerate(dirs)}
+            entries: List[Entry] = []
+            for directory, name, is_dir in store.entries():
+                path = os.path.join(directory, name)
+                if path not in removed and path not in added:
+                    entries.append((name, dir_index[directory], is_dir))
+        finally:
+            self._release_store()
+        for path, is_dir in added.items():
+            directory, name = os.path.split(path)
+            if directory not in dir_index:
+                dir_index[directory] = len(dirs)
+                dirs.append(directory)
+            entries.append((name, dir_index[directory], is_dir))
+        self._install(IndexStore.from_entries(dirs, entries), replacing=store)
@@ -0,0 +1,199 @@
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+FORMAT_EXTENSIONS = {
+    "png": ".png",
+    "webp": ".webp",
+    "qoi": ".qoi",
+}
+
+ZLIB_HEADER = b"\x78\x01"
+
+_tile_pool: Optional[ThreadPoolExecutor] = None
+_tile_pool_size = 0
+
+
+class EncodingError(Exception):
+    pass
+
+
+@dataclass
+class Frame:
+    width: int
+    height: int
+    stride: int
+    data: bytes
+
+    def rgb(self) -> bytes:
+        row_bytes = self.width * 4
+        if self.stride == row_bytes:
+            pixels = self.data[:row_bytes * self.height]
+        else:
+            pixels = b"".join(
+                self.data[y * self.stride:y * self.stride + row_bytes] for y in range(self.height)
+            )
+        out = bytearray(self.width * self.height * 3)
+        out[0::3] = pixels[2::4]
+        out[1::3] = pixels[1::4]
+        out[2::3] = pixels[0::4]
+        return bytes(out)
+
+    def downscale(self, factor: int) -> "Frame":
+        if factor <= 1:
+            return self
+        width = self.width // factor
+        height = self.height // factor
+        rows = []
+        for y in range(0, height * factor, factor):
+            row = memoryview(self.data)[y * self.stride:y * self.stride + self.width * 4].cast("I")
+            rows.append(row[:width * factor:factor].tobytes())
+        return Frame(width, height, width * 4, b"".join(rows))
+
+
+@dataclass(frozen=True)
+class EncodeOptions:
+    format: str = "png"
+    level: int = 6
+    scale: float = 1.0
+    threads: int = 1
+
+    @property
+    def extension(self) -> str:
+        return FORMAT_EXTENSIONS[self.format]
+
+
+PRESETS: Dict[str, EncodeOptions] = {
+    "png": EncodeOptions(),
+    "fast": EncodeOptions(level=1, threads=os.cpu_count() or 1),
+    "small": EncodeOptions(level=9, scale=0.5, threads=os.cpu_count() or 1),
+    "webp": EncodeOptions(format="webp"),
+    "qoi": EncodeOptions(format="qoi"),
+}
+
+
+def resolve_options(name: Optional[str]) -> EncodeOptions:
+    if not name:
+        return PRESETS["png"]
+    try:
+        return PRESETS[name.lower()]
+    except KeyError:
+        raise EncodingError(f"Unknown screenshot format: {name}")
+
+
+def _png_chunk(tag: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", zlib.crc32(tag + payload))
+
+
+def _png_scanlines(rgb: bytes, width: int, start: int, end: int) -> bytes:
+    row_bytes = width * 3
+    return b"".join(b"\x00" + rgb[y * row_bytes:(y + 1) * row_bytes] for y in range(start, end))
+
+
+def _deflate_tile(data: bytes, level: int, last: bool) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _parallel_deflate(frame: Frame, rgb: bytes, level: int, threads: int) -> bytes:
+    global _tile_pool, _tile_pool_size
+    if _tile_pool is None or _tile_pool_size < threads:
+        if _tile_pool is not None:
+            _tile_pool.shutdown(wait=False)
+        _tile_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="png-tile")
+        _tile_pool_size = threads
+    rows_per_tile = max(16, -(-frame.height // threads))
+    bounds = [(y, min(frame.height, y + rows_per_tile)) for y in range(0, frame.height, rows_per_tile)]
+    tiles = [_png_scanlines(rgb, frame.width, start, end) for start, end in bounds]
+    compressed = _tile_pool.map(
+        lambda item: _deflate_tile(item[1], level, item[0] == len(tiles) - 1), enumerate(tiles)
+    )
+    checksum = 1
+    for tile in tiles:
+        checksum = zlib.adler32(tile, checksum)
+    return ZLIB_HEADER + b"".join(compressed) + struct.pack(">I", checksum)
+
+
+def encode_png(frame: Frame, level: int = 6, threads: int = 1) -> bytes:
+    if threads <= 1:
+        try:
+            from PIL import Image
+            image = Image.frombuffer("RGB", (frame.width, frame.height), frame.data, "raw", "BGRX", frame.stride, 1)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", compress_level=level)
+            return buffer.getvalue()
+        except ImportError:
+            pass
+
+    rgb = frame.rgb()
+    if threads > 1 and frame.height >= 32:
+        idat = _parallel_deflate(frame, rgb, level, threads)
+    else:
+        idat = zlib.compress(_png_scanlines(rgb, frame.width, 0, frame.height), level)
+    header = struct.pack(">IIBBBBB", frame.width, frame.height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", idat)
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def encode_webp(frame: Frame) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        raise EncodingError("WebP output requires Pillow")
+    image = Image.frombuffer("RGB", (frame.width, frame.height), frame.data, "raw", "BGRX", frame.stride, 1)
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", lossless=True, method=0)
+    return buffer.getvalue()
+
+
+def encode_qoi(frame: Frame) -> bytes:
+    try:
+        import numpy
+        import qoi
+    except ImportError:
+        raise EncodingError("QOI output requires the 'qoi' and 'numpy' packages")
+    pixels = numpy.frombuffer(frame.rgb(), dtype=numpy.uint8).reshape(frame.height, frame.width, 3)
+    return qoi.encode(pixels)
+
+
+def encode(frame: Frame, options: EncodeOptions) -> bytes:
+    if options.scale < 1.0:
+        frame = frame.downscale(max(1, round(1 / options.scale)))
+    if options.format == "png":
+        return encode_png(frame, options.level, options.threads)
+    if options.format == "webp":
+        return encode_webp(frame)
+    if options.format == "qoi":
+        return encode_qoi(frame)
+    raise EncodingError(f"Unsupported format: {options.format}")
+
+
+def with_extension(path: str, options: EncodeOptions) -> str:
+    root, ext = os.path.splitext(path)
+    if ext.lower() in FORMAT_EXTENSIONS.values():
+        return root + options.extension
+    return path
+
+
+def write_atomic(path: str, payload: bytes):
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def encode_to_file(frame: Frame, path: str, options: EncodeOptions = EncodeOptions()) -> Tuple[str, int, float]:
+    start = time.perf_counter()
+    payload = encode(frame, options)
+    write_atomic(path, payload)
+    return path, len(payload), time.perf_counter() - start
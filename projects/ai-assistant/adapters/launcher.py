@@ -0,0 +1,143 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from adapters.supervisor import ProcessSupervisor
+from adapters.x11 import XDisplay, XError, display_available
+
+HELPER_COMMANDS = {"xdg-open", "gio", "gnome-open", "kde-open", "kde-open5"}
+
+
+class ExecutableResolver:
+    def __init__(self):
+        self._cache: Dict[str, Optional[str]] = {}
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, name: str) -> Optional[str]:
+        if os.sep in name:
+            return name if os.access(name, os.X_OK) else None
+        path = os.environ.get("PATH", os.defpath)
+        with self._lock:
+            if path != self._path:
+                self._cache.clear()
+                self._path = path
+            if name in self._cache:
+                self.hits += 1
+                return self._cache[name]
+        resolved = shutil.which(name, path=path)
+        with self._lock:
+            self.misses += 1
+            if path == self._path:
+                self._cache[name] = resolved
+        return resolved
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+@dataclass
+class LaunchRecord:
+    name: str
+    pid: int
+    started: float
+    spawn_time: float
+    first_window_time: Optional[float] = None
+
+
+class AppLauncher:
+    def __init__(
+        self,
+        supervisor: Optional[ProcessSupervisor] = None,
+        history: int = 50,
+        window_timeout: float = 10.0,
+        window_poll: float = 0.05
+    ):
+        self.resolver = ExecutableResolver()
+        self.supervisor = supervisor or ProcessSupervisor()
+        self.window_timeout = window_timeout
+        self.window_poll = window_poll
+        self.records: Deque[LaunchRecord] = deque(maxlen=history)
+        self._devnull: Optional[int] = None
+
+    def launch(self, argv: List[str], name: str = "", helper: Optional[bool] = None) -> LaunchRecord:
+        if not argv:
+            raise ValueError("Empty command")
+        if helper is None:
+            helper = os.path.basename(argv[0]) in HELPER_COMMANDS
+        executable = self.resolver.resolve(argv[0])
+        if executable is None:
+            raise FileNotFoundError(f"Command not found: {argv[0]}")
+        if not helper:
+            self.supervisor.reserve()
+
+        start = time.perf_counter()
+        try:
+            pid = self._spawn(executable, argv)
+        except Exception:
+            if not helper:
+                self.supervisor.release()
+            raise
+        spawn_time = time.perf_counter() - start
+
+        record = LaunchRecord(name=name or argv[0], pid=pid, started=time.time(), spawn_time=spawn_time)
+        self.supervisor.register(pid, record.name, argv, helper=helper)
+        if helper:
+            return record
+        self.records.append(record)
+        if display_available():
+            threading.Thread(target=self._wait_for_window, args=(record, start), daemon=True).start()
+        return record
+
+    def get_metrics(self) -> Dict[str, Optional[float]]:
+        records = list(self.records)
+        spawn_times = [r.spawn_time for r in records]
+        window_times = [r.first_window_time for r in records if r.first_window_time is not None]
+        return {
+            "launches": len(records),
+            "avg_spawn_ms": sum(spawn_times) / len(spawn_times) * 1000 if spawn_times else None,
+            "last_spawn_ms": spawn_times[-1] * 1000 if spawn_times else None,
+            "avg_first_window_ms": sum(window_times) / len(window_times) * 1000 if window_times else None,
+        }
+
+    def _spawn(self, executable: str, argv: List[str]) -> int:
+        if hasattr(os, "posix_spawn"):
+            if self._devnull is None:
+                self._devnull = os.open(os.devnull, os.O_RDWR)
+            file_actions = [
+                (os.POSIX_SPAWN_DUP2, self._devnull, 0),
+                (os.POSIX_SPAWN_DUP2, self._devnull, 1),
+                (os.POSIX_SPAWN_DUP2, self._devnull, 2),
+            ]
+            return os.posix_spawn(executable, argv, os.environ, file_actions=file_actions, setsid=True)
+        process = subprocess.Popen(
+            [executable] + argv[1:],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        return process.pid
+
+    def _wait_for_window(self, record: LaunchRecord, start: float):
+        try:
+            with XDisplay() as display:
+                deadline = start + self.window_timeout
+                while time.perf_counter() < deadline:
+                    # Windows can vanish between listing and reading them.
+                    with display.trap_errors():
+                        found = display.windows_for_pid(record.pid)
+                    if found:
+                        record.first_window_time = time.perf_counter() - start
+                        return
+                    time.sleep(self.window_poll)
+        except (XError, OSError):
+            pass
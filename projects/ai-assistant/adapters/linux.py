@@ -1,9 +1,24 @@
 import subprocess
 import os
+import re
+import shlex
+import threading
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional
 from actions.schema import Action, ActionResult
 from adapters import BaseAdapter
+from adapters.app_index import AppIndex
+from adapters.file_index import FileIndex
+from adapters.launcher import AppLauncher
+from adapters.image_encoding import EncodingError, resolve_options, with_extension
+from adapters.power import PowerStateReader
+from adapters.screen_capture import X11ScreenCapture
+from adapters.screen_recorder import ScreenRecorder
+from adapters.supervisor import SupervisorFullError
+from adapters.system_state import AudioStateMirror
+from adapters.x11 import XError
+from utils.config import config_manager
 
 
 class LinuxAdapter(BaseAdapter):
@@ -23,20 +38,40 @@ class LinuxAdapter(BaseAdapter):
         "vscode": "code",
     }
 
+    def __init__(self):
+        self.power = PowerStateReader()
+        self.app_index = AppIndex(config_manager.config.config_dir / "app-index.json")
+        self.app_index.load_async()
+        # Built on first use: crawling the home directory and setting up
+        # inotify watches is too much for a one-shot "mute".
+        self.file_index: Optional[FileIndex] = None
+        self._file_index_lock = threading.Lock()
+        self.launcher = AppLauncher()
+        self.audio_state = AudioStateMirror()
+        self.audio_state.start()
+        self.screen_capture: Optional[X11ScreenCapture] = None
+        self.screen_recorder: Optional[ScreenRecorder] = None
+        self.screenshot_error: Optional[str] = None
+
     def execute(self, action: Action) -> ActionResult:
         return self.dispatch(action)
 
     def open_app(self, app_name: str) -> ActionResult:
         try:
             app_lower = app_name.lower().strip()
-            command = self.APP_ALIASES.get(app_lower, app_lower)
-            subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+            command = self.APP_ALIASES.get(app_lower)
+            if command is None:
+                entry = self.app_index.find(app_lower)
+                if entry and entry.argv:
+                    self.launcher.launch(entry.argv, name=entry.name)
+                    return ActionResult.success(f"Opening {entry.name}")
+                command = app_lower
+            self.launcher.launch(shlex.split(command), name=app_name)
             return ActionResult.success(f"Opening {app_name}")
+        except FileNotFoundError:
+            return ActionResult.failure(f"Application not found: {app_name}")
+        except SupervisorFullError as e:
+            return ActionResult.failure(str(e))
         except Exception as e:
             return ActionResult.failure(f"Failed to open {app_name}: {str(e)}")
 
@@ -44,12 +79,11 @@ class LinuxAdapter(BaseAdapter):
         try:
             expanded_path = os.path.expanduser(path)
             if not os.path.exists(expanded_path):
-                return ActionResult.failure(f"File not found: {path}")
-            subprocess.Popen(
-                ["xdg-open", expanded_path],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+                expanded_path = self._find_indexed(path, "file")
+                if expanded_path is None:
+                    return ActionResult.failure(self._not_found("File", path))
+                path = expanded_path
+            self.launcher.launch(["xdg-open", expanded_path], name=path, helper=True)
             return ActionResult.success(f"Opening file: {path}")
         except Exception as e:
             return ActionResult.failure(f"Failed to open file: {str(e)}")
@@ -58,25 +92,53 @@ class LinuxAdapter(BaseAdapter):
         try:
             expanded_path = os.path.expanduser(path)
             if not os.path.isdir(expanded_path):
-                return ActionResult.failure(f"Folder not found: {path}")
-            subprocess.Popen(
-                ["xdg-open", expanded_path],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+                expanded_path = self._find_indexed(path, "dir")
+                if expanded_path is None:
+                    return ActionResult.failure(self._not_found("Folder", path))
+                path = expanded_path
+            self.launcher.launch(["xdg-open", expanded_path], name=path, helper=True)
             return ActionResult.success(f"Opening folder: {path}")
         except Exception as e:
             return ActionResult.failure(f"Failed to open folder: {str(e)}")
 
+    def _find_indexed(self, query: str, kind: str) -> Optional[str]:
+        if os.sep in query:
+            return None
+        index = self._get_file_index()
+        if index is None:
+            return None
+        index.wait_ready(2.0)
+        return index.find(query, kind=kind)
+
+    def _not_found(self, what: str, path: str) -> str:
+        if self.file_index is not None and not self.file_index.is_ready():
+            return f"{what} not found yet: {path} (the file index is still being built, try again shortly)"
+        return f"{what} not found: {path}"
+
+    def _get_file_index(self) -> Optional[FileIndex]:
+        index_config = config_manager.config.file_index
+        if not index_config.enabled:
+            return None
+        with self._file_index_lock:
+            if self.file_index is None:
+                self.file_index = FileIndex(
+                    config_manager.config.config_dir / "file-index.bin",
+                    roots=index_config.roots,
+                    exclude=index_config.exclude,
+                    include_hidden=index_config.include_hidden,
+                    max_entries=index_config.max_entries,
+                    max_watches=index_config.max_watches,
+                    rescan_interval=index_config.rescan_hours * 3600,
+                    threads=index_config.crawl_threads,
+                )
+                self.file_index.load_async()
+            return self.file_index
+
     def open_url(self, url: str) -> ActionResult:
         try:
             if not url.startswith(("http://", "https://")):
                 url = "https://" + url
-            subprocess.Popen(
-                ["xdg-open", url],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+            self.launcher.launch(["xdg-open", url], name=url, helper=True)
             return ActionResult.success(f"Opening URL: {url}")
         except Exception as e:
             return ActionResult.failure(f"Failed to open URL: {str(e)}")
@@ -84,40 +146,55 @@ class LinuxAdapter(BaseAdapter):
     def adjust_volume(self, level: int) -> ActionResult:
         try:
             level = max(0, min(100, level))
+            if self.audio_state.current_volume() == level:
+                self.audio_state.record_avoided()
+                return ActionResult.success(f"Volume set to {level}%")
+            self.audio_state.record_write()
             subprocess.run(
                 ["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{level}%"],
                 check=True,
                 capture_output=True
             )
+            self.audio_state.set_volume(level)
             return ActionResult.success(f"Volume set to {level}%")
         except subprocess.CalledProcessError:
             try:
-                subprocess.run(
-                    ["amixer", "set", "Master", f"{level}%"],
-                    check=True,
-                    capture_output=True
-                )
+                self._amixer("set", "Master", f"{level}%")
                 return ActionResult.success(f"Volume set to {level}%")
             except Exception as e:
                 return ActionResult.failure(f"Failed to adjust volume: {str(e)}")
         except Exception as e:
             return ActionResult.failure(f"Failed to adjust volume: {str(e)}")
 
+    def adjust_volume_relative(self, delta: int) -> ActionResult:
+        current = self.audio_state.current_volume()
+        if current is None:
+            if not self.audio_state.refresh():
+                try:
+                    self._amixer("get", "Master")
+                except Exception:
+                    return ActionResult.failure("Could not read the current volume")
+            if self.audio_state.volume is None:
+                return ActionResult.failure("Could not read the current volume")
+            current = self.audio_state.volume
+        return self.adjust_volume(current + delta)
+
     def mute_volume(self) -> ActionResult:
         try:
+            if self.audio_state.current_muted() is True:
+                self.audio_state.record_avoided()
+                return ActionResult.success("Volume muted")
+            self.audio_state.record_write()
             subprocess.run(
                 ["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"],
                 check=True,
                 capture_output=True
             )
+            self.audio_state.set_muted(True)
             return ActionResult.success("Volume muted")
         except subprocess.CalledProcessError:
             try:
-                subprocess.run(
-                    ["amixer", "set", "Master", "mute"],
-                    check=True,
-                    capture_output=True
-                )
+                self._amixer("set", "Master", "mute")
                 return ActionResult.success("Volume muted")
             except Exception as e:
                 return ActionResult.failure(f"Failed to mute volume: {str(e)}")
@@ -126,50 +203,153 @@ class LinuxAdapter(BaseAdapter):
 
     def unmute_volume(self) -> ActionResult:
         try:
+            if self.audio_state.current_muted() is False:
+                self.audio_state.record_avoided()
+                return ActionResult.success("Volume unmuted")
+            self.audio_state.record_write()
             subprocess.run(
                 ["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"],
                 check=True,
                 capture_output=True
             )
+            self.audio_state.set_muted(False)
             return ActionResult.success("Volume unmuted")
         except subprocess.CalledProcessError:
             try:
-                subprocess.run(
-                    ["amixer", "set", "Master", "unmute"],
-                    check=True,
-                    capture_output=True
-                )
+                self._amixer("set", "Master", "unmute")
                 return ActionResult.success("Volume unmuted")
             except Exception as e:
                 return ActionResult.failure(f"Failed to unmute volume: {str(e)}")
         except Exception as e:
             return ActionResult.failure(f"Failed to unmute volume: {str(e)}")
 
-    def take_screenshot(self, path: str) -> ActionResult:
+    def _amixer(self, *args: str) -> str:
+        if args[0] == "set":
+            self.audio_state.record_write()
+        else:
+            self.audio_state.record_call()
+        output = subprocess.run(["amixer", *args], check=True, capture_output=True, text=True).stdout
+        self.audio_state.apply_amixer(output)
+        return output
+
+    def take_screenshot(self, path: str, **options) -> ActionResult:
         try:
             if not path:
                 screenshots_dir = Path.home() / "Pictures" / "Screenshots"
                 screenshots_dir.mkdir(parents=True, exist_ok=True)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 path = str(screenshots_dir / f"screenshot_{timestamp}.png")
-            
+            path = os.path.expanduser(path)
+
+            if X11ScreenCapture.is_available():
+                try:
+                    return self._capture_in_process(path, options)
+                except XError as e:
+                    if options:
+                        return ActionResult.failure(f"Failed to take screenshot: {str(e)}")
+
+            # Every PNG preset is still a plain PNG, which the screenshot tools write too.
+            if options.get("monitor") or options.get("region") or \
+                    resolve_options(options.get("format")).extension != ".png":
+                return ActionResult.failure("Monitor, region and format options require an X11 display")
+            window_only = options.get("target") == "window"
             try:
                 subprocess.run(
-                    ["gnome-screenshot", "-f", path],
+                    ["gnome-screenshot", "-f", path] + (["-w"] if window_only else []),
                     check=True,
                     capture_output=True
                 )
             except (subprocess.CalledProcessError, FileNotFoundError):
                 subprocess.run(
-                    ["scrot", path],
+                    ["scrot"] + (["-u"] if window_only else []) + [path],
                     check=True,
                     capture_output=True
                 )
             
             return ActionResult.success(f"Screenshot saved to {path}", data={"path": path})
+        except EncodingError as e:
+            return ActionResult.failure(str(e))
         except Exception as e:
             return ActionResult.failure(f"Failed to take screenshot: {str(e)}")
 
+    def _capture_in_process(self, path: str, options: Dict[str, str]) -> ActionResult:
+        if self.screen_capture is None:
+            self.screen_capture = X11ScreenCapture()
+        region = None
+        if options.get("region"):
+            values = [int(v) for v in re.split(r"[,\s]+", options["region"].strip())]
+            if len(values) != 4:
+                return ActionResult.failure("Region must be given as x,y,width,height")
+            region = tuple(values)
+        monitor = int(options["monitor"]) - 1 if options.get("monitor") else None
+        encode_options = resolve_options(options.get("format") or config_manager.config.capture.screenshot_format)
+        path = with_extension(path, encode_options)
+
+        frame = self.screen_capture.capture(
+            region=region,
+            monitor=monitor,
+            active_window=options.get("target") == "window"
+        )
+        # Encoding and writing stay off the router thread; a failure shows in status.
+        self.screenshot_error = None
+        future = self.screen_capture.save_async(frame, path, encode_options)
+        future.add_done_callback(lambda f: self._record_screenshot_error(f, path))
+        return ActionResult.success(
+            f"Screenshot captured ({frame.width}x{frame.height}), saving to {path}",
+            data={"path": path, "width": frame.width, "height": frame.height}
+        )
+
+    def _record_screenshot_error(self, future, path: str):
+        error = future.exception()
+        if error is not None:
+            self.screenshot_error = f"{path}: {error}"
+
+    def record_screen(self, duration: Optional[float] = None, interval: Optional[float] = None) -> ActionResult:
+        try:
+            if not X11ScreenCapture.is_available():
+                return ActionResult.failure("Screen recording requires an X11 display")
+            capture_config = config_manager.config.capture
+            if interval is None:
+                interval = 1.0 / capture_config.recording_fps if duration else capture_config.default_interval_seconds
+            if duration is None:
+                duration = capture_config.default_duration_seconds
+            duration = min(float(duration), capture_config.max_duration_seconds)
+            interval = max(float(interval), 0.05)
+
+            if self.screen_capture is None:
+                self.screen_capture = X11ScreenCapture()
+            if self.screen_recorder is None:
+                self.screen_recorder = ScreenRecorder(
+                    self.screen_capture,
+                    memory_budget_mb=capture_config.recording_memory_mb
+                )
+            if self.screen_recorder.is_recording():
+                return ActionResult.failure("A recording is already in progress. Say 'stop recording' first.")
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = str(Path.home() / "Pictures" / "Screenshots" / f"recording_{timestamp}")
+            self.screen_recorder.start(
+                output_dir, interval, duration,
+                resolve_options(capture_config.recording_format)
+            )
+            return ActionResult.success(
+                f"Recording screen every {interval:g}s for {duration:g}s to {output_dir}",
+                data={"path": output_dir, "interval": interval, "duration": duration}
+            )
+        except Exception as e:
+            return ActionResult.failure(f"Failed to start recording: {str(e)}")
+
+    def stop_recording(self) -> ActionResult:
+        if self.screen_recorder is None or not self.screen_recorder.is_recording():
+            return ActionResult.failure("No recording in progress")
+        self.screen_recorder.stop()
+        metrics = self.screen_recorder.get_metrics()
+        return ActionResult.success(
+            f"Recording stopped after {metrics['captured']} frames "
+            f"({metrics['duplicates']} unchanged frames skipped)",
+            data={"path": self.screen_recorder.output_dir, **metrics}
+        )
+
     def shutdown(self) -> ActionResult:
         try:
             subprocess.run(["systemctl", "poweroff"], check=True)
@@ -202,25 +382,87 @@ class LinuxAdapter(BaseAdapter):
         except Exception as e:
             return ActionResult.failure(f"Failed to lock screen: {str(e)}")
 
+    def list_running(self) -> ActionResult:
+        children = self.launcher.supervisor.running()
+        if not children:
+            return ActionResult.success("No apps launched by the assistant are running", data={"running": []})
+        lines = [f"Running apps ({len(children)}):"]
+        for child in children:
+            started = datetime.fromtimestamp(child.started).strftime("%H:%M:%S")
+            lines.append(f"  {child.name} (pid {child.pid}, started {started})")
+        return ActionResult.success(
+            "\n".join(lines),
+            data={"running": [
+                {"pid": c.pid, "name": c.name, "argv": c.argv, "started": c.started} for c in children
+            ]}
+        )
+
+    def get_status(self) -> Dict[str, str]:
+        status = {}
+        metrics = self.launcher.get_metrics()
+        if metrics["launches"]:
+            status["App Launches"] = str(metrics["launches"])
+            status["Avg Time to Spawn"] = f"{metrics['avg_spawn_ms']:.1f} ms"
+            if metrics["avg_first_window_ms"] is not None:
+                status["Avg Time to First Window"] = f"{metrics['avg_first_window_ms']:.0f} ms"
+            status["Running Apps"] = str(self.launcher.supervisor.count())
+        if self.screen_capture is not None and self.screen_capture.last_capture_time:
+            status["Screen Capture"] = (
+                f"{self.screen_capture.backend}, last {self.screen_capture.last_capture_time * 1000:.1f} ms"
+            )
+        if self.screenshot_error:
+            status["Screenshot Error"] = self.screenshot_error
+        if self.screen_recorder is not None and self.screen_recorder.stats.captured:
+            recording = self.screen_recorder.get_metrics()
+            state = "active" if recording["recording"] else "finished"
+            status["Screen Recording"] = (
+                f"{state}, {recording['captured']} captured, {recording['duplicates']} duplicate, "
+                f"{recording['dropped']} dropped, {recording['encoded']} encoded, "
+                f"{recording['avg_capture_ms']:.1f} ms/frame capture, {recording['avg_encode_ms']:.0f} ms/frame encode, "
+                f"{recording['capture_cpu_percent']:.1f}% CPU, buffer {recording['buffer_mb']:.0f} MB"
+            )
+        if self.file_index is not None and self.file_index.is_ready():
+            index = self.file_index.get_stats()
+            status["File Index"] = (
+                f"{index['entries']:,} entries, {index['watches']:,} dirs watched, "
+                f"last query {index['last_query_ms']:.1f} ms"
+            )
+        audio = self.audio_state.get_stats()
+        if audio["calls_avoided"] or audio["calls_made"]:
+            status["Audio Calls Avoided"] = (
+                f"{audio['calls_avoided']} of {audio['calls_avoided'] + audio['calls_made']}, "
+                f"{audio['events_skipped']} of {audio['events']} change events were our own writes"
+            )
+        return status
+
     def get_battery(self) -> ActionResult:
         try:
-            result = subprocess.run(
-                ["cat", "/sys/class/power_supply/BAT0/capacity"],
-                capture_output=True,
-                text=True
+            state = self.power.read()
+            if not state.has_battery or state.percentage is None:
+                return ActionResult.failure("Could not read battery status")
+
+            details = state.status
+            if state.time_to_empty:
+                details += f", {self._format_hours(state.time_to_empty)} remaining"
+            elif state.time_to_full:
+                details += f", {self._format_hours(state.time_to_full)} until full"
+            return ActionResult.success(
+                f"Battery: {state.percentage}% ({details})",
+                data={
+                    "percentage": state.percentage,
+                    "status": state.status,
+                    "batteries": len(state.batteries),
+                    "ac_online": state.ac_online,
+                    "power_watts": state.power_watts,
+                    "time_to_empty": state.time_to_empty,
+                    "time_to_full": state.time_to_full,
+                }
             )
-            if result.returncode == 0:
-                percentage = result.stdout.strip()
-                status_result = subprocess.run(
-                    ["cat", "/sys/class/power_supply/BAT0/status"],
-                    capture_output=True,
-                    text=True
-                )
-                status = status_result.stdout.strip() if status_result.returncode == 0 else "Unknown"
-                return ActionResult.success(
-                    f"Battery: {percentage}% ({status})",
-                    data={"percentage": int(percentage), "status": status}
-                )
-            return ActionResult.failure("Could not read battery status")
         except Exception as e:
             return ActionResult.failure(f"Failed to get battery: {str(e)}")
+
+    def _format_hours(self, hours: float) -> str:
+        minutes = int(round(hours * 60))
+        if minutes < 60:
+            return f"{minutes}m"
+        return f"{minutes // 60}h {minutes % 60:02d}m"
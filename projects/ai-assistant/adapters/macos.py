@@ -121,7 +121,7 @@ class MacOSAdapter(BaseAdapter):
         except Exception as e:
             return ActionResult.failure(f"Failed to unmute volume: {str(e)}")
 
-    def take_screenshot(self, path: str) -> ActionResult:
+    def take_screenshot(self, path: str, **options) -> ActionResult:
         try:
             if not path:
                 screenshots_dir = Path.home() / "Pictures" / "Screenshots"
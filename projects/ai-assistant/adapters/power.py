@@ -0,0 +1,297 @@
+import os
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+SYSFS_POWER_SUPPLY = "/sys/class/power_supply"
+UEVENT_PREFIX = "POWER_SUPPLY_"
+NETLINK_KOBJECT_UEVENT = 15
+
+
+@dataclass
+class PowerSupply:
+    name: str
+    type: str
+    values: Dict[str, str] = field(default_factory=dict)
+
+    def get_int(self, key: str) -> Optional[int]:
+        value = self.values.get(key)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    @property
+    def is_battery(self) -> bool:
+        return self.type == "Battery" and self.values.get("SCOPE", "System") == "System"
+
+    @property
+    def online(self) -> bool:
+        return self.get_int("ONLINE") == 1
+
+    @property
+    def status(self) -> str:
+        return self.values.get("STATUS", "Unknown")
+
+    @property
+    def energy_now(self) -> Optional[float]:
+        energy = self.get_int("ENERGY_NOW")
+        if energy is not None:
+            return float(energy)
+        return self._charge_to_energy(self.get_int("CHARGE_NOW"))
+
+    @property
+    def energy_full(self) -> Optional[float]:
+        energy = self.get_int("ENERGY_FULL")
+        if energy is not None:
+            return float(energy)
+        return self._charge_to_energy(self.get_int("CHARGE_FULL"))
+
+    @property
+    def power_now(self) -> Optional[float]:
+        power = self.get_int("POWER_NOW")
+        if power is not None:
+            return float(abs(power))
+        current = self.get_int("CURRENT_NOW")
+        voltage = self.get_int("VOLTAGE_NOW")
+        if current is None or voltage is None:
+            return None
+        return abs(current) * voltage / 1_000_000
+
+    def _charge_to_energy(self, charge: Optional[int]) -> Optional[float]:
+        voltage = self.get_int("VOLTAGE_MIN_DESIGN") or self.get_int("VOLTAGE_NOW")
+        if charge is None or not voltage:
+            return None
+        return charge * voltage / 1_000_000
+
+
+@dataclass
+class PowerState:
+    batteries: List[PowerSupply]
+    ac_online: Optional[bool]
+    percentage: Optional[int]
+    status: str
+    power_watts: Optional[float]
+    time_to_empty: Optional[float]
+    time_to_full: Optional[float]
+    timestamp: float = field(default_factory=time.monotonic)
+
+    @property
+    def has_battery(self) -> bool:
+        return bool(self.batteries)
+
+
+def parse_uevent(raw: bytes) -> Dict[str, str]:
+    values = {}
+    for line in raw.decode("utf-8", errors="replace").splitlines():
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        if key.startswith(UEVENT_PREFIX):
+            key = key[len(UEVENT_PREFIX):]
+        values[key] = value.strip()
+    return values
+
+
+def aggregate(supplies: List[PowerSupply]) -> PowerState:
+    batteries = [s for s in supplies if s.is_battery]
+    mains = [s for s in supplies if s.type in ("Mains", "USB", "USB_C", "USB_PD")]
+    ac_online = any(s.online for s in mains) if mains else None
+
+    energy_now = [b.energy_now for b in batteries]
+    energy_full = [b.energy_full for b in batteries]
+    percentage = None
+    if batteries and all(e is not None for e in energy_now + energy_full) and sum(energy_full) > 0:
+        percentage = round(sum(energy_now) / sum(energy_full) * 100)
+    else:
+        capacities = [b.get_int("CAPACITY") for b in batteries]
+        capacities = [c for c in capacities if c is not None]
+        if capacities:
+            percentage = round(sum(capacities) / len(capacities))
+    if percentage is not None:
+        percentage = max(0, min(100, percentage))
+
+    statuses = [b.status for b in batteries]
+    if "Discharging" in statuses:
+        status = "Discharging"
+    elif "Charging" in statuses:
+        status = "Charging"
+    elif statuses and all(s == "Full" for s in statuses):
+        status = "Full"
+    elif statuses:
+        status = statuses[0]
+    else:
+        status = "AC" if ac_online else "Unknown"
+
+    powers = [b.power_now for b in batteries if b.power_now]
+    power_watts = sum(powers) / 1_000_000 if powers else None
+
+    time_to_empty = None
+    time_to_full = None
+    if power_watts and all(e is not None for e in energy_now + energy_full):
+        power_uw = power_watts * 1_000_000
+        if status == "Discharging":
+            time_to_empty = sum(energy_now) / power_uw
+        elif status == "Charging":
+            time_to_full = max(0.0, sum(energy_full) - sum(energy_now)) / power_uw
+
+    return PowerState(
+        batteries=batteries,
+        ac_online=ac_online,
+        percentage=percentage,
+        status=status,
+        power_watts=power_watts,
+        time_to_empty=time_to_empty,
+        time_to_full=time_to_full,
+    )
+
+
+class PowerStateReader:
+    def __init__(self, root: str = SYSFS_POWER_SUPPLY, max_age: float = 30.0, watch: bool = True):
+        self.root = root
+        self.max_age = max_age
+        self._fds: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._state: Optional[PowerState] = None
+        self._dirty = True
+        self._watch = watch
+        self._watcher: Optional[threading.Thread] = None
+        self._watch_socket: Optional[socket.socket] = None
+        self._wake_fds: Optional[tuple] = None
+        self._reads = 0
+        self._cache_hits = 0
+
+    def discover(self) -> List[str]:
+        with self._lock:
+            return self._discover()
+
+    def read(self) -> PowerState:
+        if self._watch and self._watcher is None:
+            self._start_watcher()
+        with self._lock:
+            state = self._state
+            if state is not None and not self._dirty and time.monotonic() - state.timestamp < self.max_age:
+                self._cache_hits += 1
+                return state
+            if not self._fds:
+                self._discover()
+            supplies = self._read_all()
+            if supplies is None:
+                self._discover()
+                supplies = self._read_all() or []
+            self._state = aggregate(supplies)
+            self._dirty = False
+            self._reads += 1
+            return self._state
+
+    def invalidate(self):
+        with self._lock:
+            self._dirty = True
+
+    def close(self):
+        with self._lock:
+            self._close_fds()
+            sock, self._watch_socket = self._watch_socket, None
+            watcher, self._watcher = self._watcher, None
+        if self._wake_fds is not None:
+            # Wakes the watcher out of poll so it sees the socket is gone.
+            try:
+                os.write(self._wake_fds[1], b"x")
+            except OSError:
+                pass
+        if watcher is not None and watcher.is_alive() and watcher is not threading.current_thread():
+            watcher.join(timeout=1.0)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        if self._wake_fds is not None:
+            for fd in self._wake_fds:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self._wake_fds = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "devices": len(self._fds),
+            "reads": self._reads,
+            "cache_hits": self._cache_hits,
+            "watching": int(self._watch_socket is not None),
+        }
+
+    def _discover(self) -> List[str]:
+        self._close_fds()
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            names = []
+        for name in names:
+            try:
+                self._fds[name] = os.open(os.path.join(self.root, name, "uevent"), os.O_RDONLY)
+            except OSError:
+                continue
+        self._dirty = True
+        return list(self._fds)
+
+    def _read_all(self) -> Optional[List[PowerSupply]]:
+        supplies = []
+        for name, fd in self._fds.items():
+            try:
+                raw = os.pread(fd, 4096, 0)
+            except OSError:
+                return None
+            values = parse_uevent(raw)
+            supplies.append(PowerSupply(name=name, type=values.get("TYPE", ""), values=values))
+        return supplies
+
+    def _close_fds(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds.clear()
+
+    def _start_watcher(self):
+        self._watcher = threading.Thread(target=self._watch_uevents, daemon=True)
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, 1))
+        except (AttributeError, OSError):
+            self._watch = False
+            return
+        self._watch_socket = sock
+        self._wake_fds = os.pipe()
+        self._watcher.start()
+
+    def _watch_uevents(self):
+        sock = self._watch_socket
+        wake_fd = self._wake_fds[0]
+        poller = select.poll()
+        poller.register(sock.fileno(), select.POLLIN)
+        poller.register(wake_fd, select.POLLIN)
+        while self._watch_socket is sock:
+            try:
+                events = poller.poll(None)
+                if any(fd == wake_fd for fd, _ in events):
+                    break
+                if not events:
+                    continue
+                message = sock.recv(8192)
+            except OSError:
+                break
+            if b"SUBSYSTEM=power_supply" not in message:
+                continue
+            if message.startswith((b"add@", b"remove@")):
+                with self._lock:
+                    self._close_fds()
+            self.invalidate()
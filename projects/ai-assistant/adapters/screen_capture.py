@@ -0,0 +1,217 @@
+import ctypes
+import ctypes.util
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from adapters.image_encoding import EncodeOptions, Frame, encode_to_file
+from adapters.x11 import (
+    ALL_PLANES, Z_PIXMAP, XDisplay, XError, XImage, destroy_image, display_available,
+)
+
+
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+Region = Tuple[int, int, int, int]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+def _load_shm():
+    xext_path = ctypes.util.find_library("Xext")
+    if not xext_path:
+        raise XError("libXext not found")
+    xext = ctypes.CDLL(xext_path)
+    xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    xext.XShmCreateImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+        ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+    ]
+    xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+    xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    xext.XShmGetImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+    ]
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    return xext, libc
+
+
+class ShmImage:
+    def __init__(self, display: XDisplay, xext, libc, width: int, height: int):
+        self.display = display
+        self.xext = xext
+        self.libc = libc
+        self.width = width
+        self.height = height
+        self.info = XShmSegmentInfo()
+        lib = display.lib
+        self.image = xext.XShmCreateImage(
+            display.handle,
+            lib.XDefaultVisual(display.handle, display.screen),
+            lib.XDefaultDepth(display.handle, display.screen),
+            Z_PIXMAP, None, ctypes.byref(self.info), width, height
+        )
+        if not self.image:
+            raise XError("XShmCreateImage failed")
+        size = self.image.contents.bytes_per_line * height
+        self.info.shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if self.info.shmid < 0:
+            destroy_image(self.image)
+            raise XError("shmget failed")
+        address = libc.shmat(self.info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(self.info.shmid, IPC_RMID, None)
+            destroy_image(self.image)
+            raise XError("shmat failed")
+        self.info.shmaddr = address
+        self.info.readOnly = 0
+        self.image.contents.data = address
+        # The server reports a failed attach (e.g. a remote display) as an X error.
+        with display.trap_errors() as errors:
+            attached = xext.XShmAttach(display.handle, ctypes.byref(self.info))
+        libc.shmctl(self.info.shmid, IPC_RMID, None)
+        if not attached or errors:
+            self.image.contents.data = None
+            libc.shmdt(address)
+            destroy_image(self.image)
+            raise XError("XShmAttach failed")
+
+    def grab(self, drawable: int, x: int, y: int) -> Frame:
+        if not self.xext.XShmGetImage(self.display.handle, drawable, self.image, x, y, ALL_PLANES):
+            raise XError("XShmGetImage failed")
+        image = self.image.contents
+        if image.bits_per_pixel != 32:
+            raise XError(f"Unsupported pixel format ({image.bits_per_pixel} bpp)")
+        stride = image.bytes_per_line
+        return Frame(self.width, self.height, stride, ctypes.string_at(image.data, stride * self.height))
+
+    def release(self):
+        with self.display.trap_errors():
+            self.xext.XShmDetach(self.display.handle, ctypes.byref(self.info))
+        self.image.contents.data = None
+        destroy_image(self.image)
+        self.libc.shmdt(self.info.shmaddr)
+
+
+class X11ScreenCapture:
+    def __init__(self, use_shm: bool = True, writer_threads: int = 1):
+        self._display: Optional[XDisplay] = None
+        self._use_shm = use_shm
+        self._shm_libs = None
+        self._shm_image: Optional[ShmImage] = None
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=writer_threads, thread_name_prefix="screenshot-writer")
+        self.last_capture_time = 0.0
+        self.backend = "none"
+
+    @staticmethod
+    def is_available() -> bool:
+        return display_available()
+
+    def close(self):
+        with self._lock:
+            if self._shm_image is not None:
+                self._shm_image.release()
+                self._shm_image = None
+            if self._display is not None:
+                self._display.close()
+                self._display = None
+        self._writer.shutdown(wait=True)
+
+    def capture(self, region: Optional[Region] = None, window: Optional[int] = None,
+                monitor: Optional[int] = None, active_window: bool = False) -> Frame:
+        with self._lock:
+            display = self._connect()
+            with display.trap_errors() as errors:
+                screen = display.geometry()
+                if active_window:
+                    window = display.active_window()
+                    if window is None:
+                        raise XError("No active window")
+                if window is not None:
+                    region = display.geometry(window)
+                elif monitor is not None:
+                    monitors = display.monitors()
+                    if not 0 <= monitor < len(monitors):
+                        raise XError(f"Monitor {monitor + 1} not found ({len(monitors)} available)")
+                    region = monitors[monitor]
+                region = self._clip(region or screen, screen)
+
+                start = time.perf_counter()
+                frame = self._grab(display, region)
+                self.last_capture_time = time.perf_counter() - start
+            if errors:
+                code, request = errors[0]
+                raise XError(f"X error {code} (request {request}) during capture")
+            return frame
+
+    def save_async(self, frame: Frame, path: str, options: EncodeOptions = EncodeOptions()) -> Future:
+        return self._writer.submit(encode_to_file, frame, path, options)
+
+    def _connect(self) -> XDisplay:
+        if self._display is None:
+            self._display = XDisplay()
+            if self._use_shm:
+                try:
+                    xext, libc = _load_shm()
+                    if xext.XShmQueryExtension(self._display.handle):
+                        self._shm_libs = (xext, libc)
+                except (XError, OSError, AttributeError):
+                    self._shm_libs = None
+        return self._display
+
+    def _grab(self, display: XDisplay, region: Region) -> Frame:
+        x, y, width, height = region
+        if self._shm_libs is not None:
+            try:
+                shm = self._shm_image
+                if shm is None or (shm.width, shm.height) != (width, height):
+                    if shm is not None:
+                        shm.release()
+                        self._shm_image = None
+                    self._shm_image = ShmImage(display, *self._shm_libs, width, height)
+                frame = self._shm_image.grab(display.root, x, y)
+                self.backend = "MIT-SHM"
+                return frame
+            except XError:
+                self._shm_libs = None
+
+        image = display.lib.XGetImage(display.handle, display.root, x, y, width, height, ALL_PLANES, Z_PIXMAP)
+        if not image:
+            raise XError("XGetImage failed")
+        try:
+            contents = image.contents
+            if contents.bits_per_pixel != 32:
+                raise XError(f"Unsupported pixel format ({contents.bits_per_pixel} bpp)")
+            stride = contents.bytes_per_line
+            self.backend = "XGetImage"
+            return Frame(width, height, stride, ctypes.string_at(contents.data, stride * height))
+        finally:
+            destroy_image(image)
+
+    @staticmethod
+    def _clip(region: Region, screen: Region) -> Region:
+        x, y, width, height = region
+        _, _, screen_w, screen_h = screen
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(screen_w, x + width), min(screen_h, y + height)
+        if x1 <= x0 or y1 <= y0:
+            raise XError("Capture region is outside the screen")
+        return x0, y0, x1 - x0, y1 - y0
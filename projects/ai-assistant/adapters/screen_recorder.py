@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from adapters.image_encoding import EncodeOptions, Frame, encode_to_file
+from adapters.screen_capture import X11ScreenCapture
+
+
+@dataclass
+class BufferedFrame:
+    index: int
+    timestamp: float
+    frame: Frame
+    digest: int
+
+    @property
+    def size(self) -> int:
+        return len(self.frame.data)
+
+
+class FrameRingBuffer:
+    def __init__(self, memory_budget: int):
+        self.memory_budget = memory_budget
+        self._frames: Deque[BufferedFrame] = deque()
+        self._bytes = 0
+        # Frames handed to the encoder pool still hold memory until encoded.
+        self._inflight_bytes = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self.dropped = 0
+
+    def push(self, item: BufferedFrame):
+        with self._lock:
+            self._frames.append(item)
+            self._bytes += item.size
+            while self._bytes + self._inflight_bytes > self.memory_budget and len(self._frames) > 1:
+                evicted = self._frames.popleft()
+                self._bytes -= evicted.size
+                self.dropped += 1
+            self._available.notify()
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[BufferedFrame]:
+        with self._lock:
+            if not self._frames:
+                self._available.wait(timeout)
+            if not self._frames:
+                return None
+            item = self._frames.popleft()
+            self._bytes -= item.size
+            self._inflight_bytes += item.size
+            return item
+
+    def release(self, size: int):
+        """A popped frame has been encoded (or given up on)."""
+        with self._lock:
+            self._inflight_bytes = max(0, self._inflight_bytes - size)
+
+    def wake(self):
+        with self._lock:
+            self._available.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes + self._inflight_bytes
+
+
+@dataclass
+class RecordingStats:
+    captured: int = 0
+    duplicates: int = 0
+    encoded: int = 0
+    failed: int = 0
+    bytes_written: int = 0
+    capture_seconds: float = 0.0
+    encode_seconds: float = 0.0
+    capture_cpu_seconds: float = 0.0
+    started: float = field(default_factory=time.time)
+    ended: Optional[float] = None
+
+
+class ScreenRecorder:
+    def __init__(self, capture: X11ScreenCapture, memory_budget_mb: int = 256,
+                 workers: Optional[int] = None, max_inflight: Optional[int] = None):
+        self.capture = capture
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_inflight = max_inflight or self.workers * 2
+        self.output_dir: Optional[str] = None
+        self.options = EncodeOptions()
+        self.stats = RecordingStats()
+        self.buffer: Optional[FrameRingBuffer] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+        self._capture_thread: Optional[threading.Thread] = None
+        self._encode_thread: Optional[threading.Thread] = None
+        self._inflight = threading.Semaphore(self.max_inflight)
+        self._lock = threading.Lock()
+
+    def is_recording(self) -> bool:
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    def start(self, output_dir: str, interval: float, duration: float,
+              options: Optional[EncodeOptions] = None):
+        if self.is_recording():
+            raise RuntimeError("A recording is already in progress")
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.options = options or EncodeOptions()
+        self.stats = RecordingStats()
+        self.buffer = FrameRingBuffer(self.memory_budget)
+        self._stop.clear()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, args=(interval, duration), daemon=True
+        )
+        self._encode_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._capture_thread.start()
+        self._encode_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.buffer is not None:
+            self.buffer.wake()
+
+    def close(self):
+        self.stop()
+        for thread in (self._capture_thread, self._encode_thread):
+            if thread is not None:
+                thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def get_metrics(self) -> Dict[str, float]:
+        stats = self.stats
+        elapsed = (stats.ended or time.time()) - stats.started
+        return {
+            "recording": int(self.is_recording()),
+            "captured": stats.captured,
+            "duplicates": stats.duplicates,
+            "dropped": self.buffer.dropped if self.buffer else 0,
+            "encoded": stats.encoded,
+            "failed": stats.failed,
+            "buffered": len(self.buffer) if self.buffer else 0,
+            "buffer_mb": (self.buffer.bytes_used if self.buffer else 0) / (1024 * 1024),
+            "bytes_written": stats.bytes_written,
+            "avg_capture_ms": stats.capture_seconds / max(stats.captured, 1) * 1000,
+            "avg_encode_ms": stats.encode_seconds / max(stats.encoded, 1) * 1000,
+            "capture_cpu_percent": stats.capture_cpu_seconds / max(elapsed, 1e-6) * 100,
+        }
+
+    def _capture_loop(self, interval: float, duration: float):
+        stats = self.stats
+        deadline = time.monotonic() + duration
+        next_shot = time.monotonic()
+        last_digest: Optional[int] = None
+        cpu_start = time.thread_time()
+        index = 0
+        try:
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    frame = self.capture.capture()
+                except Exception:
+                    with self._lock:
+                        stats.failed += 1
+                    break
+                digest = zlib.crc32(frame.data)
+                stats.capture_seconds += time.perf_counter() - start
+                stats.captured += 1
+                if digest == last_digest:
+                    stats.duplicates += 1
+                else:
+                    last_digest = digest
+                    index += 1
+                    self.buffer.push(BufferedFrame(index, time.time(), frame, digest))
+                stats.capture_cpu_seconds = time.thread_time() - cpu_start
+
+                next_shot += interval
+                delay = next_shot - time.monotonic()
+                if delay < 0:
+                    next_shot = time.monotonic()
+                elif self._stop.wait(delay):
+                    break
+        finally:
+            stats.capture_cpu_seconds = time.thread_time() - cpu_start
+            self._stop.set()
+            self.buffer.wake()
+
+    def _encode_loop(self):
+        pending: List[Future] = []
+        while True:
+            item = self.buffer.pop(timeout=0.5 if not self._stop.is_set() else 0)
+            if item is None:
+                if self._stop.is_set() and not len(self.buffer):
+                    break
+                continue
+            self._inflight.acquire()
+            path = os.path.join(self.output_dir, f"frame_{item.index:05d}{self.options.extension}")
+            buffer = self.buffer
+            try:
+                future = self._pool.submit(encode_to_file, item.frame, path, self.options)
+            except Exception:
+                self._inflight.release()
+                buffer.release(item.size)
+                with self._lock:
+                    self.stats.failed += 1
+                continue
+            future.add_done_callback(lambda f, size=item.size: self._on_encoded(f, buffer, size))
+            pending.append(future)
+        for future in pending:
+            try:
+                future.result()
+            except Exception:
+                pass
+        self.stats.ended = time.time()
+
+    def _on_encoded(self, future: Future, buffer: FrameRingBuffer, size: int):
+        self._inflight.release()
+        buffer.release(size)
+        with self._lock:
+            try:
+                _, size, seconds = future.result()
+            except Exception:
+                self.stats.failed += 1
+                return
+            self.stats.encoded += 1
+            self.stats.bytes_written += size
+            self.stats.encode_seconds += seconds
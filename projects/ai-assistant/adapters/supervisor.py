@@ -0,0 +1,126 @@
+import os
+import select
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+
+class SupervisorFullError(Exception):
+    pass
+
+
+@dataclass
+class ChildProcess:
+    pid: int
+    name: str
+    argv: List[str] = field(default_factory=list)
+    started: float = field(default_factory=time.time)
+    exit_code: Optional[int] = None
+    ended: Optional[float] = None
+
+    @property
+    def uptime(self) -> float:
+        return (self.ended or time.time()) - self.started
+
+
+class ProcessSupervisor:
+    def __init__(self, max_children: int = 32, history: int = 20):
+        self.max_children = max_children
+        self.children: Dict[int, ChildProcess] = {}
+        self.exited: Deque[ChildProcess] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._pidfds: Dict[int, int] = {}
+        self._use_pidfd = hasattr(os, "pidfd_open")
+        self._poller = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self._reaper: Optional[threading.Thread] = None
+        self._reserved = 0
+        self.reaped = 0
+        self.lost = 0
+
+    def reserve(self):
+        """Claim a slot before spawning; ``register`` or ``release`` gives it back."""
+        with self._lock:
+            if len(self.children) + self._reserved >= self.max_children:
+                raise SupervisorFullError(f"Too many running apps ({self.max_children})")
+            self._reserved += 1
+
+    def release(self):
+        with self._lock:
+            self._reserved = max(0, self._reserved - 1)
+
+    def register(self, pid: int, name: str, argv: Optional[List[str]] = None, helper: bool = False) -> ChildProcess:
+        # Helpers (xdg-open and the like) hand off to another process and exit;
+        # they are only reaped, never listed or counted against the cap.
+        child = ChildProcess(pid=pid, name=name, argv=list(argv or []))
+        if not helper:
+            with self._lock:
+                self._reserved = max(0, self._reserved - 1)
+                self.children[pid] = child
+        if self._use_pidfd:
+            try:
+                self._watch_pidfd(pid)
+                return child
+            except OSError:
+                self._use_pidfd = False
+        threading.Thread(target=self._wait_blocking, args=(pid,), daemon=True).start()
+        return child
+
+    def running(self) -> List[ChildProcess]:
+        with self._lock:
+            return sorted(self.children.values(), key=lambda c: c.started)
+
+    def count(self) -> int:
+        return len(self.children)
+
+    def _watch_pidfd(self, pid: int):
+        pidfd = os.pidfd_open(pid)
+        with self._lock:
+            if self._reaper is None:
+                self._wake_r, self._wake_w = os.pipe()
+                self._poller = select.poll()
+                self._poller.register(self._wake_r, select.POLLIN)
+                self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+                self._reaper.start()
+            self._pidfds[pidfd] = pid
+            self._poller.register(pidfd, select.POLLIN)
+        os.write(self._wake_w, b"\0")
+
+    def _reap_loop(self):
+        while True:
+            for fd, _ in self._poller.poll():
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 512)
+                    continue
+                with self._lock:
+                    pid = self._pidfds.pop(fd, None)
+                    self._poller.unregister(fd)
+                os.close(fd)
+                if pid is not None:
+                    self._collect(pid)
+
+    def _wait_blocking(self, pid: int):
+        self._collect(pid)
+
+    def _collect(self, pid: int):
+        reaped = True
+        try:
+            _, status = os.waitpid(pid, 0)
+            exit_code = os.waitstatus_to_exitcode(status)
+        except ChildProcessError:
+            # Already reaped elsewhere (e.g. a SIGCHLD handler).
+            exit_code = None
+            reaped = False
+        with self._lock:
+            child = self.children.pop(pid, None)
+            if reaped:
+                self.reaped += 1
+            else:
+                self.lost += 1
+        if child is not None:
+            child.exit_code = exit_code
+            child.ended = time.time()
+            self.exited.append(child)
@@ -0,0 +1,143 @@
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+
+VOLUME_RE = re.compile(r"(\d+)%")
+AMIXER_VOLUME_RE = re.compile(r"\[(\d+)%\]")
+# Sink change events this soon after one of our own writes are taken to be its echo.
+OWN_WRITE_WINDOW = 0.5
+
+
+class AudioStateMirror:
+    def __init__(self, sink: str = "@DEFAULT_SINK@"):
+        self.sink = sink
+        self.volume: Optional[int] = None
+        self.muted: Optional[bool] = None
+        self.calls_avoided = 0
+        self.calls_made = 0
+        self.events = 0
+        self.events_skipped = 0
+        self._own_write_until = 0.0
+        self._lock = threading.Lock()
+        self._subscriber: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._synced = threading.Event()
+
+    def start(self):
+        if self._thread is not None or not shutil.which("pactl"):
+            return
+        self._thread = threading.Thread(target=self._subscribe, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        subscriber = self._subscriber
+        self._subscriber = None
+        if subscriber is not None:
+            subscriber.terminate()
+            subscriber.wait()
+
+    def is_live(self) -> bool:
+        subscriber = self._subscriber
+        return self._synced.is_set() and subscriber is not None and subscriber.poll() is None
+
+    def current_volume(self) -> Optional[int]:
+        return self.volume if self.is_live() else None
+
+    def current_muted(self) -> Optional[bool]:
+        return self.muted if self.is_live() else None
+
+    def record_avoided(self):
+        with self._lock:
+            self.calls_avoided += 1
+
+    def record_call(self):
+        with self._lock:
+            self.calls_made += 1
+
+    def record_write(self):
+        """Count a call that changes the sink; the change events it causes need no re-read."""
+        with self._lock:
+            self.calls_made += 1
+            self._own_write_until = time.monotonic() + OWN_WRITE_WINDOW
+
+    def set_volume(self, level: int):
+        with self._lock:
+            self.volume = level
+
+    def set_muted(self, muted: bool):
+        with self._lock:
+            self.muted = muted
+
+    def apply_amixer(self, output: str):
+        """Take the state amixer prints after a get or set."""
+        levels = [int(v) for v in AMIXER_VOLUME_RE.findall(output)]
+        with self._lock:
+            if levels:
+                self.volume = round(sum(levels) / len(levels))
+            if "[off]" in output:
+                self.muted = True
+            elif "[on]" in output:
+                self.muted = False
+
+    def refresh(self) -> bool:
+        try:
+            self.record_call()
+            volume = subprocess.run(
+                ["pactl", "get-sink-volume", self.sink],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            self.record_call()
+            mute = subprocess.run(
+                ["pactl", "get-sink-mute", self.sink],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+        except (subprocess.CalledProcessError, OSError):
+            return False
+        levels = [int(v) for v in VOLUME_RE.findall(volume)]
+        with self._lock:
+            self.volume = round(sum(levels) / len(levels)) if levels else None
+            self.muted = "yes" in mute.lower()
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "calls_avoided": self.calls_avoided,
+            "calls_made": self.calls_made,
+            "events": self.events,
+            "events_skipped": self.events_skipped,
+            "live": int(self.is_live()),
+        }
+
+    def _subscribe(self):
+        try:
+            self._subscriber = subprocess.Popen(
+                ["pactl", "subscribe"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except OSError:
+            return
+        if not self.refresh():
+            self.stop()
+            return
+        self._synced.set()
+        subscriber = self._subscriber
+        for line in subscriber.stdout:
+            if "'change'" in line and (" sink " in line or " server " in line):
+                self.events += 1
+                if " sink " in line and time.monotonic() < self._own_write_until:
+                    # The caller already mirrored what it wrote.
+                    self.events_skipped += 1
+                    continue
+                if not self.refresh():
+                    break
+        self._synced.clear()
@@ -157,7 +157,7 @@ class WindowsAdapter(BaseAdapter):
         except Exception as e:
             return ActionResult.failure(f"Failed to unmute volume: {str(e)}")
 
-    def take_screenshot(self, path: str) -> ActionResult:
+    def take_screenshot(self, path: str, **options) -> ActionResult:
         try:
             if not path:
                 screenshots_dir = Path.home() / "Pictures" / "Screenshots"
@@ -0,0 +1,308 @@
+import ctypes
+import ctypes.util
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+
+XA_CARDINAL = 6
+XA_WINDOW = 33
+SUCCESS = 0
+Z_PIXMAP = 2
+ALL_PLANES = 0xFFFFFFFFFFFFFFFF if ctypes.sizeof(ctypes.c_ulong) == 8 else 0xFFFFFFFF
+
+_libx11 = None
+# Xlib has one error handler per process; trapping sections take turns.
+_trap_lock = threading.RLock()
+
+
+class XError(Exception):
+    pass
+
+
+class XImageFuncs(ctypes.Structure):
+    _fields_ = [
+        ("create_image", ctypes.c_void_p),
+        ("destroy_image", ctypes.c_void_p),
+        ("get_pixel", ctypes.c_void_p),
+        ("put_pixel", ctypes.c_void_p),
+        ("sub_image", ctypes.c_void_p),
+        ("add_pixel", ctypes.c_void_p),
+    ]
+
+
+class XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+        ("f", XImageFuncs),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+DESTROY_IMAGE = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(XImage))
+X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+
+def destroy_image(image: "ctypes._Pointer"):
+    if image:
+        DESTROY_IMAGE(image.contents.f.destroy_image)(image)
+
+
+def load_libx11():
+    global _libx11
+    if _libx11 is not None:
+        return _libx11
+    path = ctypes.util.find_library("X11")
+    if not path:
+        raise XError("libX11 not found")
+    lib = ctypes.CDLL(path)
+
+    lib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    lib.XOpenDisplay.restype = ctypes.c_void_p
+    lib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    lib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    lib.XDefaultRootWindow.restype = ctypes.c_ulong
+    lib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+    lib.XInternAtom.restype = ctypes.c_ulong
+    lib.XQueryTree.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong,
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.POINTER(ctypes.c_ulong)), ctypes.POINTER(ctypes.c_uint),
+    ]
+    lib.XGetWindowProperty.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long,
+        ctypes.c_int, ctypes.c_ulong,
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_void_p),
+    ]
+    lib.XFree.argtypes = [ctypes.c_void_p]
+    lib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    lib.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDefaultVisual.restype = ctypes.c_void_p
+    lib.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XGetImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+        ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_int,
+    ]
+    lib.XGetImage.restype = ctypes.POINTER(XImage)
+    lib.XGetGeometry.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint),
+    ]
+    lib.XTranslateCoordinates.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+    ]
+    lib.XSetErrorHandler.argtypes = [ctypes.c_void_p]
+    lib.XSetErrorHandler.restype = ctypes.c_void_p
+    _libx11 = lib
+    return lib
+
+
+class XRRMonitorInfo(ctypes.Structure):
+    _fields_ = [
+        ("name", ctypes.c_ulong),
+        ("primary", ctypes.c_int),
+        ("automatic", ctypes.c_int),
+        ("noutput", ctypes.c_int),
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("mwidth", ctypes.c_int),
+        ("mheight", ctypes.c_int),
+        ("outputs", ctypes.c_void_p),
+    ]
+
+
+_libxrandr = None
+
+
+def load_libxrandr():
+    global _libxrandr
+    if _libxrandr is not None:
+        return _libxrandr
+    path = ctypes.util.find_library("Xrandr")
+    if not path:
+        raise XError("libXrandr not found")
+    lib = ctypes.CDLL(path)
+    lib.XRRGetMonitors.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+    lib.XRRGetMonitors.restype = ctypes.POINTER(XRRMonitorInfo)
+    lib.XRRFreeMonitors.argtypes = [ctypes.POINTER(XRRMonitorInfo)]
+    _libxrandr = lib
+    return lib
+
+
+def display_available() -> bool:
+    if not os.environ.get("DISPLAY"):
+        return False
+    try:
+        load_libx11()
+    except (XError, OSError):
+        return False
+    return True
+
+
+class XDisplay:
+    def __init__(self, name: Optional[str] = None):
+        self.lib = load_libx11()
+        self.handle = self.lib.XOpenDisplay(name.encode() if name else None)
+        if not self.handle:
+            raise XError(f"Cannot open X display {name or os.environ.get('DISPLAY', '')}")
+        self.root = self.lib.XDefaultRootWindow(self.handle)
+        self.screen = self.lib.XDefaultScreen(self.handle)
+        self._atoms = {}
+
+    def close(self):
+        if self.handle:
+            self.lib.XCloseDisplay(self.handle)
+            self.handle = None
+
+    def __enter__(self) -> "XDisplay":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def trap_errors(self) -> Iterator[List[Tuple[int, int]]]:
+        """Collect X errors on this connection as (error_code, request_code)
+        instead of letting Xlib's default handler exit the process."""
+        with _trap_lock:
+            self.lib.XSync(self.handle, 0)
+            errors: List[Tuple[int, int]] = []
+            previous = None
+
+            def handle(display, event):
+                if display == self.handle:
+                    errors.append((event.contents.error_code, event.contents.request_code))
+                    return 0
+                # Another connection (the UI toolkit's) keeps its own handling.
+                return X_ERROR_HANDLER(previous)(display, event) if previous else 0
+
+            handler = X_ERROR_HANDLER(handle)
+            previous = self.lib.XSetErrorHandler(ctypes.cast(handler, ctypes.c_void_p))
+            try:
+                yield errors
+            finally:
+                self.lib.XSync(self.handle, 0)
+                self.lib.XSetErrorHandler(previous)
+
+    def atom(self, name: str) -> int:
+        if name not in self._atoms:
+            self._atoms[name] = self.lib.XInternAtom(self.handle, name.encode(), 0)
+        return self._atoms[name]
+
+    def children(self, window: Optional[int] = None) -> List[int]:
+        root = ctypes.c_ulong()
+        parent = ctypes.c_ulong()
+        children = ctypes.POINTER(ctypes.c_ulong)()
+        count = ctypes.c_uint()
+        if not self.lib.XQueryTree(
+            self.handle, window or self.root,
+            ctypes.byref(root), ctypes.byref(parent), ctypes.byref(children), ctypes.byref(count)
+        ):
+            return []
+        try:
+            return [children[i] for i in range(count.value)]
+        finally:
+            if children:
+                self.lib.XFree(children)
+
+    def get_cardinals(self, window: int, name: str, prop_type: int = XA_CARDINAL) -> List[int]:
+        actual_type = ctypes.c_ulong()
+        actual_format = ctypes.c_int()
+        nitems = ctypes.c_ulong()
+        remaining = ctypes.c_ulong()
+        data = ctypes.c_void_p()
+        status = self.lib.XGetWindowProperty(
+            self.handle, window, self.atom(name), 0, 1024, 0, prop_type,
+            ctypes.byref(actual_type), ctypes.byref(actual_format),
+            ctypes.byref(nitems), ctypes.byref(remaining), ctypes.byref(data)
+        )
+        if status != SUCCESS or not data.value:
+            return []
+        try:
+            if actual_format.value != 32:
+                return []
+            values = ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))
+            return [values[i] for i in range(nitems.value)]
+        finally:
+            self.lib.XFree(data)
+
+    def client_windows(self) -> List[int]:
+        windows = self.get_cardinals(self.root, "_NET_CLIENT_LIST", XA_WINDOW)
+        return windows or self.children()
+
+    def geometry(self, window: Optional[int] = None) -> Tuple[int, int, int, int]:
+        window = window or self.root
+        root = ctypes.c_ulong()
+        x, y = ctypes.c_int(), ctypes.c_int()
+        width, height = ctypes.c_uint(), ctypes.c_uint()
+        border, depth = ctypes.c_uint(), ctypes.c_uint()
+        if not self.lib.XGetGeometry(
+            self.handle, window, ctypes.byref(root), ctypes.byref(x), ctypes.byref(y),
+            ctypes.byref(width), ctypes.byref(height), ctypes.byref(border), ctypes.byref(depth)
+        ):
+            raise XError(f"Cannot read geometry of window {window:#x}")
+        if window == self.root:
+            return 0, 0, width.value, height.value
+        root_x, root_y = ctypes.c_int(), ctypes.c_int()
+        child = ctypes.c_ulong()
+        self.lib.XTranslateCoordinates(
+            self.handle, window, self.root, 0, 0,
+            ctypes.byref(root_x), ctypes.byref(root_y), ctypes.byref(child)
+        )
+        return root_x.value, root_y.value, width.value, height.value
+
+    def active_window(self) -> Optional[int]:
+        windows = self.get_cardinals(self.root, "_NET_ACTIVE_WINDOW", XA_WINDOW)
+        return windows[0] if windows and windows[0] else None
+
+    def monitors(self) -> List[Tuple[int, int, int, int]]:
+        try:
+            xrandr = load_libxrandr()
+        except (XError, OSError):
+            return [self.geometry()]
+        count = ctypes.c_int()
+        info = xrandr.XRRGetMonitors(self.handle, self.root, 1, ctypes.byref(count))
+        if not info:
+            return [self.geometry()]
+        try:
+            return [(info[i].x, info[i].y, info[i].width, info[i].height) for i in range(count.value)] or [self.geometry()]
+        finally:
+            xrandr.XRRFreeMonitors(info)
+
+    def windows_for_pid(self, pid: int) -> List[int]:
+        return [w for w in self.client_windows() if pid in self.get_cardinals(w, "_NET_WM_PID")]
@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from adapters.image_encoding import EncodeOptions, EncodingError, Frame, encode
+from adapters.screen_capture import X11ScreenCapture
+
+
+def synthetic_frame(width: int, height: int) -> Frame:
+    """Desktop-like content: flat panels, a gradient and a band of noisy "text"."""
+    rng = random.Random(0)
+    rows = []
+    for y in range(height):
+        if y < height // 10:
+            row = bytes((40, 40, 40, 0)) * width
+        elif y < height // 2:
+            shade = 255 * y // height
+            row = bytes((shade, 128, 255 - shade, 0)) * width
+        else:
+            row = rng.randbytes(width * 4)
+        rows.append(row)
+    return Frame(width, height, width * 4, b"".join(rows))
+
+
+def load_frame(args) -> Frame:
+    if not args.synthetic and X11ScreenCapture.is_available():
+        capture = X11ScreenCapture()
+        try:
+            return capture.capture()
+        finally:
+            capture.close()
+    return synthetic_frame(args.width, args.height)
+
+
+def matrix(threads: int):
+    for level in (1, 6, 9):
+        yield EncodeOptions(level=level)
+        if threads > 1:
+            yield EncodeOptions(level=level, threads=threads)
+    yield EncodeOptions(level=6, scale=0.5, threads=threads)
+    yield EncodeOptions(format="webp")
+    yield EncodeOptions(format="qoi")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Encode time and output size per screenshot format")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--synthetic", action="store_true", help="Ignore the X display and use a generated frame")
+    args = parser.parse_args()
+
+    frame = load_frame(args)
+    print(f"frame {frame.width}x{frame.height}, {len(frame.data) / (1024 * 1024):.1f} MB raw")
+    print(f"{'format':<8}{'level':>6}{'scale':>7}{'threads':>9}{'median ms':>12}{'size KB':>10}")
+    for options in matrix(args.threads):
+        timings = []
+        try:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                payload = encode(frame, options)
+                timings.append(time.perf_counter() - start)
+        except EncodingError as e:
+            print(f"{options.format:<8}  skipped: {e}")
+            continue
+        print(
+            f"{options.format:<8}{options.level:>6}{options.scale:>7.2f}{options.threads:>9}"
+            f"{statistics.median(timings) * 1000:>12.1f}{len(payload) / 1024:>10.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
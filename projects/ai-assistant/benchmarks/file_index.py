@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from adapters.file_index import DEFAULT_EXCLUDE, FileIndex, IndexStore, crawl
+
+WORDS = (
+    "alpha beta report quarterly invoice photo notes draft final budget summary "
+    "project data image backup meeting slides thesis resume receipt"
+).split()
+EXTENSIONS = [".pdf", ".txt", ".png", ".odt", ".jpg", ".md"]
+SYNTHETIC_ROOT = "/nonexistent/home"
+
+
+def synthetic_store(count: int) -> IndexStore:
+    rng = random.Random(0)
+    dirs = [SYNTHETIC_ROOT] + [f"{SYNTHETIC_ROOT}/dir{i // 50}/sub{i}" for i in range(max(1, count // 50))]
+    entries = [
+        ("_".join(rng.sample(WORDS, 2)) + f"_{i}" + rng.choice(EXTENSIONS), rng.randrange(len(dirs)), False)
+        for i in range(count)
+    ]
+    entries.append(("Tax Return 2023.pdf", 0, False))
+    return IndexStore.from_entries(dirs, entries)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Filename index build, load and query latency")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Synthetic entries to index")
+    parser.add_argument("--root", help="Crawl a real directory instead of generating names")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("queries", nargs="*", default=["tax return", "tax retrun", "quarterly report", "zzzz"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.root:
+        dirs, entries = crawl([args.root], set(DEFAULT_EXCLUDE), threads=args.threads)
+        crawled = time.perf_counter() - start
+        store = IndexStore.from_entries(dirs, entries)
+        print(f"crawl    {crawled * 1000:10.1f} ms  ({len(entries):,} entries, {len(dirs):,} dirs)")
+    else:
+        store = synthetic_store(args.count)
+    print(f"build    {(time.perf_counter() - start) * 1000:10.1f} ms  ({len(store):,} entries)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "file-index.bin"
+        store.save(path)
+        start = time.perf_counter()
+        loaded = IndexStore.load(path)
+        print(f"load     {(time.perf_counter() - start) * 1000:10.1f} ms  ({os.path.getsize(path) / 1e6:.1f} MB mmapped)")
+
+        loaded.close()
+        index = FileIndex(
+            path, roots=[args.root or SYNTHETIC_ROOT], rescan_interval=float("inf"),
+            check_exists=bool(args.root)
+        )
+        index.load_async()
+        index.wait_ready()
+        for query in args.queries:
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                matches = index.lookup(query)
+                timings.append(time.perf_counter() - start)
+            best = matches[0].path if matches else "-"
+            print(f"{query!r:<22}{statistics.median(timings) * 1000:8.1f} ms  {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
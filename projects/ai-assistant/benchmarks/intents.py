@@ -0,0 +1,49 @@
+import argparse
+import statistics
+import sys
+import time
+
+from actions.schema import ActionType
+from brain.intent_parser import IntentParser
+
+# Phrases whose parse has gone wrong before, with the intent they must map to.
+PHRASES = [
+    ("start recording", ActionType.RECORD_SCREEN),
+    ("start screen recording", ActionType.RECORD_SCREEN),
+    ("start recording for 10 seconds", ActionType.RECORD_SCREEN),
+    ("record screen for 2 minutes", ActionType.RECORD_SCREEN),
+    ("screenshots every 5 s for 1 minute", ActionType.RECORD_SCREEN),
+    ("stop recording", ActionType.STOP_RECORDING),
+    ("start firefox", ActionType.OPEN_APP),
+    ("start recorder", ActionType.OPEN_APP),
+    ("launch firefox", ActionType.OPEN_APP),
+    ("open file ~/notes.txt", ActionType.OPEN_FILE),
+    ("volume up by 20", ActionType.ADJUST_VOLUME),
+    ("mute", ActionType.MUTE_VOLUME),
+    ("unmute volume", ActionType.UNMUTE_VOLUME),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Intent parse time and correctness over known phrases")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    intent_parser = IntentParser()
+    wrong = 0
+    timings = []
+    for text, expected in PHRASES:
+        intent = intent_parser.parse(text)
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            intent_parser.parse(text)
+        timings.append((time.perf_counter() - start) / args.runs)
+        ok = intent.action_type == expected
+        wrong += not ok
+        print(f"  {text:<38}{timings[-1] * 1e6:8.1f} us  {'ok' if ok else 'WRONG'} {intent.action_type.name}")
+    print(f"median {statistics.median(timings) * 1e6:.1f} us per parse, {wrong} wrong of {len(PHRASES)}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import argparse
+import sys
+import time
+
+from listener.preprocess import create_preprocessor, np
+
+STAGES = [
+    ("dc", {"agc": False, "denoise": False}),
+    ("dc+agc", {"agc": True, "denoise": False}),
+    ("dc+denoise", {"agc": False, "denoise": True}),
+    ("all", {"agc": True, "denoise": True}),
+]
+
+
+def synthetic_audio(rate: int, seconds: float):
+    """Noise with a DC offset and short harmonic bursts standing in for speech."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    voiced = (np.sin(2 * np.pi * 0.5 * t) > 0.3).astype(np.float64)
+    tone = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    signal = 3000 * voiced * tone + rng.normal(0, 300, len(t)) + 400
+    return np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
+
+
+def run(rate: int, options, pcm: bytes, chunk_ms: int) -> float:
+    """CPU seconds spent per second of input audio."""
+    preprocessor = create_preprocessor(rate, 16000, **options)
+    chunk = rate * chunk_ms // 1000 * 2
+    cpu = time.process_time()
+    for offset in range(0, len(pcm), chunk):
+        preprocessor.process(pcm[offset:offset + chunk])
+    cpu = time.process_time() - cpu
+    return cpu / (len(pcm) / 2 / rate)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CPU cost of the capture preprocessing chain")
+    parser.add_argument("--rates", default="16000,22050,44100,48000", help="Comma-separated device rates")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Synthetic audio length per run")
+    parser.add_argument("--chunk-ms", type=int, default=20, help="Capture chunk size")
+    args = parser.parse_args()
+
+    if np is None:
+        print("numpy is not installed")
+        return 1
+    rates = [int(rate) for rate in args.rates.split(",")]
+    print(f"{'device rate':>11}  " + "  ".join(f"{name:>11}" for name, _ in STAGES) + "   (CPU ms per audio second)")
+    for rate in rates:
+        pcm = synthetic_audio(rate, args.seconds)
+        costs = [run(rate, options, pcm, args.chunk_ms) for _, options in STAGES]
+        print(f"{rate:>8} Hz  " + "  ".join(f"{cost * 1000:>11.2f}" for cost in costs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from adapters.screen_capture import X11ScreenCapture
+
+
+def bench_in_process(directory: str, runs: int) -> list:
+    capture = X11ScreenCapture()
+    timings = []
+    try:
+        for i in range(runs):
+            path = os.path.join(directory, f"inproc_{i}.png")
+            start = time.perf_counter()
+            frame = capture.capture()
+            capture.save_async(frame, path).result()
+            timings.append(time.perf_counter() - start)
+        print(f"in-process backend: {capture.backend}")
+    finally:
+        capture.close()
+    return timings
+
+
+def bench_tool(command: list, directory: str, runs: int) -> list:
+    timings = []
+    for i in range(runs):
+        path = os.path.join(directory, f"{command[0]}_{i}.png")
+        start = time.perf_counter()
+        subprocess.run(command + [path], check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list):
+    if not timings:
+        return
+    print(
+        f"{name:<20} median {statistics.median(timings) * 1000:8.1f} ms   "
+        f"min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Capture-to-saved-file latency for screenshot backends")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    if not X11ScreenCapture.is_available():
+        print("No X display available (set DISPLAY, e.g. run under Xvfb)")
+        return 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        report("x11 in-process", bench_in_process(directory, args.runs))
+        if shutil.which("gnome-screenshot"):
+            report("gnome-screenshot", bench_tool(["gnome-screenshot", "-f"], directory, args.runs))
+        if shutil.which("scrot"):
+            report("scrot", bench_tool(["scrot", "-o"], directory, args.runs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+
+from adapters.linux import LinuxAdapter
+from brain.grammar import CommandGrammar, words_to_digits
+from brain.intent_parser import IntentParser
+from listener.stt import VoskSTT
+
+
+def expected_text(path: str) -> str:
+    """Reference transcript: a sibling .txt file, else the file name with _ as spaces."""
+    reference = os.path.splitext(path)[0] + ".txt"
+    if os.path.exists(reference):
+        with open(reference, encoding="utf-8") as f:
+            return f.read().strip()
+    return os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+
+
+def same_command(parser: IntentParser, heard: str, expected: str) -> bool:
+    got = parser.parse(words_to_digits(heard))
+    want = parser.parse(words_to_digits(expected))
+    return got.action_type == want.action_type and {
+        k: v.lower() for k, v in got.entities.items()
+    } == {k: v.lower() for k, v in want.entities.items()}
+
+
+def run(stt: VoskSTT, paths, parser: IntentParser):
+    audio_seconds = decode_seconds = 0.0
+    correct = 0
+    rows = []
+    for path in paths:
+        with wave.open(path, "rb") as wav:
+            pcm = wav.readframes(wav.getnframes())
+            audio_seconds += wav.getnframes() / wav.getframerate()
+        start = time.perf_counter()
+        result = stt.transcribe(pcm)
+        decode_seconds += time.perf_counter() - start
+        ok = same_command(parser, result.text, expected_text(path))
+        correct += ok
+        rows.append((os.path.basename(path), ok, result.text or result.error))
+    return rows, decode_seconds / max(audio_seconds, 1e-9), correct
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Real-time factor and command accuracy, free vs grammar decoding")
+    parser.add_argument("directory", help="Directory of 16 kHz mono WAV commands, named after what is said "
+                                          "(volume_fifty.wav) or with a sibling .txt transcript")
+    parser.add_argument("--app", action="append", default=[], help="Extra app name for the grammar")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.wav")))
+    if not paths:
+        print(f"No .wav files in {args.directory}")
+        return 1
+    free = VoskSTT()
+    if not free.is_available():
+        print("Vosk or its model is not installed")
+        return 1
+    intent_parser = IntentParser()
+    app_names = list(LinuxAdapter.APP_ALIASES) + args.app
+    constrained = VoskSTT()
+    constrained.set_grammar(CommandGrammar(intent_parser, lambda: app_names))
+    free.transcribe(b"")
+    constrained.transcribe(b"")
+
+    for label, stt in (("free", free), (f"grammar ({constrained.grammar_size} phrases)", constrained)):
+        rows, rtf, correct = run(stt, paths, intent_parser)
+        print(f"\n{label}")
+        for name, ok, text in rows:
+            print(f"  {'ok ' if ok else 'ERR'} {name:<32}{text}")
+        print(f"  RTF {rtf:.3f}, command accuracy {correct}/{len(paths)} ({correct / len(paths) * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import wave
+from array import array
+
+from brain.grammar import CommandGrammar
+from brain.intent_parser import IntentParser
+from listener.audio_source import WavFileSource
+from listener.stt import AudioCaptureService, VoskSTT
+
+
+def _loud_frames(path: str, frame_ms: int):
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        samples = array("h", wav.readframes(wav.getnframes()))
+    frame = rate * frame_ms // 1000
+    energies = [
+        sum(s * s for s in samples[i:i + frame]) / frame
+        for i in range(0, len(samples) - frame + 1, frame)
+    ]
+    if not energies:
+        return []
+    threshold = max(1e5, max(energies) * 0.01)
+    return [i for i, energy in enumerate(energies) if energy >= threshold]
+
+
+def speech_start(path: str, frame_ms: int = 10) -> float:
+    """Seconds from the start of the file to the first loud frame."""
+    loud = _loud_frames(path, frame_ms)
+    return loud[0] * frame_ms / 1000 if loud else 0.0
+
+
+def speech_end(path: str, frame_ms: int = 10) -> float:
+    """Seconds from the start of the file to the end of the last loud frame."""
+    loud = _loud_frames(path, frame_ms)
+    return (loud[-1] + 1) * frame_ms / 1000 if loud else 0.0
+
+
+def run(stt: VoskSTT, path: str, early_commit_ms, parser: IntentParser, grammar: CommandGrammar):
+    source = WavFileSource(path, 16000, realtime=True)
+    capture = AudioCaptureService(source, preroll_ms=0)
+    stt.set_capture(capture)
+
+    def on_partial(partial) -> bool:
+        if early_commit_ms is None or partial.stable_seconds * 1000 < early_commit_ms:
+            return False
+        return not grammar.is_incomplete(partial.text) and parser.parse_partial(partial.text) is not None
+
+    capture.start()
+    capture.wait_open()
+    result = stt.listen(timeout=30.0, on_partial=on_partial)
+    finished = time.monotonic()
+    capture.stop()
+    latency = finished - (source.started + speech_end(path))
+    return result, latency
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Speech-end to action latency over recorded WAV commands")
+    parser.add_argument("directory", help="Directory of 16 kHz mono WAV files, one command each")
+    parser.add_argument("--early-commit-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.wav")))
+    if not paths:
+        print(f"No .wav files in {args.directory}")
+        return 1
+    stt = VoskSTT()
+    if not stt.is_available():
+        print("Vosk or its model is not installed")
+        return 1
+
+    intent_parser = IntentParser()
+    grammar = CommandGrammar(intent_parser)
+    medians = []
+    for label, early in (("final result", None), (f"early commit ({args.early_commit_ms} ms)", args.early_commit_ms)):
+        latencies = []
+        print(f"\n{label}")
+        for path in paths:
+            result, latency = run(stt, path, early, intent_parser, grammar)
+            latencies.append(latency)
+            marker = "early" if result.early else "final"
+            print(f"  {os.path.basename(path):<28}{latency * 1000:8.0f} ms  [{marker}] {result.text or result.error}")
+        medians.append(statistics.median(latencies))
+        print(f"  median {statistics.median(latencies) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms")
+    print(f"\nearly commit saves {(medians[0] - medians[1]) * 1000:.0f} ms at the median")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import wave
+from typing import Dict, List, Optional
+
+from adapters.linux import LinuxAdapter
+from benchmarks.stt_grammar import expected_text, same_command
+from benchmarks.stt_latency import speech_end, speech_start
+from brain.grammar import CommandGrammar, words_to_digits
+from brain.intent_parser import IntentParser
+from listener.audio_source import WavFileSource
+from listener.stt import AudioCaptureService, SpeechRecognitionSTT, VoskSTT
+from listener.vad import create_vad
+
+METRICS = ("rtf", "first_partial_ms", "final_ms", "wer", "intent_accuracy")
+
+
+def word_errors(hypothesis: str, reference: str):
+    hyp = words_to_digits(hypothesis.lower()).split()
+    ref = words_to_digits(reference.lower()).split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+    return row[-1], len(ref)
+
+
+def create_engines(names: List[str], parser: IntentParser) -> Dict[str, object]:
+    engines = {}
+    for name in names:
+        if name == "vosk":
+            engine = VoskSTT(vad=create_vad(16000))
+        elif name == "vosk-grammar":
+            engine = VoskSTT(vad=create_vad(16000))
+            engine.set_grammar(CommandGrammar(parser, lambda: list(LinuxAdapter.APP_ALIASES)))
+        elif name in ("speech_recognition", "google"):
+            # speech_recognition decodes with Sphinx; google goes over the network.
+            engine = SpeechRecognitionSTT(vad=create_vad(16000), network=name == "google")
+            if engine.is_available() and not engine.uses_capture():
+                print(f"{name}: skipped, file input needs numpy")
+                continue
+        else:
+            raise ValueError(f"Unknown engine: {name}")
+        if engine.is_available():
+            engines[name] = engine
+        else:
+            print(f"{name}: not available")
+    return engines
+
+
+def run_file(engine, path: str, parser: IntentParser, timeout: float) -> Dict[str, object]:
+    with wave.open(path, "rb") as wav:
+        duration = wav.getnframes() / wav.getframerate()
+    source = WavFileSource(path, 16000, realtime=True)
+    capture = AudioCaptureService(source, preroll_ms=0)
+    engine.set_capture(capture)
+    first_partial: List[float] = []
+
+    def on_partial(partial) -> bool:
+        if not first_partial:
+            first_partial.append(time.monotonic())
+        return False
+
+    capture.start()
+    capture.wait_open()
+    cpu = time.process_time()
+    result = engine.listen(timeout=timeout, on_partial=on_partial)
+    finished = time.monotonic()
+    cpu = time.process_time() - cpu
+    capture.stop()
+
+    reference = expected_text(path)
+    errors, words = word_errors(result.text, reference)
+    return {
+        "file": os.path.basename(path),
+        "reference": reference,
+        "text": result.text,
+        "error": result.error,
+        "audio_s": round(duration, 3),
+        "rtf": round(cpu / duration, 4),
+        "first_partial_ms": (
+            round((first_partial[0] - source.started - speech_start(path)) * 1000, 1) if first_partial else None
+        ),
+        "final_ms": round((finished - source.started - speech_end(path)) * 1000, 1),
+        "word_errors": errors,
+        "words": words,
+        "intent_ok": same_command(parser, result.text, reference),
+    }
+
+
+def summarize(files: List[Dict[str, object]]) -> Dict[str, Optional[float]]:
+    def median(key):
+        values = [f[key] for f in files if f[key] is not None]
+        return round(statistics.median(values), 4) if values else None
+
+    words = sum(f["words"] for f in files)
+    return {
+        "files": len(files),
+        "rtf": median("rtf"),
+        "first_partial_ms": median("first_partial_ms"),
+        "final_ms": median("final_ms"),
+        "wer": round(sum(f["word_errors"] for f in files) / max(words, 1), 4),
+        "intent_accuracy": round(sum(f["intent_ok"] for f in files) / max(len(files), 1), 4),
+    }
+
+
+def compare(summary: Dict[str, Dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["engines"]
+    print(f"\nchange vs {baseline_path}")
+    for engine, current in summary.items():
+        before = baseline.get(engine, {}).get("summary")
+        if not before:
+            continue
+        changes = []
+        for metric in METRICS:
+            if current.get(metric) is not None and before.get(metric) is not None:
+                changes.append(f"{metric} {before[metric]} -> {current[metric]}")
+        print(f"  {engine}: " + ", ".join(changes))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Speech-to-text benchmark over labelled WAV commands. Partial latency is measured from "
+                    "speech onset, final latency from speech end, RTF as process CPU time over audio duration"
+    )
+    parser.add_argument("directory", help="Directory of 16 kHz mono WAV files named after what is said "
+                                          "(volume_fifty.wav) or with a sibling .txt transcript")
+    parser.add_argument("--engine", action="append", choices=["vosk", "vosk-grammar", "speech_recognition", "google"],
+                        help="Engine to run (repeatable, default: all available)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Print metric changes against an earlier --json file")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.wav")))
+    if not paths:
+        print(f"No .wav files in {args.directory}")
+        return 1
+    intent_parser = IntentParser()
+    engines = create_engines(args.engine or ["vosk", "vosk-grammar", "speech_recognition"], intent_parser)
+    if not engines:
+        return 1
+
+    report = {"created": time.time(), "host": platform.node(), "directory": args.directory, "engines": {}}
+    for name, engine in engines.items():
+        print(f"\n{name}")
+        files = []
+        for path in paths:
+            row = run_file(engine, path, intent_parser, args.timeout)
+            files.append(row)
+            partial = f"{row['first_partial_ms']:6.0f}" if row["first_partial_ms"] is not None else "     -"
+            print(f"  {row['file']:<28} partial {partial} ms  final {row['final_ms']:6.0f} ms  "
+                  f"rtf {row['rtf']:.3f}  {'ok ' if row['intent_ok'] else 'ERR'} {row['text'] or row['error']}")
+        summary = summarize(files)
+        report["engines"][name] = {"summary": summary, "files": files}
+        print(f"  median rtf {summary['rtf']}, first partial {summary['first_partial_ms']} ms, "
+              f"final {summary['final_ms']} ms, WER {summary['wer'] * 100:.1f}%, "
+              f"intent accuracy {summary['intent_accuracy'] * 100:.0f}%")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare({name: data["summary"] for name, data in report["engines"].items()}, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from speaker.cache import PhraseCache, phrase_key
+from speaker.tts import Pyttsx3TTS, SystemTTS
+
+PHRASES = [
+    "Volume set to 50 percent.",
+    "This action requires confirmation. Say yes to confirm or no to cancel.",
+    "No response detected. Cancelling action.",
+    "Opening Firefox.",
+    "Screenshot saved.",
+    "I didn't understand. Cancelling action.",
+]
+FIRST_CHUNK_FRAMES = 1024
+
+
+def first_audio_cached(cache: PhraseCache, key: str) -> float:
+    """Lookup to the first block of samples read from the cached file."""
+    start = time.perf_counter()
+    path = cache.get(key)
+    with wave.open(str(path), "rb") as wav:
+        wav.readframes(FIRST_CHUNK_FRAMES)
+    return time.perf_counter() - start
+
+
+def first_audio_uncached(engine, cache: PhraseCache, key: str, text: str) -> float:
+    """Render to the first block of samples. Neither engine streams to a
+    file, so the whole phrase is synthesized before anything can play."""
+    start = time.perf_counter()
+    path = cache.add(key, lambda target: engine.render(text, target))
+    if path is None:
+        raise RuntimeError("render failed")
+    with wave.open(str(path), "rb") as wav:
+        wav.readframes(FIRST_CHUNK_FRAMES)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time to first audio for cached vs uncached phrases")
+    parser.add_argument("--engine", choices=["pyttsx3", "system"], default="system")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per phrase")
+    args = parser.parse_args()
+
+    engine = Pyttsx3TTS() if args.engine == "pyttsx3" else SystemTTS()
+    if not engine.is_available() or engine.cache_key() is None:
+        print(f"{args.engine} TTS is not available")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PhraseCache(Path(tmp), 256 * 1024 * 1024)
+        print(f"{'phrase':<48}  {'uncached ms':>11}  {'cached ms':>9}")
+        uncached_all, cached_all = [], []
+        for text in PHRASES:
+            key = phrase_key(engine.cache_key(), text)
+            uncached, cached = [], []
+            try:
+                for _ in range(args.runs):
+                    cache.clear()
+                    uncached.append(first_audio_uncached(engine, cache, key, text))
+                    cached.append(first_audio_cached(cache, key))
+            except RuntimeError as e:
+                print(f"{text[:48]:<48}  {e}")
+                continue
+            uncached_all.extend(uncached)
+            cached_all.extend(cached)
+            print(f"{text[:48]:<48}  {statistics.median(uncached) * 1000:>11.1f}  "
+                  f"{statistics.median(cached) * 1000:>9.2f}")
+        if cached_all:
+            print(f"{'median':<48}  {statistics.median(uncached_all) * 1000:>11.1f}  "
+                  f"{statistics.median(cached_all) * 1000:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
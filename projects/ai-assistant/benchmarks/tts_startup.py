@@ -0,0 +1,66 @@
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from speaker.espeak import EspeakLibrary
+
+PHRASES = [
+    "Volume set to 50 percent.",
+    "Opening Firefox.",
+    "Screenshot saved.",
+    "No response detected. Cancelling action.",
+]
+
+
+def per_process(binary: str, rate: int, text: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([binary, "--stdout", "-s", str(rate), text],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def in_process(espeak: EspeakLibrary, text: str) -> float:
+    start = time.perf_counter()
+    if not espeak.speak(text):
+        raise RuntimeError("libespeak synthesis failed")
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-utterance espeak latency, new process vs libespeak in process")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per phrase")
+    parser.add_argument("--rate", type=int, default=175)
+    args = parser.parse_args()
+
+    binary = shutil.which("espeak") or shutil.which("espeak-ng")
+    if binary is None:
+        print("espeak / espeak-ng is not installed")
+        return 1
+
+    # Both sides synthesize the whole utterance and discard the samples
+    # without playing them, so the difference is what starting espeak and
+    # loading the voice costs per utterance.
+    espeak = EspeakLibrary(args.rate, playback=False)
+    if not espeak.start():
+        print("libespeak-ng / libespeak is not installed")
+        return 1
+    in_process(espeak, "warm up")
+    print(f"{'phrase':<42}  {'new process ms':>14}  {'in process ms':>13}  {'saved ms':>8}")
+    spawned_all, synthesized_all = [], []
+    for text in PHRASES:
+        spawned = [per_process(binary, args.rate, text) for _ in range(args.runs)]
+        synthesized = [in_process(espeak, text) for _ in range(args.runs)]
+        spawned_all.extend(spawned)
+        synthesized_all.extend(synthesized)
+        a, b = statistics.median(spawned) * 1000, statistics.median(synthesized) * 1000
+        print(f"{text[:42]:<42}  {a:>14.1f}  {b:>13.1f}  {a - b:>8.1f}")
+    a, b = statistics.median(spawned_all) * 1000, statistics.median(synthesized_all) * 1000
+    print(f"{'median':<42}  {a:>14.1f}  {b:>13.1f}  {a - b:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
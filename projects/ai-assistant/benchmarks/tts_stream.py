@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from brain.router import CommandRouter
+from speaker.tts import Pyttsx3TTS, SystemTTS, split_for_speech
+
+
+def help_text() -> str:
+    # _show_help needs no router state; skip building the platform adapter.
+    return CommandRouter._show_help(CommandRouter.__new__(CommandRouter)).message
+
+
+def render_seconds(engine, text: str, directory: str) -> float:
+    path = os.path.join(directory, "chunk.wav")
+    start = time.perf_counter()
+    if not engine.render(text, path):
+        raise RuntimeError("render failed")
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Time to first audio for the help text, whole-text vs sentence-chunked synthesis")
+    parser.add_argument("--engine", choices=["pyttsx3", "system"], default="system")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = Pyttsx3TTS() if args.engine == "pyttsx3" else SystemTTS()
+    if not engine.is_available() or engine.cache_key() is None:
+        print(f"{args.engine} TTS is not available")
+        return 1
+
+    text = help_text()
+    chunks = split_for_speech(text)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: nothing plays until the whole response is synthesized.
+        whole = statistics.median(render_seconds(engine, text, tmp) for _ in range(args.runs))
+        # After: playback starts once the first chunk is; the rest render
+        # while earlier chunks play.
+        first = statistics.median(render_seconds(engine, chunks[0], tmp) for _ in range(args.runs))
+        per_chunk = [render_seconds(engine, chunk, tmp) for chunk in chunks]
+
+    print(f"help text: {len(text)} chars, {len(chunks)} chunks")
+    print(f"time to first audio, whole text:  {whole * 1000:8.1f} ms")
+    print(f"time to first audio, chunked:     {first * 1000:8.1f} ms")
+    print(f"slowest chunk render:             {max(per_chunk) * 1000:8.1f} ms")
+    print(f"total chunk render time:          {sum(per_chunk) * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+
+from benchmarks.stt_latency import speech_end
+from listener.vad import create_vad
+
+
+def run(path: str, frame_ms: int, hangover_ms: int, margin_db: float, chunk_ms: int):
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+    vad = create_vad(rate, frame_ms=frame_ms, hangover_ms=hangover_ms, margin_db=margin_db)
+    chunk = rate * chunk_ms // 1000 * 2
+    segments = []
+    start = None
+    cpu = time.process_time()
+    for offset in range(0, len(pcm), chunk):
+        state = vad.feed(pcm[offset:offset + chunk])
+        at = (offset + chunk) / 2 / rate
+        if state.started:
+            start = at
+        if state.ended:
+            segments.append((start, at))
+            start = None
+    cpu = time.process_time() - cpu
+    if start is not None:
+        segments.append((start, None))
+    duration = len(pcm) / 2 / rate
+    return segments, duration, cpu
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Voice activity detection over recorded WAV files")
+    parser.add_argument("directory", help="Directory of 16-bit mono WAV files")
+    parser.add_argument("--frame-ms", type=int, default=20)
+    parser.add_argument("--hangover-ms", type=int, default=300)
+    parser.add_argument("--margin-db", type=float, default=9.0)
+    parser.add_argument("--chunk-ms", type=int, default=40, help="Capture chunk size fed to the detector")
+    args = parser.parse_args()
+
+    if create_vad(16000) is None:
+        print("numpy is not installed")
+        return 1
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.wav")))
+    if not paths:
+        print(f"No .wav files in {args.directory}")
+        return 1
+
+    total_audio = total_cpu = 0.0
+    for path in paths:
+        segments, duration, cpu = run(path, args.frame_ms, args.hangover_ms, args.margin_db, args.chunk_ms)
+        total_audio += duration
+        total_cpu += cpu
+        spans = ", ".join(f"{s:.2f}-{e:.2f}" if e is not None else f"{s:.2f}-open" for s, e in segments)
+        ended = [e for _, e in segments if e is not None]
+        delay = f"{(ended[-1] - speech_end(path)) * 1000:6.0f} ms" if ended else "   never"
+        print(f"{os.path.basename(path):<28} end delay {delay}  cpu {cpu / duration * 100:6.3f}%  [{spans or 'no speech'}]")
+    print(f"\n{total_audio:.1f} s of audio, {total_cpu * 1000:.1f} ms CPU ({total_cpu / max(total_audio, 1e-9) * 100:.3f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
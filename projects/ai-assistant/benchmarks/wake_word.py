@@ -0,0 +1,76 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+
+from interfaces.voice import VoiceInterface
+from listener.vad import create_vad
+from listener.vosk_model import find_model_path, shared_model, vosk_installed
+from listener.wake_word import WakeWordDetector
+
+
+def run(detector: WakeWordDetector, path: str, chunk_ms: int):
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+    detector.reset()
+    step = rate * chunk_ms // 1000 * 2
+    detections = []
+    cpu = time.process_time()
+    for offset in range(0, len(pcm), step):
+        detection = detector.process(pcm[offset:offset + step], offset)
+        if detection is not None:
+            detections.append(detection)
+    return detections, len(pcm) / 2 / rate, time.process_time() - cpu
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Wake-word false accept/reject rates and CPU over WAV files")
+    parser.add_argument("directory", help="Directory with positive/ (wake word spoken) and negative/ "
+                                          "(speech, music or silence without it) 16 kHz mono WAV files")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--no-vad", action="store_true", help="Decode every chunk instead of gating on the VAD")
+    args = parser.parse_args()
+
+    if not (find_model_path() and vosk_installed()):
+        print("Vosk or its model is not installed")
+        return 1
+    positives = sorted(glob.glob(os.path.join(args.directory, "positive", "*.wav")))
+    negatives = sorted(glob.glob(os.path.join(args.directory, "negative", "*.wav")))
+    if not positives and not negatives:
+        print(f"No .wav files under {args.directory}/positive or {args.directory}/negative")
+        return 1
+
+    model = shared_model.wait_ready()
+    vad = None if args.no_vad else create_vad(16000)
+    detector = WakeWordDetector(model, VoiceInterface.WAKE_WORDS, 16000, vad)
+    totals = {}
+    for label, paths in (("positive", positives), ("negative", negatives)):
+        audio = cpu = 0.0
+        hits = 0
+        print(f"\n{label}")
+        for path in paths:
+            detections, duration, seconds = run(detector, path, args.chunk_ms)
+            audio += duration
+            cpu += seconds
+            hits += bool(detections)
+            found = ", ".join(f"{d.phrase} @{d.end_position / 32000:.2f}s" for d in detections) or "-"
+            print(f"  {os.path.basename(path):<32}{seconds / duration * 100:6.2f}% CPU  {found}")
+        totals[label] = (len(paths), hits, audio, cpu)
+
+    count, hits, audio, cpu = totals["positive"]
+    if count:
+        print(f"\nfalse reject {count - hits}/{count} ({(count - hits) / count * 100:.1f}%), "
+              f"{cpu / max(audio, 1e-9) * 100:.2f}% CPU")
+    count, hits, audio, cpu = totals["negative"]
+    if count:
+        print(f"false accept {hits}/{count} files ({hits / max(audio / 3600, 1e-9):.1f}/hour), "
+              f"{cpu / max(audio, 1e-9) * 100:.2f}% CPU")
+    print(f"word timings: {'yes' if detector.word_times else 'no (older vosk)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
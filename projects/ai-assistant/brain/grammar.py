@@ -0,0 +1,233 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import re._parser as sre_parse
+    from re._constants import (
+        ASSERT, ASSERT_NOT, AT, BRANCH, CATEGORY, CATEGORY_SPACE, IN, LITERAL, MAX_REPEAT,
+        MIN_REPEAT, SUBPATTERN,
+    )
+except ImportError:
+    import sre_parse
+    from sre_constants import (
+        ASSERT, ASSERT_NOT, AT, BRANCH, CATEGORY, CATEGORY_SPACE, IN, LITERAL, MAX_REPEAT,
+        MIN_REPEAT, SUBPATTERN,
+    )
+
+from brain.intent_parser import IntentParser
+
+
+UNITS = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen",
+]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+NUMBER_WORDS = {word: value for value, word in enumerate(UNITS)}
+NUMBER_WORDS.update({word: value * 10 for value, word in enumerate(TENS) if word})
+NUMBER_WORDS["hundred"] = 100
+
+VOLUME_SLOTS = {"level", "delta"}
+COUNT_SLOTS = {"duration", "interval", "monitor"}
+APP_SLOT = "app"
+SLOT_NAMES = VOLUME_SLOTS | COUNT_SLOTS | {APP_SLOT}
+SHORT_COUNTS = list(range(1, 11)) + [15, 20, 30, 45, 60, 90]
+MAX_SKELETONS = 2000
+WORD_RE = re.compile(r"^[a-z']+$")
+SLOT_RE = re.compile(r"<(\w+)>")
+UNKNOWN = "[unk]"
+
+
+class Unspeakable(Exception):
+    pass
+
+
+def number_to_words(value: int) -> str:
+    if value < 20:
+        return UNITS[value]
+    if value == 100:
+        return "one hundred"
+    tens, units = divmod(value, 10)
+    return TENS[tens] if not units else f"{TENS[tens]} {UNITS[units]}"
+
+
+def words_to_digits(text: str) -> str:
+    """Replace spelled-out numbers up to one hundred with digits."""
+    out: List[str] = []
+    words = text.split()
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word not in NUMBER_WORDS:
+            out.append(word)
+            i += 1
+            continue
+        value = NUMBER_WORDS[word]
+        i += 1
+        if value == 1 and i < len(words) and words[i] == "hundred":
+            value = 100
+            i += 1
+        elif 20 <= value < 100 and i < len(words) and NUMBER_WORDS.get(words[i], 10) < 10:
+            value += NUMBER_WORDS[words[i]]
+            i += 1
+        out.append(str(value))
+    return " ".join(out)
+
+
+def _expand(tokens, groups: Dict[int, str], slots: Set[str]) -> List[str]:
+    results = [""]
+    for op, av in tokens:
+        if op is LITERAL:
+            options = [chr(av)]
+        elif op in (AT, ASSERT, ASSERT_NOT):
+            options = [""]
+        elif op is IN:
+            if av == [(CATEGORY, CATEGORY_SPACE)]:
+                options = [" "]
+            else:
+                literals = [chr(value) for kind, value in av if kind is LITERAL]
+                if len(literals) != len(av):
+                    raise Unspeakable()
+                options = literals
+        elif op is BRANCH:
+            options = [text for branch in av[1] for text in _expand(branch, groups, slots)]
+        elif op is SUBPATTERN:
+            name = groups.get(av[0])
+            options = [f" <{name}> "] if name in slots else _expand(av[-1], groups, slots)
+        elif op in (MAX_REPEAT, MIN_REPEAT):
+            low, high, sub = av
+            body = _expand(sub, groups, slots)
+            if body == [" "]:
+                options = [" "]
+            elif (low, high) == (0, 1):
+                options = [""] + body
+            elif (low, high) == (1, 1):
+                options = body
+            else:
+                raise Unspeakable()
+        else:
+            raise Unspeakable()
+        results = [prefix + option for prefix in results for option in options]
+        if len(results) > MAX_SKELETONS:
+            results = results[:MAX_SKELETONS]
+    return results
+
+
+def _extends(skeleton: List[str], words: List[str]) -> bool:
+    """Whether ``words`` covers only the start of ``skeleton``."""
+    if not words:
+        return bool(skeleton)
+    if not skeleton:
+        return False
+    if SLOT_RE.fullmatch(skeleton[0]):
+        # Slot values (app names, spoken numbers) can span several words.
+        return any(_extends(skeleton[1:], words[n:]) for n in range(1, len(words) + 1))
+    return skeleton[0] == words[0] and _extends(skeleton[1:], words[1:])
+
+
+def pattern_skeletons(pattern: str, slots: Set[str]) -> List[str]:
+    """Spoken forms of a regex, with ``<slot>`` markers for the named
+    groups in ``slots``. Patterns that need free text return nothing."""
+    parsed = sre_parse.parse(pattern)
+    state = getattr(parsed, "state", None) or parsed.pattern
+    groups = {index: name for name, index in state.groupdict.items()}
+    try:
+        expanded = _expand(list(parsed), groups, slots)
+    except Unspeakable:
+        return []
+    skeletons = []
+    for text in expanded:
+        text = " ".join(text.lower().split())
+        words = [w for w in text.split() if not SLOT_RE.fullmatch(w)]
+        if text and all(WORD_RE.match(w) for w in words):
+            skeletons.append(text)
+    return skeletons
+
+
+class CommandGrammar:
+    """Phrase list for a grammar-constrained recognizer, generated from the
+    intent parser's regexes with number and app slots filled in."""
+
+    def __init__(self, parser: IntentParser, app_names: Optional[Callable[[], Iterable[str]]] = None,
+                 volume_range: Tuple[int, int] = (0, 100)):
+        self.parser = parser
+        self.app_names = app_names or (lambda: [])
+        self.volume_range = volume_range
+        self._skeletons: Optional[List[str]] = None
+        self._skeleton_key = None
+
+    def signature(self) -> Tuple:
+        return (len(self.parser.patterns), tuple(sorted(self._app_values())))
+
+    def phrases(self, vocabulary: Optional[Set[str]] = None) -> List[str]:
+        slots = {
+            APP_SLOT: self._app_values(),
+            **{name: [number_to_words(n) for n in range(self.volume_range[0], self.volume_range[1] + 1)]
+               for name in VOLUME_SLOTS},
+            **{name: [number_to_words(n) for n in SHORT_COUNTS] for name in COUNT_SLOTS},
+        }
+        phrases: List[str] = []
+        # Vosk builds a bigram model from the list, so a phrase is only worth
+        # keeping if it adds a word pair; slot values appear once per context.
+        covered: Set[Tuple[str, str]] = set()
+        for skeleton in self._get_skeletons(set(slots)):
+            names = SLOT_RE.findall(skeleton)
+            if any(not slots[name] for name in names):
+                continue
+            count = max((len(slots[name]) for name in names), default=1)
+            for i in range(count):
+                values = iter(slots[name][i % len(slots[name])] for name in names)
+                words = SLOT_RE.sub(lambda _: next(values), skeleton).split()
+                if vocabulary is not None and not all(word in vocabulary for word in words):
+                    continue
+                pairs = set(zip(["<s>"] + words, words + ["</s>"]))
+                if not pairs <= covered:
+                    covered |= pairs
+                    phrases.append(" ".join(words))
+        return phrases + [UNKNOWN]
+
+    def normalize(self, text: str) -> str:
+        return words_to_digits(text)
+
+    def is_incomplete(self, text: str) -> bool:
+        """Whether ``text`` may be the start of a longer command, as in
+        "volume up" before "by twenty" or a number still being spoken."""
+        words = text.lower().split()
+        if not words:
+            return False
+        if words[-1].isdigit() or words[-1] in NUMBER_WORDS:
+            return True
+        current = None
+        for skeleton in self._get_skeletons(SLOT_NAMES):
+            if not _extends(skeleton.split(), words):
+                continue
+            if SLOT_RE.search(skeleton):
+                return True
+            # "mute" -> "mute the volume" means the same thing; only a longer
+            # phrase that parses differently is worth waiting for.
+            if current is None:
+                intent = self.parser.parse(" ".join(words))
+                current = (intent.action_type, intent.entities)
+            longer = self.parser.parse(skeleton)
+            if (longer.action_type, longer.entities) != current:
+                return True
+        return False
+
+    def _app_values(self) -> List[str]:
+        values = set()
+        for name in self.app_names():
+            name = " ".join(name.lower().split())
+            if name and all(WORD_RE.match(w) for w in name.split()):
+                values.add(name)
+        return sorted(values)
+
+    def _get_skeletons(self, slots: Set[str]) -> List[str]:
+        key = len(self.parser.patterns)
+        if self._skeletons is None or self._skeleton_key != key:
+            skeletons: Dict[str, None] = {}
+            for intent in self.parser.patterns:
+                for regex in intent.patterns:
+                    for skeleton in pattern_skeletons(regex.pattern, slots):
+                        skeletons[skeleton] = None
+            self._skeletons = list(skeletons)
+            self._skeleton_key = key
+        return self._skeletons
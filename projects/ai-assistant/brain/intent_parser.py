@@ -36,6 +36,9 @@ class IntentPattern:
 
 
 class IntentParser:
+    EARLY_COMMIT_EXCLUDED = {ActionType.UNKNOWN, ActionType.SHUTDOWN, ActionType.RESTART, ActionType.EXIT}
+    OPEN_ENDED_ENTITIES = {"app_name", "path", "url"}
+
     def __init__(self):
         self.patterns: List[IntentPattern] = []
         self._register_default_patterns()
@@ -44,9 +47,9 @@ class IntentParser:
         self.patterns = [
             IntentPattern(
                 patterns=[
-                    r"^open\s+(?:app(?:lication)?|program)?\s*(?P<app>.+)$",
+                    r"^open\s+(?!(?:file|folder|directory)\s|~?[\\/]|[a-zA-Z]:[\\/])(?:app(?:lication)?|program)?\s*(?P<app>.+)$",
                     r"^launch\s+(?P<app>.+)$",
-                    r"^start\s+(?P<app>.+)$",
+                    r"^start\s+(?!(?:(?:the\s+)?screen\s+)?recording\b)(?P<app>.+)$",
                     r"^run\s+(?P<app>.+)$",
                 ],
                 action_type=ActionType.OPEN_APP,
@@ -88,9 +91,11 @@ class IntentParser:
                     r"^(?:set\s+)?volume\s+(?:to\s+)?(?P<level>\d+)(?:%)?$",
                     r"^(?:adjust\s+)?volume\s+(?P<level>\d+)(?:%)?$",
                     r"^volume\s+(?P<level>\d+)(?:%)?$",
+                    r"^(?:turn\s+)?volume\s+(?P<direction>up|down)(?:\s+(?:by\s+)?(?P<delta>\d+)(?:%)?)?$",
+                    r"^(?:turn\s+(?:it\s+)?)?(?P<direction>up|down)\s+(?:the\s+)?volume(?:\s+(?:by\s+)?(?P<delta>\d+)(?:%)?)?$",
                 ],
                 action_type=ActionType.ADJUST_VOLUME,
-                entity_extractors={"level": "level"}
+                entity_extractors={"level": "level", "direction": "direction", "delta": "delta"}
             ),
             
             IntentPattern(
@@ -113,13 +118,47 @@ class IntentParser:
             
             IntentPattern(
                 patterns=[
+                    r"^record\s+(?:the\s+)?screen(?:\s+for\s+(?P<duration>\d+)\s*(?P<duration_unit>s|secs?|seconds?|m|mins?|minutes?))?$",
+                    r"^(?:start\s+)?(?:screen\s+)?recording(?:\s+for\s+(?P<duration>\d+)\s*(?P<duration_unit>s|secs?|seconds?|m|mins?|minutes?))?$",
+                    r"^(?:take\s+(?:a\s+)?)?screenshots?\s+every\s+(?P<interval>\d+)\s*(?P<interval_unit>s|secs?|seconds?|m|mins?|minutes?)(?:\s+for\s+(?P<duration>\d+)\s*(?P<duration_unit>s|secs?|seconds?|m|mins?|minutes?))?$",
+                ],
+                action_type=ActionType.RECORD_SCREEN,
+                entity_extractors={
+                    "duration": "duration",
+                    "duration_unit": "duration_unit",
+                    "interval": "interval",
+                    "interval_unit": "interval_unit",
+                }
+            ),
+            
+            IntentPattern(
+                patterns=[
+                    r"^stop\s+(?:screen\s+)?recording$",
+                    r"^stop\s+(?:taking\s+)?screenshots$",
+                ],
+                action_type=ActionType.STOP_RECORDING,
+                entity_extractors={}
+            ),
+            
+            IntentPattern(
+                patterns=[
+                    r"^(?:take\s+)?(?:a\s+)?screenshot\s+(?:as\s+|in\s+)?(?P<format>png|webp|qoi|fast|small)$",
+                    r"^(?:take\s+)?(?:a\s+)?screenshot\s+(?:of\s+)?(?:the\s+)?(?:active\s+|current\s+)?(?P<target>window)$",
+                    r"^(?:take\s+)?(?:a\s+)?screenshot\s+(?:of\s+)?(?:the\s+)?(?:monitor|screen|display)\s+(?P<monitor>\d+)$",
+                    r"^(?:take\s+)?(?:a\s+)?screenshot\s+(?:of\s+)?(?:the\s+)?region\s+(?P<region>\d+(?:[,\s]+\d+){3})$",
                     r"^(?:take\s+)?(?:a\s+)?screenshot$",
                     r"^capture\s+screen$",
                     r"^screenshot(?:\s+(?P<path>.+))?$",
                     r"^screen\s+capture$",
                 ],
                 action_type=ActionType.TAKE_SCREENSHOT,
-                entity_extractors={"path": "path"}
+                entity_extractors={
+                    "path": "path",
+                    "target": "target",
+                    "monitor": "monitor",
+                    "region": "region",
+                    "format": "format",
+                }
             ),
             
             IntentPattern(
@@ -182,6 +221,26 @@ class IntentParser:
                 entity_extractors={}
             ),
             
+            IntentPattern(
+                patterns=[
+                    r"^running$",
+                    r"^(?:list|show)\s+running(?:\s+apps)?$",
+                    r"^what(?:'s|\s+is)\s+running(?:\?)?$",
+                ],
+                action_type=ActionType.LIST_RUNNING,
+                entity_extractors={}
+            ),
+            
+            IntentPattern(
+                patterns=[
+                    r"^devices$",
+                    r"^(?:list|show)\s+(?:audio\s+|input\s+)?devices$",
+                    r"^(?:list\s+|show\s+)?microphones$",
+                ],
+                action_type=ActionType.LIST_DEVICES,
+                entity_extractors={}
+            ),
+            
             IntentPattern(
                 patterns=[
                     r"^help$",
@@ -273,11 +332,44 @@ class IntentParser:
             raw_input=user_input
         )
 
+    def parse_partial(self, text: str) -> Optional[ParsedIntent]:
+        """Intent for a transcript that may still grow, if acting now is safe."""
+        # One action type only, nothing free-text or trailing a number, nothing disruptive.
+        text = text.strip()
+        if not text or text[-1].isdigit():
+            return None
+        matches = {}
+        for pattern in self.patterns:
+            result = pattern.match(text)
+            if result and result[0] >= 0.9:
+                matches.setdefault(pattern.action_type, result[1])
+        if len(matches) != 1:
+            return None
+        action_type, entities = next(iter(matches.items()))
+        if action_type in self.EARLY_COMMIT_EXCLUDED or self.OPEN_ENDED_ENTITIES & entities.keys():
+            return None
+        return ParsedIntent(action_type=action_type, entities=entities, confidence=0.9, raw_input=text)
+
     def create_action_from_intent(self, intent: ParsedIntent) -> Action:
         if intent.action_type == ActionType.ADJUST_VOLUME:
+            if "direction" in intent.entities:
+                delta = int(intent.entities.get("delta", 10))
+                if intent.entities["direction"].lower() == "down":
+                    delta = -delta
+                return create_action(ActionType.ADJUST_VOLUME, delta=delta)
             level = int(intent.entities.get("level", 50))
             return create_action(ActionType.ADJUST_VOLUME, level=level)
         
+        if intent.action_type == ActionType.RECORD_SCREEN:
+            parameters = {}
+            for name in ("duration", "interval"):
+                if name in intent.entities:
+                    seconds = int(intent.entities[name])
+                    if intent.entities.get(f"{name}_unit", "s").lower().startswith("m"):
+                        seconds *= 60
+                    parameters[name] = seconds
+            return create_action(ActionType.RECORD_SCREEN, **parameters)
+
         return create_action(intent.action_type, **intent.entities)
 
     def add_pattern(self, pattern: IntentPattern):
@@ -1,7 +1,7 @@
 import sys
 import platform
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
 
 from actions.schema import Action, ActionResult, ActionType, ActionStatus, create_action
 from brain.intent_parser import IntentParser, ParsedIntent
@@ -15,6 +15,8 @@ class CommandRouter:
         self.context = ContextManager()
         self.adapter = self._get_adapter()
         self._confirmation_callback: Optional[Callable[[str], bool]] = None
+        self._status_providers: List[Callable[[], Dict[str, str]]] = []
+        self.last_action: Optional[ActionType] = None
 
     def _get_adapter(self):
         system = platform.system().lower()
@@ -33,7 +35,11 @@ class CommandRouter:
     def set_confirmation_callback(self, callback: Callable[[str], bool]):
         self._confirmation_callback = callback
 
+    def add_status_provider(self, provider: Callable[[], Dict[str, str]]):
+        self._status_providers.append(provider)
+
     def process(self, user_input: str) -> ActionResult:
+        self.last_action = None
         if config_manager.is_kill_switch_active():
             return ActionResult.blocked(
                 ActionStatus.BLOCKED_KILL_SWITCH,
@@ -58,6 +64,7 @@ class CommandRouter:
         config_manager.record_command()
 
         intent = self.intent_parser.parse(user_input)
+        self.last_action = intent.action_type
         
         if intent.action_type == ActionType.UNKNOWN:
             return self._handle_unknown(intent)
@@ -169,6 +176,11 @@ class CommandRouter:
 - Kill Switch: {kill_switch}
 - Session Commands: {stats['total_commands']}
 - Success Rate: {stats['success_rate']:.1f}%"""
+        lines = dict(self.adapter.get_status())
+        for provider in self._status_providers:
+            lines.update(provider())
+        for name, value in lines.items():
+            status += f"\n- {name}: {value}"
         return ActionResult.success(status)
 
     def _show_help(self) -> ActionResult:
@@ -187,17 +199,24 @@ class CommandRouter:
 
 🔊 Volume:
   volume <0-100>      - Set volume level
+  volume up/down [n]  - Change volume by n (default 10)
   mute                - Mute volume
   unmute              - Unmute volume
 
 📸 Screenshot:
   screenshot          - Take a screenshot
+  screenshot window   - Capture the active window
+  screenshot fast     - Fast multi-threaded PNG (also: as webp/qoi/small)
+  record screen       - Record the screen (e.g. "for 30 seconds")
+  stop recording      - Stop an active recording
 
 ⚡ System:
   shutdown            - Shutdown computer (requires confirmation)
   restart             - Restart computer (requires confirmation)
   lock                - Lock the screen
   battery             - Show battery status
+  running             - List apps launched by the assistant
+  devices             - List audio inputs and their native rates
 
 ⏰ Info:
   time                - Current time
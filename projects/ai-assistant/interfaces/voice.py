@@ -1,11 +1,20 @@
+import re
 import threading
-from typing import Optional, Callable
+import time
+from typing import Dict, List, Optional, Callable
 from enum import Enum, auto
 
+from brain.grammar import CommandGrammar
 from brain.router import CommandRouter
-from actions.schema import ActionStatus
+from actions.schema import ActionStatus, ActionType
+from speaker.speech_queue import SpeechPriority
 from speaker.tts import TextToSpeech, TTSEngine
-from listener.stt import SpeechToText, STTEngine, ListenResult
+from listener.stt import SpeechToText, STTEngine, ListenResult, PartialHypothesis
+from listener.wake_word import Detection
+from utils.config import config_manager
+
+# Output still draining from the sound server after playback returns.
+ECHO_TAIL_SECONDS = 0.5
 
 
 class VoiceState(Enum):
@@ -20,18 +29,41 @@ class VoiceInterface:
     WAKE_WORDS = ["hey assistant", "assistant", "jarvis", "computer"]
     CONFIRMATION_WORDS = ["yes", "yeah", "yep", "confirm", "ok", "okay", "sure", "do it"]
     CANCEL_WORDS = ["no", "nope", "cancel", "stop", "nevermind", "never mind"]
+    # Reports where only the newest matters; a new one replaces any still queued or playing.
+    SPEECH_KINDS = {
+        ActionType.ADJUST_VOLUME: "volume",
+        ActionType.MUTE_VOLUME: "volume",
+        ActionType.UNMUTE_VOLUME: "volume",
+        ActionType.GET_BATTERY: "battery",
+        ActionType.GET_TIME: "time",
+        ActionType.GET_DATE: "date",
+        ActionType.STATUS: "status",
+        ActionType.HELP: "help",
+        ActionType.LIST_RUNNING: "running",
+        ActionType.LIST_DEVICES: "devices",
+    }
+    INFO_ACTIONS = {ActionType.HELP, ActionType.STATUS, ActionType.LIST_RUNNING, ActionType.LIST_DEVICES}
 
     def __init__(self, router: CommandRouter):
         self.router = router
         self._tts = TextToSpeech(TTSEngine.PYTTSX3)
-        self._stt = SpeechToText(STTEngine.SPEECH_RECOGNITION)
+        self._stt = SpeechToText(STTEngine.AUTO)
         self._state = VoiceState.IDLE
         self._enabled = False
         self._wake_word_enabled = False
+        self._spotter = None
+        self._barge_in = False
+        self._echo_until = 0.0
+        self._wake_word_re = re.compile(
+            r"\b(?:" + "|".join(re.escape(w) for w in self.WAKE_WORDS) + r")\b", re.IGNORECASE
+        )
         self._state_callback: Optional[Callable[[VoiceState], None]] = None
         self._result_callback: Optional[Callable[[str], None]] = None
         self._cooldown = 1.0
         self._last_command_time = 0.0
+        router.add_status_provider(self.get_status)
+        self._grammar = CommandGrammar(router.intent_parser, self._app_names)
+        self._stt.set_grammar(self._grammar)
 
     def start(self):
         self._enabled = True
@@ -40,12 +72,21 @@ class VoiceInterface:
 
     def stop(self):
         self._enabled = False
+        if self._spotter is not None:
+            self._spotter.stop()
         self._tts.stop()
         self._stt.stop_listening()
+        self._stt.close()
         self._set_state(VoiceState.DISABLED)
 
     def _set_state(self, state: VoiceState):
         self._state = state
+        if self._spotter is not None and self._wake_word_enabled:
+            # Keep spotting while talking so the wake word can cut speech off.
+            if state == VoiceState.IDLE or (state == VoiceState.SPEAKING and self._barge_in):
+                self._spotter.resume()
+            else:
+                self._spotter.pause()
         if self._state_callback:
             self._state_callback(state)
 
@@ -58,6 +99,20 @@ class VoiceInterface:
     def get_state(self) -> VoiceState:
         return self._state
 
+    def get_status(self) -> Dict[str, str]:
+        status = self._stt.get_status()
+        status.update(self._tts.get_status())
+        if self._spotter is not None and self._wake_word_enabled:
+            if self._spotter.error:
+                status["Wake Word"] = f"failed: {self._spotter.error}"
+            else:
+                spotter = self._spotter.get_stats()
+                status["Wake Word"] = (
+                    f"{'paused' if spotter['paused'] else 'listening'}, {spotter['detections']} detections, "
+                    f"{spotter['cpu_percent']:.2f}% CPU"
+                )
+        return status
+
     def listen_for_command(self, timeout: float = 5.0):
         if not self._enabled or self._state == VoiceState.LISTENING:
             return
@@ -71,11 +126,58 @@ class VoiceInterface:
                     self._result_callback(f"❌ {result.error}")
 
         self._set_state(VoiceState.LISTENING)
-        self._stt.listen_async(timeout, _on_listen_complete)
+        # Barge-in: the user wants to talk, so whatever is being said is stale.
+        self.interrupt_speech()
+        self._stt.listen_async(timeout, _on_listen_complete, on_partial=self._should_commit_early)
+
+    def _should_commit_early(self, partial: PartialHypothesis) -> bool:
+        # The window is shorter than the VAD hangover, or the endpoint would
+        # always come first; a pause mid-command is caught by is_incomplete.
+        if partial.stable_seconds * 1000 < config_manager.config.audio.early_commit_ms:
+            return False
+        text = self._strip_wake_word_if_needed(partial.text)
+        if not text or self._grammar.is_incomplete(text):
+            return False
+        return self.router.intent_parser.parse_partial(text) is not None
+
+    def _app_names(self) -> List[str]:
+        adapter = self.router.adapter
+        names = list(getattr(adapter, "APP_ALIASES", {}))
+        app_index = getattr(adapter, "app_index", None)
+        if app_index is not None and app_index.is_ready():
+            names.extend(app_index.names())
+        return names
+
+    def _on_wake_word(self, detection: Detection):
+        # listen_for_command interrupts any speech in progress.
+        if time.monotonic() < self._echo_until:
+            # The tail of our own reply, which said a wake word.
+            self._spotter.resume()
+        elif self._enabled and (self._state == VoiceState.IDLE or
+                              (self._state == VoiceState.SPEAKING and self._barge_in)):
+            self.listen_for_command()
+        else:
+            self._spotter.resume()
+
+    def _strip_wake_word_if_needed(self, text: str) -> Optional[str]:
+        """With the spotter running the wake word was already heard and cut
+        off, so it is only stripped if it is still there; otherwise the
+        transcript must start with it."""
+        if not self._wake_word_enabled:
+            return text
+        stripped = self._strip_wake_word(text)
+        if self._spotter is not None:
+            return text if stripped is None else stripped
+        return stripped
+
+    def _strip_wake_word(self, text: str) -> Optional[str]:
+        text_lower = text.lower().strip()
+        for wake_word in self.WAKE_WORDS:
+            if text_lower.startswith(wake_word):
+                return text.strip()[len(wake_word):].strip()
+        return None
 
     def _process_voice_input(self, text: str):
-        import time
-        
         self._set_state(VoiceState.PROCESSING)
         
         current_time = time.time()
@@ -86,18 +188,7 @@ class VoiceInterface:
         
         self._last_command_time = current_time
         
-        text_lower = text.lower().strip()
-        if self._wake_word_enabled:
-            wake_word_found = False
-            for wake_word in self.WAKE_WORDS:
-                if text_lower.startswith(wake_word):
-                    text = text[len(wake_word):].strip()
-                    wake_word_found = True
-                    break
-            if not wake_word_found:
-                self._set_state(VoiceState.IDLE)
-                return
-
+        text = self._strip_wake_word_if_needed(text)
         if not text:
             self._set_state(VoiceState.IDLE)
             return
@@ -109,14 +200,18 @@ class VoiceInterface:
         if result.status == ActionStatus.PENDING_CONFIRMATION:
             self._speak_and_wait_for_confirmation(result.message)
         else:
-            self._speak(result.message)
-            self._set_state(VoiceState.IDLE)
+            action = self.router.last_action
+            priority = SpeechPriority.INFO if action in self.INFO_ACTIONS else SpeechPriority.NORMAL
+            self._speak(result.message, priority, self.SPEECH_KINDS.get(action))
 
         if result.data and result.data.get("exit"):
             self.stop()
 
     def _speak_and_wait_for_confirmation(self, message: str):
-        self._speak("This action requires confirmation. Say yes to confirm or no to cancel.")
+        # The answer is listened for right after; a wake word here would
+        # start a second recognizer.
+        self._speak("This action requires confirmation. Say yes to confirm or no to cancel.", SpeechPriority.URGENT,
+                    barge_in=False)
         self._set_state(VoiceState.LISTENING)
         
         def _on_confirmation(result: ListenResult):
@@ -144,13 +239,26 @@ class VoiceInterface:
         
         self._stt.listen_async(timeout=5.0, callback=_on_confirmation)
 
-    def _speak(self, text: str):
+    def _speak(self, text: str, priority: SpeechPriority = SpeechPriority.NORMAL, kind: Optional[str] = None,
+               barge_in: bool = True):
         if not self._enabled:
             return
-        self._set_state(VoiceState.SPEAKING)
         clean_text = self._clean_for_speech(text)
-        self._tts.speak_sync(clean_text)
-        self._set_state(VoiceState.IDLE)
+        # There is no echo cancellation: a spotter listening to a reply that
+        # says a wake word ("Close assistant") would hear it and cut it off.
+        says_wake_word = self._wake_word_re.search(clean_text) is not None
+        self._barge_in = barge_in and not says_wake_word
+        self._set_state(VoiceState.SPEAKING)
+        self._tts.speak_sync(clean_text, priority, kind)
+        if says_wake_word:
+            self._echo_until = time.monotonic() + ECHO_TAIL_SECONDS
+        # A barge-in may already have moved on to listening.
+        if self._state == VoiceState.SPEAKING:
+            self._set_state(VoiceState.IDLE)
+
+    def interrupt_speech(self) -> bool:
+        """Cut off speech at once, e.g. when the user starts talking again."""
+        return self._tts.interrupt()
 
     def _clean_for_speech(self, text: str) -> str:
         replacements = {
@@ -175,9 +283,17 @@ class VoiceInterface:
 
     def enable_wake_word(self):
         self._wake_word_enabled = True
+        if self._spotter is None:
+            self._spotter = self._stt.create_wake_word_spotter(self.WAKE_WORDS, self._on_wake_word)
+        if self._spotter is not None:
+            self._spotter.start()
+            if self._state != VoiceState.IDLE:
+                self._spotter.pause()
 
     def disable_wake_word(self):
         self._wake_word_enabled = False
+        if self._spotter is not None:
+            self._spotter.pause()
 
     def enable_tts(self):
         self._tts.enable()
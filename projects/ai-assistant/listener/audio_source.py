@@ -0,0 +1,182 @@
+import sys
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+
+SAMPLE_WIDTH = 2
+
+
+class AudioSource(ABC):
+    """16-bit mono PCM input for ``AudioCaptureService``."""
+
+    sample_rate: int  # what the opened source delivers; resampled downstream if it differs
+    started: float = 0.0  # monotonic time of the first frame, for benchmark timelines
+
+    @abstractmethod
+    def open(self, chunk_frames: int):
+        pass
+
+    @abstractmethod
+    def read(self, frames: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class MicrophoneSource(AudioSource):
+    """PyAudio input stream."""
+
+    def __init__(self, sample_rate: int, device_index: Optional[int] = None, device_rate: int = 0,
+                 device_name: str = ""):
+        self.requested_rate = sample_rate
+        self.sample_rate = device_rate or sample_rate
+        self.device_index = device_index
+        self.device_rate = device_rate
+        self.device_name = device_name
+        self.device = None
+        self._audio = None
+        self._stream = None
+
+    def open(self, chunk_frames: int):
+        import pyaudio
+        from listener.devices import device_manager
+        self._audio = pyaudio.PyAudio()
+        device_manager.hold()
+        # Resolved on every open, so reopening after a hotplug finds a new headset.
+        self.device = device_manager.resolve(self._audio, self.device_name, self.device_index)
+        index = self.device.index if self.device is not None else self.device_index
+        rate = self.device_rate or self.requested_rate
+        if not self.device_rate and self.device is not None:
+            # Fall back to the native rate and let the capture service resample.
+            try:
+                self._audio.is_format_supported(
+                    rate, input_device=index, input_channels=1, input_format=pyaudio.paInt16
+                )
+            except ValueError:
+                rate = self.device.sample_rate
+        self.sample_rate = rate
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            input_device_index=index,
+            frames_per_buffer=chunk_frames
+        )
+        self.started = time.monotonic()
+
+    def on_preferred_device(self) -> bool:
+        if not self.device_name:
+            return True
+        return self.device is not None and self.device_name.lower() in self.device.name.lower()
+
+    def read(self, frames: int) -> bytes:
+        return self._stream.read(frames, exception_on_overflow=False)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            from listener.devices import device_manager
+            self._audio.terminate()
+            self._audio = None
+            device_manager.release()
+
+
+class _FileSource(AudioSource):
+    """Shared pacing for file-backed sources; realtime=True reads at microphone speed."""
+
+    def __init__(self, path: str, sample_rate: int, realtime: bool = True):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self._file: Optional[BinaryIO] = None
+        self._frames_read = 0
+
+    def _open_file(self) -> BinaryIO:
+        self._file = sys.stdin.buffer if self.path == "-" else open(self.path, "rb")
+        return self._file
+
+    def _start(self):
+        self.started = time.monotonic()
+        self._frames_read = 0
+
+    def _pace(self, data: bytes) -> bytes:
+        self._frames_read += len(data) // SAMPLE_WIDTH
+        if self.realtime:
+            delay = self.started + self._frames_read / self.sample_rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        if self._file is not None and self._file is not sys.stdin.buffer:
+            self._file.close()
+        self._file = None
+
+
+class WavFileSource(_FileSource):
+    """16-bit mono WAV from a file, or from stdin when path is "-". The
+    file's own rate replaces ``sample_rate`` on open."""
+
+    def __init__(self, path: str, sample_rate: int, realtime: bool = True):
+        super().__init__(path, sample_rate, realtime)
+        self._wav: Optional[wave.Wave_read] = None
+
+    def open(self, chunk_frames: int):
+        self._wav = wave.open(self._open_file(), "rb")
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"{self.path}: expected 16-bit mono PCM")
+        self.sample_rate = self._wav.getframerate()
+        self._start()
+
+    def read(self, frames: int) -> bytes:
+        return self._pace(self._wav.readframes(frames))
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        super().close()
+
+
+class RawPCMSource(_FileSource):
+    """Headerless signed 16-bit little-endian mono PCM at ``sample_rate``,
+    from a file, a FIFO, or stdin when path is "-"."""
+
+    def open(self, chunk_frames: int):
+        self._open_file()
+        self._start()
+
+    def read(self, frames: int) -> bytes:
+        data = self._file.read(frames * SAMPLE_WIDTH)
+        if len(data) % SAMPLE_WIDTH:
+            data = data[:-(len(data) % SAMPLE_WIDTH)]
+        return self._pace(data)
+
+
+RAW_EXTENSIONS = (".raw", ".pcm", ".s16")
+
+
+def open_audio_source(spec: str, sample_rate: int, realtime: bool = True, device_rate: int = 0,
+                      device_name: str = "") -> AudioSource:
+    """Build a source from ``mic``, ``mic:<index or name>``, a WAV path,
+    ``raw:<path>`` or a raw PCM path; ``-`` is stdin."""
+    if not spec or spec == "mic":
+        return MicrophoneSource(sample_rate, device_rate=device_rate, device_name=device_name)
+    if spec.startswith("mic:"):
+        device = spec[4:]
+        if device.isdigit():
+            return MicrophoneSource(sample_rate, int(device), device_rate)
+        return MicrophoneSource(sample_rate, device_rate=device_rate, device_name=device)
+    if spec.startswith("raw:"):
+        return RawPCMSource(spec[4:], sample_rate, realtime)
+    if spec.lower().endswith(RAW_EXTENSIONS):
+        return RawPCMSource(spec, sample_rate, realtime)
+    return WavFileSource(spec, sample_rate, realtime)
@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from listener.audio_source import SAMPLE_WIDTH, RAW_EXTENSIONS, open_audio_source
+from listener.preprocess import create_preprocessor
+from listener.vosk_model import shared_model
+
+AUDIO_EXTENSIONS = (".wav",) + RAW_EXTENSIONS
+READ_FRAMES = 16000
+
+_stt = None
+_parser = None
+
+
+def find_audio_files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+
+
+def read_audio(path: str, sample_rate: int = 16000) -> bytes:
+    source = open_audio_source(path, sample_rate, realtime=False)
+    source.open(READ_FRAMES)
+    try:
+        # Resample only; level and noise handling are left to the recognizer
+        # so batch results stay comparable across files.
+        resampler = None
+        if source.sample_rate != sample_rate:
+            resampler = create_preprocessor(source.sample_rate, sample_rate, agc=False)
+        chunks = []
+        while True:
+            data = source.read(READ_FRAMES)
+            if not data:
+                break
+            chunks.append(bytes(resampler.process(data)) if resampler is not None else data)
+        return b"".join(chunks)
+    finally:
+        source.close()
+
+
+def _init_worker():
+    # One recognizer per worker, reused for every file it is handed. With
+    # the fork context the model itself was loaded by the parent.
+    global _stt, _parser
+    from brain.intent_parser import IntentParser
+    from listener.stt import VoskSTT
+    _stt = VoskSTT()
+    _parser = IntentParser()
+
+
+def transcribe_file(path: str) -> Dict[str, object]:
+    from brain.grammar import words_to_digits
+    record: Dict[str, object] = {"file": path, "worker": os.getpid()}
+    start = time.perf_counter()
+    try:
+        pcm = read_audio(path)
+    except Exception as e:
+        record["error"] = str(e) or type(e).__name__
+        return record
+    read_seconds = time.perf_counter() - start
+    audio_seconds = len(pcm) / SAMPLE_WIDTH / 16000
+
+    start = time.perf_counter()
+    result = _stt.transcribe(pcm)
+    decode_seconds = time.perf_counter() - start
+
+    record.update({
+        "text": result.text,
+        "audio_s": round(audio_seconds, 3),
+        "read_ms": round(read_seconds * 1000, 1),
+        "decode_ms": round(decode_seconds * 1000, 1),
+        "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+    })
+    if result.success:
+        intent = _parser.parse(words_to_digits(result.text))
+        record["intent"] = intent.action_type.name
+        record["entities"] = intent.entities
+        record["confidence"] = intent.confidence
+    else:
+        record["error"] = result.error
+    return record
+
+
+def transcribe_files(paths: List[str], workers: Optional[int] = None) -> Iterator[Dict[str, object]]:
+    """Transcribe ``paths`` across a process pool, yielding one record per
+    file as soon as it finishes (completion order, not input order)."""
+    # Load before forking so the workers share the model pages copy-on-write.
+    shared_model.wait_ready()
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {pool.submit(transcribe_file, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"file": futures[future], "error": str(e)}
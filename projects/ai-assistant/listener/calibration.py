@@ -0,0 +1,198 @@
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from listener.audio_source import SAMPLE_WIDTH
+from listener.vad import VoiceActivityDetector
+
+FULL_SCALE_DB = 20 * math.log10(32768)
+SR_ENERGY_RATIO = 1.5  # speech_recognition's dynamic_energy_ratio
+SAVE_INTERVAL = 60.0
+SAVE_DELTA_DB = 1.0
+
+
+@dataclass
+class NoiseProfile:
+    """Ambient noise for one input device."""
+    noise_floor_db: Optional[float] = None  # VAD scale: frame energy in dB over one LSB²
+    energy_threshold: Optional[float] = None  # speech_recognition's RMS threshold
+    spectrum: List[float] = field(default_factory=list)  # seeds the noise suppressor
+    updated: float = 0.0
+
+    @property
+    def floor_dbfs(self) -> Optional[float]:
+        if self.noise_floor_db is None:
+            return None
+        return self.noise_floor_db - FULL_SCALE_DB
+
+    def sr_threshold(self) -> Optional[float]:
+        if self.energy_threshold:
+            return self.energy_threshold
+        if self.noise_floor_db is not None:
+            return 10 ** (self.noise_floor_db / 20) * SR_ENERGY_RATIO
+        return None
+
+
+def device_key(spec: str, device_name: str = "") -> Optional[str]:
+    """Profile key for an audio source: the physical input device once it is
+    resolved, else the spec; file sources are not persisted."""
+    if spec and spec != "mic" and not spec.startswith("mic:"):
+        return None
+    if device_name:
+        return f"mic:{device_name}"
+    return spec or "mic"
+
+
+class NoiseProfileStore:
+    """All device profiles in one small JSON file, rewritten atomically."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, NoiseProfile] = {}
+        self._load()
+
+    def get(self, device: Optional[str]) -> NoiseProfile:
+        with self._lock:
+            profile = self._profiles.get(device) if device else None
+            return NoiseProfile(**asdict(profile)) if profile else NoiseProfile()
+
+    def put(self, device: Optional[str], profile: NoiseProfile):
+        if not device:
+            return
+        profile.updated = time.time()
+        with self._lock:
+            self._profiles[device] = NoiseProfile(**asdict(profile))
+            data = {name: asdict(p) for name, p in self._profiles.items()}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._profiles = {name: NoiseProfile(**values) for name, values in data.items()}
+        except (OSError, ValueError, TypeError):
+            self._profiles = {}
+
+
+class BackgroundCalibrator:
+    """Refines a device's noise profile from its own reader of the capture
+    ring, so calibration never holds the input a listen needs."""
+
+    def __init__(self, capture, vad: VoiceActivityDetector, store: Optional[NoiseProfileStore] = None,
+                 device: Optional[str] = None, chunk_ms: int = 100):
+        self.capture = capture
+        self.vad = vad
+        self.store = store
+        self.device = device
+        self.chunk_bytes = capture.sample_rate * chunk_ms // 1000 * SAMPLE_WIDTH
+        self.profile = store.get(device) if store is not None else NoiseProfile()
+        self.refined = False
+        self.error = ""
+        if self.profile.noise_floor_db is not None:
+            vad.set_floor(self.profile.noise_floor_db)
+        self._saved_floor = self.profile.noise_floor_db
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._relearn = threading.Event()
+        self._reseed = threading.Event()
+
+    @property
+    def noise_floor_db(self) -> Optional[float]:
+        return self.profile.noise_floor_db
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.capture.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.refined:
+            self.save()
+
+    def apply(self, vad: VoiceActivityDetector):
+        """Seed a listening VAD with the latest floor. Never waits."""
+        floor = self.profile.noise_floor_db
+        if floor is not None and not vad.in_speech:
+            vad.set_floor(floor)
+
+    def use_device(self, device: Optional[str]):
+        """Move to another input device's profile, saving the current one.
+        Called as the capture opens the device, before its audio arrives."""
+        with self._lock:
+            if device == self.device:
+                return
+            if self.refined:
+                self.save()
+            self.device = device
+            self.profile = self.store.get(device) if self.store is not None else NoiseProfile()
+            self.refined = False
+            self._saved_floor = self.profile.noise_floor_db
+            self._saved_at = time.monotonic()
+        self._reseed.set()
+
+    def recalibrate(self):
+        """Forget the floor and learn it again from the next audio, without waiting."""
+        self._relearn.set()
+
+    def save(self):
+        if self.store is None or self.profile.noise_floor_db is None:
+            return
+        denoiser = getattr(self.capture.preprocessor, "denoiser", None)
+        if denoiser is not None and denoiser.noise is not None:
+            self.profile.spectrum = [round(float(v), 2) for v in denoiser.noise]
+        self.store.put(self.device, self.profile)
+        self._saved_floor = self.profile.noise_floor_db
+        self._saved_at = time.monotonic()
+
+    def _run(self):
+        reader = self.capture.reader(preroll_ms=0)
+        try:
+            while not self._stop.is_set():
+                chunk = bytearray()
+                while len(chunk) < self.chunk_bytes and not reader.at_end and not self._stop.is_set():
+                    chunk += reader.read(self.chunk_bytes - len(chunk), timeout=0.5)
+                if reader.at_end and not chunk:
+                    break
+                if not chunk:
+                    continue
+                if self._reseed.is_set():
+                    self._reseed.clear()
+                    self.vad.initial_floor_db = self.profile.noise_floor_db
+                    self.vad.reset()
+                if self._relearn.is_set():
+                    self._relearn.clear()
+                    self.vad.initial_floor_db = None
+                    self.vad.reset()
+                self.vad.feed(bytes(chunk))
+                if self.vad.in_speech or self.vad.noise_floor_db is None or self._reseed.is_set():
+                    continue
+                with self._lock:
+                    self.profile.noise_floor_db = self.vad.noise_floor_db
+                    self.refined = True
+                    drift = abs(self.profile.noise_floor_db - (self._saved_floor or 0.0))
+                    if drift >= SAVE_DELTA_DB and time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                        self.save()
+        except Exception as e:
+            self.error = str(e)
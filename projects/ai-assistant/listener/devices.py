@@ -0,0 +1,232 @@
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from utils.config import config_manager
+
+POLL_SECONDS = 2.0
+
+
+@dataclass
+class InputDevice:
+    index: int
+    name: str
+    sample_rate: int
+    channels: int
+    default: bool = False
+
+
+@dataclass
+class DeviceChange:
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+
+
+def hotplug_snapshot() -> Optional[Set[str]]:
+    """Cheap view of the attached sound hardware, without touching
+    PortAudio or any open stream. None where there is no such view."""
+    if not sys.platform.startswith("linux"):
+        return None
+    entries: Set[str] = set()
+    try:
+        with open("/proc/asound/cards", "r", encoding="utf-8", errors="replace") as f:
+            entries.update(line.strip() for line in f if line[:4].strip().isdigit())
+    except OSError:
+        pass
+    try:
+        entries.update(f"/dev/snd/{name}" for name in os.listdir("/dev/snd") if name.startswith("pcmC"))
+    except OSError:
+        pass
+    return entries
+
+
+class DeviceManager:
+    """Input device list with a per-name cache and hotplug detection."""
+
+    def __init__(self, cache_path: Path, poll_seconds: float = POLL_SECONDS):
+        self.cache_path = cache_path
+        self.poll_seconds = poll_seconds
+        self._devices: List[InputDevice] = []
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[DeviceChange], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.changes = 0
+        self.enumerated_at = 0.0
+        self._stale = False
+        self._holders = 0
+        self._load_cache()
+
+    def devices(self, refresh: bool = False) -> List[InputDevice]:
+        # A second PyAudio instance next to an open stream sees the hardware as
+        # it was when the first was initialised, so while one is held the list
+        # comes from the last stream open instead.
+        if (refresh or not self._devices) and not self.in_use():
+            self.refresh()
+        with self._lock:
+            return list(self._devices)
+
+    def hold(self):
+        """Mark a PyAudio instance as open for capture."""
+        with self._lock:
+            self._holders += 1
+
+    def release(self):
+        with self._lock:
+            self._holders = max(0, self._holders - 1)
+
+    def in_use(self) -> bool:
+        return self._holders > 0
+
+    def refresh(self):
+        try:
+            import pyaudio
+        except ImportError:
+            return
+        audio = pyaudio.PyAudio()
+        try:
+            self.enumerate(audio)
+        finally:
+            audio.terminate()
+
+    def enumerate(self, audio) -> List[InputDevice]:
+        """Read the input devices from an initialised PyAudio instance."""
+        # PortAudio only rescans hardware when initialised, so this runs on the
+        # instance a microphone opens with anyway; the result is cached on disk.
+        try:
+            default_index = audio.get_default_input_device_info()["index"]
+        except (IOError, OSError):
+            default_index = None
+        devices = []
+        for index in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) < 1:
+                continue
+            devices.append(InputDevice(
+                index=index,
+                name=info.get("name", f"Device {index}"),
+                sample_rate=int(info.get("defaultSampleRate", 16000)),
+                channels=int(info["maxInputChannels"]),
+                default=index == default_index,
+            ))
+        with self._lock:
+            changed = devices != self._devices
+            self._devices = devices
+            self._stale = False
+            self.enumerated_at = time.time()
+        if changed:
+            self._save_cache()
+        return devices
+
+    def find(self, name: str) -> Optional[InputDevice]:
+        """Exact name first, then a case-insensitive substring match."""
+        with self._lock:
+            devices = list(self._devices)
+        for device in devices:
+            if device.name == name:
+                return device
+        lowered = name.lower()
+        for device in devices:
+            if lowered in device.name.lower():
+                return device
+        return None
+
+    def resolve(self, audio, name: str = "", index: Optional[int] = None) -> Optional[InputDevice]:
+        """Device to open on ``audio`` for a preferred name or index."""
+        # One device-info lookup confirms a cached entry; enumerate only if stale.
+        if self._stale:
+            self.enumerate(audio)
+        if name:
+            cached = self.find(name)
+            if cached is not None and self._still_there(audio, cached):
+                return cached
+            self.enumerate(audio)
+            found = self.find(name)
+            if found is not None:
+                return found
+        elif not self._devices:
+            self.enumerate(audio)
+        with self._lock:
+            devices = list(self._devices)
+        if index is not None:
+            return next((d for d in devices if d.index == index), None)
+        return next((d for d in devices if d.default), None)
+
+    def add_listener(self, callback: Callable[[DeviceChange], None]):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[DeviceChange], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start_monitor(self) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        if hotplug_snapshot() is None:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop_monitor(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_monitoring(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _monitor(self):
+        previous = hotplug_snapshot()
+        while not self._stop.wait(self.poll_seconds):
+            current = hotplug_snapshot()
+            if current == previous:
+                continue
+            change = DeviceChange(added=current - previous, removed=previous - current)
+            previous = current
+            self.changes += 1
+            self._stale = True
+            for callback in list(self._listeners):
+                try:
+                    callback(change)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _still_there(audio, device: InputDevice) -> bool:
+        try:
+            info = audio.get_device_info_by_index(device.index)
+        except (IOError, OSError, ValueError):
+            return False
+        return info.get("name") == device.name and info.get("maxInputChannels", 0) > 0
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._devices = [InputDevice(**row) for row in json.load(f)]
+            self.enumerated_at = os.path.getmtime(self.cache_path)
+        except (OSError, ValueError, TypeError):
+            self._devices = []
+
+    def _save_cache(self):
+        with self._lock:
+            rows = [asdict(device) for device in self._devices]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(rows, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+
+device_manager = DeviceManager(config_manager.config.config_dir / "audio-devices.json")
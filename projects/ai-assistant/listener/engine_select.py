@@ -0,0 +1,98 @@
+import math
+import random
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+PROBE_SECONDS = 2.0
+PROBE_RUNS = 2
+NO_SPEECH_ERRORS = {"No speech detected", "Could not understand audio"}
+
+
+@dataclass
+class EngineMeasurement:
+    rtf: Optional[float] = None
+    error: str = ""
+
+
+def synthetic_probe(seconds: float = PROBE_SECONDS, sample_rate: int = 16000) -> bytes:
+    """Voiced-looking bursts in noise, for when no recorded audio is at hand.
+    Decoders spend about as long on it as on speech, which is all timing needs."""
+    rng = random.Random(0)
+    samples = array("h")
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        voiced = math.sin(2 * math.pi * 2 * t) > 0
+        tone = sum(math.sin(2 * math.pi * f * t) / k for k, f in enumerate((140, 280, 560, 1120), 1))
+        value = (2500 * tone if voiced else 0.0) + rng.gauss(0, 200)
+        samples.append(max(-32768, min(32767, int(value))))
+    return samples.tobytes()
+
+
+class EngineSelector:
+    """Picks the fastest local engine with a real-time factor under ``max_rtf``,
+    timed in the background on the same probe audio."""
+
+    def __init__(self, engines: Dict[str, Callable[[bytes], object]], probe: Callable[[], bytes],
+                 max_rtf: float = 0.5,
+                 preferred: Optional[str] = None, on_select: Optional[Callable[[str], None]] = None):
+        self.engines = engines
+        self.probe = probe
+        self.max_rtf = max_rtf
+        self.on_select = on_select
+        # Used until the measurement finishes and on_select reports the pick.
+        self.selected = preferred if preferred in engines else next(iter(engines), None)
+        self.measurements: Dict[str, EngineMeasurement] = {}
+        self.state = "pending"
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def measure_async(self) -> threading.Thread:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.measure, daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def measure(self) -> Optional[str]:
+        self.state = "measuring"
+        pcm = self.probe()
+        seconds = len(pcm) / 2 / 16000
+        measurements = {}
+        for name, transcribe in self.engines.items():
+            measurement = EngineMeasurement()
+            try:
+                # The first run includes one-off setup (model wait, grammar
+                # build); the best of the rest is the steady per-call cost.
+                timings = []
+                for _ in range(PROBE_RUNS):
+                    start = time.perf_counter()
+                    result = transcribe(pcm)
+                    timings.append(time.perf_counter() - start)
+                    if not result.success and result.error not in NO_SPEECH_ERRORS:
+                        raise RuntimeError(result.error)
+                measurement.rtf = min(timings[1:] or timings) / seconds
+            except Exception as e:
+                measurement.error = str(e) or type(e).__name__
+            measurements[name] = measurement
+        self.measurements = measurements
+        self.state = "done"
+
+        timed = sorted((m.rtf, name) for name, m in measurements.items() if m.rtf is not None)
+        acceptable = [name for rtf, name in timed if rtf <= self.max_rtf]
+        choice = (acceptable or [name for _, name in timed] or [self.selected])[0]
+        self.selected = choice
+        if choice is not None and self.on_select is not None:
+            self.on_select(choice)
+        return choice
+
+    def describe(self) -> str:
+        if self.state != "done":
+            return f"{self.selected} ({self.state})"
+        parts = []
+        for name, measurement in self.measurements.items():
+            parts.append(f"{name} RTF {measurement.rtf:.2f}" if measurement.rtf is not None
+                         else f"{name} failed: {measurement.error}")
+        return f"{self.selected} ({', '.join(parts)})"
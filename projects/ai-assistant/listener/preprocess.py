@@ -0,0 +1,234 @@
+from math import ceil, gcd
+from typing import Optional
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import as_strided
+except ImportError:
+    np = None
+
+
+class _Fifo:
+    """Growable float32 queue over one preallocated array."""
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, np.float32)
+        self.size = 0
+
+    def append(self, values):
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.zeros(max(end, 2 * len(self.data)), np.float32)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def consume(self, count: int):
+        remaining = self.size - count
+        self.data[:remaining] = self.data[count:self.size]
+        self.size = remaining
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class PolyphaseResampler:
+    """Rational-ratio resampler with a Kaiser-windowed sinc prototype."""
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 16, block_ms: int = 10):
+        divisor = gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        taps = taps_per_phase * max(1, ceil(self.down / self.up))
+        length = taps * self.up
+        cutoff = 0.5 / max(self.up, self.down) * 0.95
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0) * self.up
+        phases = prototype.reshape(taps, self.up).T
+
+        # Fixed blocks of a multiple of ``down`` samples always yield the same
+        # number of outputs, so the gather indices and coefficients are built once.
+        self.block_in = self.down * max(1, ceil(in_rate * block_ms / 1000 / self.down))
+        self.block_out = self.block_in * self.up // self.down
+        positions = np.arange(self.block_out) * self.down
+        self.taps = taps
+        self.index = (positions // self.up)[:, None] - np.arange(taps)[None, :] + taps - 1
+        self.coeffs = phases[positions % self.up].astype(np.float32)
+        self._ext = np.zeros(taps - 1 + self.block_in, np.float32)
+        self._gather = np.empty((self.block_out, taps), np.float32)
+        self._out = np.empty(self.block_out, np.float32)
+        self._pending = _Fifo(self.block_in * 4)
+
+    def process(self, samples, out: _Fifo):
+        pending = self._pending
+        pending.append(samples)
+        history = self.taps - 1
+        while pending.size >= self.block_in:
+            self._ext[history:] = pending.data[:self.block_in]
+            np.take(self._ext, self.index, out=self._gather)
+            np.multiply(self._gather, self.coeffs, out=self._gather)
+            np.sum(self._gather, axis=1, out=self._out)
+            out.append(self._out)
+            if history:
+                self._ext[:history] = self._ext[-history:]
+            pending.consume(self.block_in)
+
+
+class SpectralSubtractor:
+    """Magnitude spectral subtraction with 50% overlap-add."""
+
+    def __init__(self, frame: int = 512, over_subtraction: float = 2.0, floor: float = 0.08,
+                 adapt_rate: float = 0.05, noise_profile=None):
+        self.frame = frame
+        self.hop = frame // 2
+        self.over_subtraction = over_subtraction
+        self.floor = floor
+        self.adapt_rate = adapt_rate
+        self.window = np.sqrt(np.hanning(frame + 1)[:frame]).astype(np.float32)
+        self.noise = None if noise_profile is None else np.asarray(noise_profile, np.float32)
+        self._pending = _Fifo(frame * 8)
+        self._tail = np.zeros(self.hop, np.float32)
+
+    @property
+    def noise_floor_db(self) -> Optional[float]:
+        if self.noise is None:
+            return None
+        power = 2.0 * float(np.dot(self.noise, self.noise)) / (self.frame * float(np.sum(self.window ** 2)))
+        return 10.0 * np.log10(power + 1.0)
+
+    def process(self, samples, out: _Fifo):
+        pending = self._pending
+        pending.append(samples)
+        count = (pending.size - self.hop) // self.hop
+        if count <= 0:
+            return
+        data = pending.data
+        frames = as_strided(data, shape=(count, self.frame), strides=(self.hop * data.itemsize, data.itemsize))
+        spectra = np.fft.rfft(frames * self.window, axis=1)
+        magnitude = np.abs(spectra)
+        power = np.einsum("ij,ij->i", magnitude, magnitude)
+        if self.noise is None:
+            self.noise = magnitude[np.argmin(power)].astype(np.float32)
+        # Frames near the noise estimate keep it adapting between words.
+        quiet = power < 2.0 * float(np.dot(self.noise, self.noise))
+        if quiet.any():
+            self.noise += (magnitude[quiet].mean(axis=0) - self.noise) * self.adapt_rate
+
+        gain = 1.0 - self.over_subtraction * self.noise / (magnitude + 1e-6)
+        np.maximum(gain, self.floor, out=gain)
+        spectra *= gain
+        frames_out = np.fft.irfft(spectra, n=self.frame, axis=1).astype(np.float32)
+        frames_out *= self.window
+
+        frames_out[0, :self.hop] += self._tail
+        frames_out[1:, :self.hop] += frames_out[:-1, self.hop:]
+        self._tail[:] = frames_out[-1, self.hop:]
+        out.append(frames_out[:, :self.hop].ravel())
+        pending.consume(count * self.hop)
+
+
+class AutomaticGainControl:
+    """Block AGC towards ``target_dbfs``; blocks quieter than ``gate_dbfs``
+    leave the gain alone so silence is not pumped up."""
+
+    def __init__(self, target_dbfs: float = -20.0, max_gain_db: float = 20.0, min_gain_db: float = -10.0,
+                 attack: float = 0.5, release: float = 0.05, gate_dbfs: float = -50.0):
+        self.target_dbfs = target_dbfs
+        self.max_gain_db = max_gain_db
+        self.min_gain_db = min_gain_db
+        self.attack = attack
+        self.release = release
+        self.gate_dbfs = gate_dbfs
+        self.gain_db = 0.0
+        self._ramp = np.zeros(0, np.float32)
+        self._scale = np.zeros(0, np.float32)
+
+    def process(self, block):
+        n = len(block)
+        if not n:
+            return
+        if len(self._ramp) < n:
+            self._ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+            self._scale = np.empty(n, np.float32)
+        level = 10.0 * np.log10(float(np.dot(block, block)) / n / (32768.0 * 32768.0) + 1e-12)
+        previous = 10.0 ** (self.gain_db / 20.0)
+        if level > self.gate_dbfs:
+            desired = min(self.max_gain_db, max(self.min_gain_db, self.target_dbfs - level))
+            rate = self.attack if desired < self.gain_db else self.release
+            self.gain_db += (desired - self.gain_db) * rate
+        current = 10.0 ** (self.gain_db / 20.0)
+        scale = self._scale[:n]
+        np.multiply(self._ramp[:n], current - previous, out=scale)
+        scale += previous
+        block *= scale
+
+
+class AudioPreprocessor:
+    """Capture-side chain: DC removal, resampling to ``out_rate``, optional
+    spectral-subtraction noise suppression and AGC."""
+
+    def __init__(self, in_rate: int, out_rate: int = 16000, agc: bool = True, denoise: bool = False,
+                 noise_profile=None):
+        if np is None:
+            raise ImportError("Audio preprocessing requires numpy")
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.resampler = PolyphaseResampler(in_rate, out_rate) if in_rate != out_rate else None
+        self.denoiser = SpectralSubtractor(noise_profile=noise_profile) if denoise else None
+        self.agc = AutomaticGainControl() if agc else None
+        self._dc = 0.0
+        self._input = np.zeros(in_rate // 10, np.float32)
+        self._stage = _Fifo(out_rate // 5)
+        self._final = _Fifo(out_rate // 5)
+        self._out = np.zeros(out_rate // 10, np.int16)
+
+    @property
+    def noise_floor_db(self) -> Optional[float]:
+        return self.denoiser.noise_floor_db if self.denoiser is not None else None
+
+    def process(self, pcm: bytes) -> memoryview:
+        """int16 samples at ``out_rate``; the view is reused by the next call."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = len(samples)
+        if len(self._input) < n:
+            self._input = np.zeros(n, np.float32)
+        block = self._input[:n]
+        block[:] = samples
+        if n:
+            self._dc += (float(block.mean()) - self._dc) * 0.05
+            block -= self._dc
+
+        stage = self._stage
+        stage.size = 0
+        if self.resampler is not None:
+            self.resampler.process(block, stage)
+        else:
+            stage.append(block)
+        if self.denoiser is not None:
+            final = self._final
+            final.size = 0
+            self.denoiser.process(stage.view(), final)
+            stage = final
+        result = stage.view()
+        if self.agc is not None:
+            self.agc.process(result)
+
+        count = len(result)
+        if len(self._out) < count:
+            self._out = np.zeros(count, np.int16)
+        np.clip(result, -32768, 32767, out=result)
+        out = self._out[:count]
+        out[:] = result
+        return memoryview(out).cast("B")
+
+
+def create_preprocessor(in_rate: int, out_rate: int = 16000, agc: bool = True, denoise: bool = False,
+                        noise_profile=None) -> Optional[AudioPreprocessor]:
+    """None without numpy when no resampling is needed; resampling without
+    numpy raises, since the recognizer cannot use audio at another rate."""
+    if np is None:
+        if in_rate != out_rate:
+            raise ImportError(f"Resampling {in_rate} Hz input to {out_rate} Hz requires numpy")
+        return None
+    return AudioPreprocessor(in_rate, out_rate, agc=agc, denoise=denoise, noise_profile=noise_profile)
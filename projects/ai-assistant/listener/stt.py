@@ -1,28 +1,307 @@
+import os
 import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from importlib.util import find_spec
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 from enum import Enum, auto
 from dataclasses import dataclass
 
+from brain.grammar import UNKNOWN, CommandGrammar
+from listener.audio_source import SAMPLE_WIDTH, AudioSource, MicrophoneSource, open_audio_source
+from listener.calibration import BackgroundCalibrator, NoiseProfileStore, device_key
+from listener.devices import DeviceChange, device_manager
+from listener.engine_select import EngineSelector, synthetic_probe
+from listener.preprocess import AudioPreprocessor, create_preprocessor
+from listener.vad import VoiceActivityDetector, create_vad
+from listener.vosk_model import find_model_path, shared_model, vosk_installed
+from utils.config import config_manager
+
 
 class STTEngine(Enum):
+    AUTO = auto()
     VOSK = auto()
     SPEECH_RECOGNITION = auto()
     DISABLED = auto()
 
 
+def sphinx_installed() -> bool:
+    return find_spec("pocketsphinx") is not None
+
+
 @dataclass
 class ListenResult:
     success: bool
     text: str
     confidence: float = 0.0
     error: str = ""
+    early: bool = False
+
+
+@dataclass
+class PartialHypothesis:
+    text: str
+    audio_seconds: float
+    stable_seconds: float = 0.0
+
+
+PartialCallback = Callable[[PartialHypothesis], bool]
+
+
+class AudioRingBuffer:
+    """Fixed-size PCM ring written by one capture thread, read by many."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity - capacity % SAMPLE_WIDTH
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._cond = threading.Condition()
+        # Absolute byte count, so readers keep their own cursors and can
+        # start in the past (pre-roll) until the data is overwritten.
+        self.written = 0
+        self.closed = False
+
+    def write(self, data: bytes):
+        data = memoryview(data).cast("B")
+        with self._cond:
+            skipped = max(0, len(data) - self.capacity)
+            data = data[skipped:]
+            start = (self.written + skipped) % self.capacity
+            first = min(len(data), self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            self._view[:len(data) - first] = data[first:]
+            self.written += skipped + len(data)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self.closed = False
+
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def read(self, position: int, max_bytes: int, timeout: Optional[float] = None) -> Tuple[bytes, int]:
+        with self._cond:
+            if position >= self.written and not self.closed:
+                self._cond.wait(timeout)
+            position = max(position, self.oldest())
+            count = min(self.written - position, max_bytes)
+            count -= count % SAMPLE_WIDTH
+            if count <= 0:
+                return b"", position
+            start = position % self.capacity
+            first = min(count, self.capacity - start)
+            data = bytes(self._view[start:start + first]) + bytes(self._view[:count - first])
+            return data, position + count
+
+
+class AudioReader:
+    def __init__(self, ring: AudioRingBuffer, position: int):
+        self._ring = ring
+        self.position = position
+        self.dropped = 0
+
+    def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        oldest = self._ring.oldest()
+        if self.position < oldest:
+            self.dropped += oldest - self.position
+        data, self.position = self._ring.read(self.position, max_bytes, timeout)
+        return data
+
+    def available(self) -> int:
+        return self._ring.written - max(self.position, self._ring.oldest())
+
+    @property
+    def at_end(self) -> bool:
+        return self._ring.closed and self.available() <= 0
+
+
+def record_utterance(reader: "AudioReader", vad: VoiceActivityDetector, timeout: float,
+                     max_seconds: float, chunk_bytes: int = 1280) -> bytes:
+    """Collect one utterance: wait up to ``timeout`` for speech to start,
+    then return once the VAD hangover expires or ``max_seconds`` elapse.
+    Leading silence is dropped except for the chunk just before speech."""
+    vad.restart()
+    deadline = time.monotonic() + timeout
+    audio = bytearray()
+    lead = b""
+    while not reader.at_end:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        chunk = reader.read(chunk_bytes, timeout=remaining)
+        if not chunk:
+            continue
+        state = vad.feed(chunk)
+        if not audio:
+            if not state.speech:
+                lead = chunk
+                continue
+            audio += lead
+            deadline = time.monotonic() + max_seconds
+        audio += chunk
+        if state.ended:
+            break
+    return bytes(audio)
+
+
+class AudioCaptureService:
+    """Keeps one input stream open and feeds a preallocated ring buffer
+    that recognizers read from, pre-roll included, at ``sample_rate``."""
+
+    def __init__(self, source: AudioSource, sample_rate: int = 16000, buffer_seconds: float = 10.0,
+                 chunk_ms: int = 20, preroll_ms: int = 300, agc: bool = False, denoise: bool = False,
+                 noise_profile=None):
+        self.source = source
+        self.sample_rate = sample_rate
+        self.chunk_ms = chunk_ms
+        self.chunk_frames = max(1, sample_rate * chunk_ms // 1000)
+        self.agc = agc
+        self.denoise = denoise
+        self.noise_profile = noise_profile
+        self.preprocessor: Optional[AudioPreprocessor] = None
+        self.switches = 0
+        self.switch_error = ""
+        self.on_open: Optional[Callable[[AudioSource], None]] = None
+        self._next_source: Optional[AudioSource] = None
+        self.preroll_ms = preroll_ms
+        self.ring = AudioRingBuffer(int(buffer_seconds * sample_rate) * SAMPLE_WIDTH)
+        self._consumed = 0
+        self._resume_at: Optional[int] = None
+        self.open_time = 0.0
+        self.error = ""
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._opened = threading.Event()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._opened.clear()
+        self.ring.reopen()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait_open(self, timeout: Optional[float] = None) -> bool:
+        return self._opened.wait(timeout) and not self.error
+
+    def reader(self, preroll_ms: Optional[int] = None) -> AudioReader:
+        preroll = self.preroll_ms if preroll_ms is None else preroll_ms
+        preroll_bytes = self.sample_rate * preroll // 1000 * SAMPLE_WIDTH
+        start = max(self.ring.oldest(), self.ring.written - preroll_bytes, self._consumed)
+        if self._resume_at is not None:
+            start = max(self.ring.oldest(), self._resume_at)
+            self._resume_at = None
+        return AudioReader(self.ring, start)
+
+    def mark_consumed(self, reader: AudioReader):
+        """Keep the next reader's pre-roll from replaying audio already decoded."""
+        self._consumed = max(self._consumed, reader.position)
+
+    def resume_from(self, position: int):
+        """Start the next reader exactly at ``position`` (e.g. just after a
+        wake word), however long ago that was, instead of the pre-roll."""
+        self._consumed = max(self._consumed, position)
+        self._resume_at = position
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "running": int(self.is_running()),
+            "open_ms": self.open_time * 1000,
+            "captured_seconds": self.ring.written / SAMPLE_WIDTH / self.sample_rate,
+            "switches": self.switches,
+        }
+
+    def switch_source(self, source: AudioSource):
+        """Move to ``source`` (or reopen the current one) on the capture
+        thread. The ring buffer and reader positions are untouched, so
+        buffered audio survives and readers just see the new input follow."""
+        if not self.is_running():
+            self.source = source
+            return
+        self._next_source = source
+
+    def _source_frames(self) -> int:
+        return max(1, self.source.sample_rate * self.chunk_ms // 1000)
+
+    def _open_source(self) -> int:
+        self.source.open(self._source_frames())
+        if self.on_open is not None:
+            self.on_open(self.source)
+        # File sources only know their rate once the header is read.
+        frames = self._source_frames()
+        self.preprocessor = None
+        if self.source.sample_rate != self.sample_rate or self.agc or self.denoise:
+            self.preprocessor = create_preprocessor(
+                self.source.sample_rate, self.sample_rate, agc=self.agc, denoise=self.denoise,
+                noise_profile=self.noise_profile
+            )
+        return frames
+
+    def _switch(self) -> int:
+        source, self._next_source = self._next_source, None
+        previous = self.source
+        previous.close()
+        self.source = source
+        try:
+            frames = self._open_source()
+            self.switches += 1
+            self.switch_error = ""
+            return frames
+        except Exception as e:
+            self.switch_error = str(e) or type(e).__name__
+            source.close()
+            self.source = previous
+            return self._open_source()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            frames = self._open_source()
+        except Exception as e:
+            self.error = str(e)
+            self.source.close()
+            self._opened.set()
+            self.ring.close()
+            return
+        self.open_time = time.perf_counter() - start
+        self._opened.set()
+        try:
+            while not self._stop.is_set():
+                if self._next_source is not None:
+                    frames = self._switch()
+                data = self.source.read(frames)
+                if not data:
+                    break
+                if self.preprocessor is not None:
+                    data = self.preprocessor.process(data)
+                self.ring.write(data)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.source.close()
+            self.ring.close()
 
 
 class BaseSTT(ABC):
     @abstractmethod
-    def listen(self, timeout: float = 5.0) -> ListenResult:
+    def listen(self, timeout: float = 5.0, on_partial: Optional[PartialCallback] = None) -> ListenResult:
         pass
 
     @abstractmethod
@@ -33,84 +312,219 @@ class BaseSTT(ABC):
     def calibrate(self, duration: float = 1.0) -> None:
         pass
 
+    @abstractmethod
+    def transcribe(self, pcm: bytes) -> ListenResult:
+        pass
+
 
 class VoskSTT(BaseSTT):
-    def __init__(self):
+    MIN_CHUNK_MS = 40
+    MAX_CHUNK_MS = 250
+
+    def __init__(self, capture: Optional[AudioCaptureService] = None,
+                 vad: Optional[VoiceActivityDetector] = None, max_phrase_seconds: float = 10.0):
         self._model = None
         self._recognizer = None
+        self._full_recognizer = None
+        self._grammar: Optional[CommandGrammar] = None
+        self._grammar_key = None
+        self.grammar_size = 0
         self._available = False
         self._sample_rate = 16000
+        self._capture = capture
+        self._vad = vad
+        self._max_phrase_seconds = max_phrase_seconds
         self._init_engine()
 
     def _init_engine(self):
-        try:
-            from vosk import Model, KaldiRecognizer
-            import os
-            
-            model_paths = [
-                os.path.expanduser("~/.vosk/model"),
-                os.path.expanduser("~/vosk-model-small-en-us-0.15"),
-                "model",
-                "vosk-model",
-            ]
-            
-            model_path = None
-            for path in model_paths:
-                if os.path.exists(path):
-                    model_path = path
-                    break
-            
-            if model_path:
-                self._model = Model(model_path)
-                self._recognizer = KaldiRecognizer(self._model, self._sample_rate)
-                self._available = True
-        except Exception:
-            self._available = False
+        # The model loads in the background; listen() waits for it.
+        model_path = find_model_path()
+        if model_path and vosk_installed():
+            shared_model.load_async(model_path)
+            self._available = True
 
-    def listen(self, timeout: float = 5.0) -> ListenResult:
+    def _ensure_recognizer(self, timeout: Optional[float]) -> Optional[str]:
+        if self._full_recognizer is None:
+            try:
+                model = shared_model.wait_ready(timeout)
+            except Exception as e:
+                self._available = False
+                return f"Vosk model failed to load: {e}"
+            if model is None:
+                return "Speech model is still loading"
+            from vosk import KaldiRecognizer
+            self._model = model
+            self._full_recognizer = KaldiRecognizer(model, self._sample_rate)
+            self._recognizer = self._full_recognizer
+        self._update_grammar()
+        return None
+
+    def set_grammar(self, grammar: Optional[CommandGrammar]):
+        """Constrain decoding to ``grammar``'s phrases; None decodes freely."""
+        self._grammar = grammar
+        self._grammar_key = None
+        if grammar is None and self._full_recognizer is not None:
+            self._recognizer = self._full_recognizer
+            self.grammar_size = 0
+
+    def _update_grammar(self):
+        if self._grammar is None or not config_manager.config.audio.vosk_grammar:
+            self._recognizer = self._full_recognizer
+            self.grammar_size = 0
+            return
+        key = self._grammar.signature()
+        if key == self._grammar_key:
+            return
+        import json
+        from vosk import KaldiRecognizer
+        phrases = self._grammar.phrases(shared_model.vocabulary())
+        self._recognizer = KaldiRecognizer(self._model, self._sample_rate, json.dumps(phrases))
+        self._grammar_key = key
+        self.grammar_size = len(phrases)
+
+    @property
+    def _constrained(self) -> bool:
+        return self._recognizer is not self._full_recognizer
+
+    def _resolve(self, text: str, utterance: bytes) -> str:
+        """Normalize a grammar transcript, or redecode the utterance without
+        the grammar when it fell outside it (file paths, URLs, new words)."""
+        import json
+        if not self._constrained:
+            return text
+        words = text.split()
+        if words and UNKNOWN not in words:
+            return self._grammar.normalize(text)
+        if not utterance:
+            return ""
+        self._full_recognizer.Reset()
+        self._full_recognizer.AcceptWaveform(bytes(utterance))
+        return json.loads(self._full_recognizer.FinalResult()).get("text", "")
+
+    def transcribe(self, pcm: bytes, chunk_ms: int = 200) -> ListenResult:
+        """Decode a complete 16-bit mono buffer, waiting for the model if needed."""
+        import json
+        if not self._available:
+            return ListenResult(False, "", error="Vosk not available")
+        error = self._ensure_recognizer(None)
+        if error:
+            return ListenResult(False, "", error=error)
+        self._recognizer.Reset()
+        step = self._sample_rate * SAMPLE_WIDTH * chunk_ms // 1000
+        segments = []
+        for offset in range(0, len(pcm), step):
+            if self._recognizer.AcceptWaveform(pcm[offset:offset + step]):
+                segments.append(json.loads(self._recognizer.Result()).get("text", ""))
+        segments.append(json.loads(self._recognizer.FinalResult()).get("text", ""))
+        text = self._resolve(" ".join(s for s in segments if s), pcm)
+        if text:
+            return ListenResult(True, text, confidence=0.8)
+        return ListenResult(False, "", error="No speech detected")
+
+    def set_capture(self, capture: AudioCaptureService):
+        self._capture = capture
+
+    def listen(self, timeout: float = 5.0, on_partial: Optional[PartialCallback] = None) -> ListenResult:
         if not self._available:
             return ListenResult(False, "", error="Vosk not available")
+        if self._capture is None:
+            return ListenResult(False, "", error="No audio capture configured")
         
         try:
-            import pyaudio
-            import json
-            
-            p = pyaudio.PyAudio()
-            stream = p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self._sample_rate,
-                input=True,
-                frames_per_buffer=4000
-            )
-            
-            self._recognizer.Reset()
-            start_time = time.time()
-            result_text = ""
-            
-            while time.time() - start_time < timeout:
-                data = stream.read(4000, exception_on_overflow=False)
-                if self._recognizer.AcceptWaveform(data):
-                    result = json.loads(self._recognizer.Result())
-                    if result.get("text"):
-                        result_text = result["text"]
-                        break
-            
-            if not result_text:
-                final = json.loads(self._recognizer.FinalResult())
-                result_text = final.get("text", "")
-            
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            
-            if result_text:
-                return ListenResult(True, result_text, confidence=0.8)
+            error = self._ensure_recognizer(timeout)
+            if error:
+                return ListenResult(False, "", error=error)
+            self._capture.start()
+            if not self._capture.wait_open(timeout):
+                return ListenResult(False, "", error=self._capture.error or "Audio input not ready")
+            reader = self._capture.reader()
+            try:
+                for partial, final in self.stream(reader, time.monotonic() + timeout):
+                    if final is not None:
+                        return final
+                    if on_partial is not None and on_partial(partial):
+                        return ListenResult(True, partial.text, confidence=0.7, early=True)
+            finally:
+                self._capture.mark_consumed(reader)
             return ListenResult(False, "", error="No speech detected")
             
         except Exception as e:
             return ListenResult(False, "", error=str(e))
 
+    def stream(self, reader: AudioReader, deadline: float) -> Iterator[Tuple[Optional[PartialHypothesis], Optional[ListenResult]]]:
+        """Yield ``(partial, None)`` as the hypothesis changes, then ``(None, result)``."""
+        import json
+
+        bytes_per_ms = self._sample_rate * SAMPLE_WIDTH // 1000
+        min_bytes = self.MIN_CHUNK_MS * bytes_per_ms
+        max_bytes = self.MAX_CHUNK_MS * bytes_per_ms
+        self._recognizer.Reset()
+        vad = self._vad
+        if vad is not None:
+            vad.restart()
+        heard_speech = vad is None
+        utterance = bytearray() if self._constrained else None
+        lead = b""
+        decoded = 0
+        last_text = ""
+        changed_at = 0.0
+
+        while not reader.at_end:
+            # Small chunks while live for fresh partials; larger ones only to
+            # drain a backlog (pre-roll, or after a slow decode).
+            chunk = bytearray()
+            while len(chunk) < min_bytes and not reader.at_end:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                want = max(min_bytes, min(reader.available(), max_bytes)) - len(chunk)
+                chunk += reader.read(want, timeout=remaining)
+            if not chunk:
+                break
+            ended = False
+            if vad is not None:
+                state = vad.feed(bytes(chunk))
+                ended = state.ended
+                if not heard_speech:
+                    # Pure silence is never decoded; keep one chunk of lead-in.
+                    if not state.speech:
+                        lead = bytes(chunk)
+                        continue
+                    heard_speech = True
+                    chunk = lead + chunk
+                    deadline = time.monotonic() + self._max_phrase_seconds
+            decoded += len(chunk)
+            if utterance is not None:
+                utterance += chunk
+            audio_seconds = decoded / (bytes_per_ms * 1000)
+            if self._recognizer.AcceptWaveform(bytes(chunk)):
+                text = json.loads(self._recognizer.Result()).get("text", "")
+                if text:
+                    text = self._resolve(text, utterance)
+                    yield None, ListenResult(bool(text), text, confidence=0.8,
+                                             error="" if text else "Could not understand audio")
+                    return
+                last_text = ""
+                continue
+            text = json.loads(self._recognizer.PartialResult()).get("partial", "")
+            if utterance is not None:
+                text = "" if UNKNOWN in text.split() else self._grammar.normalize(text)
+            if text != last_text:
+                last_text, changed_at = text, audio_seconds
+            if text:
+                yield PartialHypothesis(text, audio_seconds, audio_seconds - changed_at), None
+            if ended or time.monotonic() >= deadline:
+                break
+
+        if not heard_speech:
+            yield None, ListenResult(False, "", error="No speech detected")
+            return
+        text = self._resolve(json.loads(self._recognizer.FinalResult()).get("text", ""), utterance)
+        if text:
+            yield None, ListenResult(True, text, confidence=0.8)
+        else:
+            yield None, ListenResult(False, "", error="No speech detected")
+
     def is_available(self) -> bool:
         return self._available
 
@@ -119,58 +533,139 @@ class VoskSTT(BaseSTT):
 
 
 class SpeechRecognitionSTT(BaseSTT):
-    def __init__(self):
+    """speech_recognition capture with offline Sphinx decoding."""
+
+    DEFAULT_ENERGY_THRESHOLD = 300.0
+
+    def __init__(self, capture: Optional[AudioCaptureService] = None,
+                 vad: Optional[VoiceActivityDetector] = None, max_phrase_seconds: float = 10.0,
+                 energy_threshold: Optional[float] = None, network: bool = False, network_timeout: float = 3.0):
         self._recognizer = None
         self._microphone = None
         self._available = False
+        self._capture = capture if vad is not None else None
+        self._vad = vad
+        self._max_phrase_seconds = max_phrase_seconds
+        self._initial_threshold = energy_threshold or self.DEFAULT_ENERGY_THRESHOLD
+        self.network = network
+        self.network_timeout = network_timeout
+        self.sphinx = sphinx_installed()
+        self._offline: Optional[Callable[[bytes], ListenResult]] = None
+        self._network_pool: Optional[ThreadPoolExecutor] = None
         self._init_engine()
 
     def _init_engine(self):
+        # No adjust_for_ambient_noise here: the threshold starts from the
+        # saved profile and the recognizer's dynamic threshold refines it
+        # from the non-speech audio it hears while waiting for a phrase.
         try:
             import speech_recognition as sr
             self._recognizer = sr.Recognizer()
-            self._microphone = sr.Microphone()
-            with self._microphone as source:
-                self._recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            self._available = True
+            self._recognizer.energy_threshold = self._initial_threshold
+            self._recognizer.dynamic_energy_threshold = True
+            self._recognizer.operation_timeout = self.network_timeout
+            if self._vad is None:
+                self._microphone = sr.Microphone()
+            self._available = self.network or self.sphinx
         except Exception:
             self._available = False
 
-    def listen(self, timeout: float = 5.0) -> ListenResult:
+    def set_offline(self, transcribe: Optional[Callable[[bytes], ListenResult]]):
+        """Decode with ``transcribe`` instead of Sphinx when offline."""
+        self._offline = transcribe
+
+    @property
+    def energy_threshold(self) -> Optional[float]:
+        return self._recognizer.energy_threshold if self._recognizer is not None else None
+
+    def uses_capture(self) -> bool:
+        return self._vad is not None
+
+    def set_capture(self, capture: AudioCaptureService):
+        if self._vad is not None:
+            self._capture = capture
+
+    def _record(self, timeout: float):
+        import speech_recognition as sr
+
+        if self._vad is None:
+            with self._microphone as source:
+                return self._recognizer.listen(source, timeout=timeout, phrase_time_limit=self._max_phrase_seconds)
+        if self._capture is None:
+            raise OSError("No audio capture configured")
+        self._capture.start()
+        if not self._capture.wait_open(timeout):
+            raise OSError(self._capture.error or "Audio input not ready")
+        reader = self._capture.reader()
+        try:
+            pcm = record_utterance(reader, self._vad, timeout, self._max_phrase_seconds)
+        finally:
+            self._capture.mark_consumed(reader)
+        if not pcm:
+            raise sr.WaitTimeoutError("No speech detected")
+        return sr.AudioData(pcm, self._capture.sample_rate, SAMPLE_WIDTH)
+
+    def listen(self, timeout: float = 5.0, on_partial: Optional[PartialCallback] = None) -> ListenResult:
         if not self._available:
             return ListenResult(False, "", error="Speech recognition not available")
         
         try:
             import speech_recognition as sr
             
-            with self._microphone as source:
-                audio = self._recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
+            audio = self._record(timeout)
+            pcm = audio.get_raw_data(convert_rate=16000, convert_width=SAMPLE_WIDTH)
             
-            try:
-                text = self._recognizer.recognize_google(audio)
-                return ListenResult(True, text, confidence=0.85)
-            except sr.UnknownValueError:
-                return ListenResult(False, "", error="Could not understand audio")
-            except sr.RequestError:
+            # Google only when enabled; on timeout or error the same audio is
+            # decoded offline instead of recording again.
+            if self.network:
                 try:
-                    text = self._recognizer.recognize_sphinx(audio)
-                    return ListenResult(True, text, confidence=0.6)
-                except Exception:
-                    return ListenResult(False, "", error="Offline recognition failed")
+                    return self._recognize_network(audio)
+                except sr.UnknownValueError:
+                    return ListenResult(False, "", error="Could not understand audio")
+                except (sr.RequestError, FutureTimeout, OSError):
+                    pass
+            return self.transcribe(pcm)
                     
         except Exception as e:
             return ListenResult(False, "", error=str(e))
 
+    def _recognize_network(self, audio) -> ListenResult:
+        # operation_timeout only bounds each socket operation; the future
+        # bounds the whole request, and a stuck call is left to finish on
+        # the pool thread.
+        if self._network_pool is None:
+            self._network_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stt-network")
+        future = self._network_pool.submit(self._recognizer.recognize_google, audio)
+        text = future.result(timeout=self.network_timeout)
+        return ListenResult(True, text, confidence=0.85)
+
+    def transcribe(self, pcm: bytes) -> ListenResult:
+        """Decode a 16 kHz 16-bit mono buffer offline."""
+        if self._offline is not None:
+            return self._offline(pcm)
+        return self.transcribe_sphinx(pcm)
+
+    def transcribe_sphinx(self, pcm: bytes) -> ListenResult:
+        if not self.sphinx:
+            return ListenResult(False, "", error="No offline recognizer installed")
+        import speech_recognition as sr
+        try:
+            text = self._recognizer.recognize_sphinx(sr.AudioData(pcm, 16000, SAMPLE_WIDTH))
+            return ListenResult(True, text, confidence=0.6)
+        except sr.UnknownValueError:
+            return ListenResult(False, "", error="Could not understand audio")
+        except Exception:
+            return ListenResult(False, "", error="Offline recognition failed")
+
     def is_available(self) -> bool:
         return self._available
 
     def calibrate(self, duration: float = 1.0) -> None:
+        # Opening the microphone here would hold it away from a listen, so
+        # restart from the profile threshold and let the next listen adapt it.
         if self._available and self._microphone:
-            try:
-                with self._microphone as source:
-                    self._recognizer.adjust_for_ambient_noise(source, duration=duration)
-            except Exception:
-                pass
+            self._recognizer.energy_threshold = self._initial_threshold
+            self._recognizer.dynamic_energy_threshold = True
 
 
 class SpeechToText:
@@ -183,6 +678,18 @@ class SpeechToText:
         self._cooldown: float = 0.5
         self._on_result_callback: Optional[Callable[[ListenResult], None]] = None
         self._listen_thread: Optional[threading.Thread] = None
+        self._capture: Optional[AudioCaptureService] = None
+        self._calibrator: Optional[BackgroundCalibrator] = None
+        self._selector: Optional[EngineSelector] = None
+        self._local_engines: Dict[str, BaseSTT] = {}
+        self._vosk_engines: List[VoskSTT] = []
+        self._network_engine: Optional[SpeechRecognitionSTT] = None
+        self._switch_pending = False
+        self._device_lock = threading.Lock()
+        audio = config_manager.config.audio
+        self._device = device_key(audio.source) if audio.noise_profiles else None
+        self._profiles = NoiseProfileStore(config_manager.config.config_dir / "noise-profiles.json")
+        self._profile = self._profiles.get(self._device)
         self._init_engine(engine)
 
     def _init_engine(self, engine: STTEngine):
@@ -190,19 +697,147 @@ class SpeechToText:
             self._engine = None
             return
 
-        if engine == STTEngine.VOSK:
-            self._engine = VoskSTT()
+        audio = config_manager.config.audio
+        self._vad = self._create_vad()
+        if engine == STTEngine.AUTO:
+            self._init_auto()
+        elif engine == STTEngine.VOSK:
+            self._engine = VoskSTT(self._create_capture(), self._vad, audio.max_phrase_seconds)
             if not self._engine.is_available():
-                self._engine = SpeechRecognitionSTT()
+                self._engine = self._create_speech_recognition()
         elif engine == STTEngine.SPEECH_RECOGNITION:
-            self._engine = SpeechRecognitionSTT()
+            self._engine = self._create_speech_recognition()
             if not self._engine.is_available():
-                self._engine = VoskSTT()
+                self._engine = VoskSTT(self._create_capture(), self._vad, audio.max_phrase_seconds)
 
         if self._engine and not self._engine.is_available():
             self._engine = None
+        if isinstance(self._engine, SpeechRecognitionSTT) and self._engine.network:
+            self._network_engine = self._engine
+        if isinstance(self._engine, VoskSTT) and self._engine not in self._vosk_engines:
+            self._vosk_engines.append(self._engine)
+        if self._vosk_engines or (
+            isinstance(self._engine, SpeechRecognitionSTT) and self._engine.uses_capture()
+        ):
+            self._capture.start()
+            if self._vad is not None:
+                with self._device_lock:
+                    self._calibrator = BackgroundCalibrator(
+                        self._capture, self._create_vad(), self._profiles, self._device
+                    )
+                self._calibrator.start()
+
+    def _init_auto(self):
+        """Offline-first: rank the installed local engines by measured
+        real-time factor in the background, starting with Vosk meanwhile.
+        Google is only put in front when ``audio.network_stt`` is set."""
+        audio = config_manager.config.audio
+        vosk = VoskSTT(self._create_capture(), self._vad, audio.max_phrase_seconds)
+        recognizer = self._create_speech_recognition()
+        candidates: Dict[str, Callable[[bytes], ListenResult]] = {}
+        if vosk.is_available():
+            self._local_engines["vosk"] = vosk
+            # Probing decodes on its own recognizer so it can overlap a listen.
+            probe_vosk = VoskSTT()
+            self._vosk_engines += [vosk, probe_vosk]
+            candidates["vosk"] = probe_vosk.transcribe
+        if recognizer.is_available() and recognizer.sphinx:
+            self._local_engines["sphinx"] = recognizer
+            candidates["sphinx"] = recognizer.transcribe_sphinx
+        if recognizer.is_available() and recognizer.network:
+            self._network_engine = recognizer
+
+        if not candidates:
+            self._engine = self._network_engine
+            return
+        self._selector = EngineSelector(
+            candidates, synthetic_probe, max_rtf=audio.engine_max_rtf, preferred="vosk",
+            on_select=self._use_engine,
+        )
+        self._use_engine(self._selector.selected)
+        self._selector.measure_async()
+
+    def _use_engine(self, name: str):
+        local = self._local_engines[name]
+        if self._network_engine is not None:
+            self._network_engine.set_offline(None if name == "sphinx" else local.transcribe)
+            self._engine = self._network_engine
+        else:
+            self._engine = local
+
+    def select_engine(self):
+        """Re-measure the local engines without blocking the caller."""
+        if self._selector is not None:
+            self._selector.measure_async()
+
+    def _create_speech_recognition(self) -> SpeechRecognitionSTT:
+        audio = config_manager.config.audio
+        return SpeechRecognitionSTT(
+            self._create_capture(), self._vad, audio.max_phrase_seconds, self._profile.sr_threshold(),
+            network=audio.network_stt, network_timeout=audio.network_timeout,
+        )
+
+    def _create_vad(self) -> Optional[VoiceActivityDetector]:
+        audio = config_manager.config.audio
+        return create_vad(
+            audio.sample_rate, frame_ms=audio.vad_frame_ms, hangover_ms=audio.vad_hangover_ms,
+            margin_db=audio.vad_margin_db, floor_db=self._profile.noise_floor_db
+        )
+
+    def _create_capture(self) -> AudioCaptureService:
+        if self._capture is None:
+            audio = config_manager.config.audio
+            self._capture = AudioCaptureService(
+                open_audio_source(
+                    audio.source, audio.sample_rate, device_rate=audio.device_rate, device_name=audio.input_device
+                ),
+                sample_rate=audio.sample_rate,
+                buffer_seconds=audio.buffer_seconds,
+                chunk_ms=audio.chunk_ms,
+                preroll_ms=audio.preroll_ms,
+                agc=audio.agc,
+                denoise=audio.noise_suppression,
+                noise_profile=self._profile.spectrum or None,
+            )
+            if isinstance(self._capture.source, MicrophoneSource):
+                self._capture.on_open = self._on_source_opened
+                device_manager.add_listener(self._on_devices_changed)
+                device_manager.start_monitor()
+        return self._capture
+
+    def _on_source_opened(self, source: AudioSource):
+        # Runs on the capture thread before any audio from the device, so the
+        # noise suppressor and the calibrator (which seeds each listen's VAD)
+        # start from that device's own profile.
+        audio = config_manager.config.audio
+        if not audio.noise_profiles:
+            return
+        key = device_key(audio.source, getattr(source.device, "name", ""))
+        with self._device_lock:
+            if key == self._device:
+                return
+            self._device = key
+            if self._calibrator is not None:
+                self._calibrator.use_device(key)
+                self._profile = self._calibrator.profile
+            else:
+                self._profile = self._profiles.get(key)
+        self._capture.noise_profile = self._profile.spectrum or None
+
+    def _on_devices_changed(self, change: DeviceChange):
+        # Reopen when the open device may have gone, or when a preferred
+        # device we are not on may have arrived; other changes leave the
+        # stream alone. A listen in progress is never interrupted.
+        source = self._capture.source
+        if not isinstance(source, MicrophoneSource) or not self._capture.is_running():
+            return
+        if change.removed or (change.added and not source.on_preferred_device()):
+            if self._listening:
+                self._switch_pending = True
+            else:
+                self._capture.switch_source(source)
 
-    def listen_once(self, timeout: float = 5.0) -> ListenResult:
+    def listen_once(self, timeout: float = 5.0, on_partial: Optional[PartialCallback] = None) -> ListenResult:
         if not self._enabled or not self._engine:
             return ListenResult(False, "", error="Speech recognition disabled or unavailable")
         
@@ -211,18 +846,25 @@ class SpeechToText:
             return ListenResult(False, "", error="Cooldown active")
         
         self._listening = True
-        result = self._engine.listen(timeout)
+        if self._calibrator is not None and self._vad is not None:
+            self._calibrator.apply(self._vad)
+        result = self._engine.listen(timeout, on_partial)
         self._listening = False
         self._last_listen_time = time.time()
+        if self._switch_pending:
+            self._switch_pending = False
+            self._capture.switch_source(self._capture.source)
+        self._remember_threshold()
         
         return result
 
-    def listen_async(self, timeout: float = 5.0, callback: Optional[Callable[[ListenResult], None]] = None):
+    def listen_async(self, timeout: float = 5.0, callback: Optional[Callable[[ListenResult], None]] = None,
+                     on_partial: Optional[PartialCallback] = None):
         if self._listening:
             return
         
         def _listen_worker():
-            result = self.listen_once(timeout)
+            result = self.listen_once(timeout, on_partial)
             if callback:
                 callback(result)
             elif self._on_result_callback:
@@ -231,6 +873,17 @@ class SpeechToText:
         self._listen_thread = threading.Thread(target=_listen_worker, daemon=True)
         self._listen_thread.start()
 
+    def _remember_threshold(self):
+        # The microphone path has no capture to calibrate from; keep what
+        # speech_recognition's dynamic threshold learned during the listen.
+        if not isinstance(self._engine, SpeechRecognitionSTT) or self._engine.uses_capture():
+            return
+        threshold = self._engine.energy_threshold
+        saved = self._profile.energy_threshold
+        if threshold and (not saved or abs(threshold - saved) > 0.1 * saved):
+            self._profile.energy_threshold = threshold
+            self._profiles.put(self._device, self._profile)
+
     def set_callback(self, callback: Callable[[ListenResult], None]):
         self._on_result_callback = callback
 
@@ -247,6 +900,69 @@ class SpeechToText:
         self._enabled = False
         self._listening = False
 
+    def close(self):
+        self._listening = False
+        device_manager.remove_listener(self._on_devices_changed)
+        if self._calibrator is not None:
+            self._calibrator.stop()
+        if self._capture is not None:
+            self._capture.stop()
+
+    def set_grammar(self, grammar: Optional[CommandGrammar]):
+        for engine in self._vosk_engines:
+            engine.set_grammar(grammar)
+
+    def create_wake_word_spotter(self, phrases, on_detect) -> Optional["WakeWordSpotter"]:
+        """Keyword spotter sharing this engine's capture, if Vosk is usable."""
+        if not (find_model_path() and vosk_installed()):
+            return None
+        from listener.wake_word import WakeWordSpotter
+        shared_model.load_async()
+        return WakeWordSpotter(self._create_capture(), phrases, on_detect, self._create_vad())
+
+    def get_capture_stats(self) -> Dict[str, float]:
+        return self._capture.get_stats() if self._capture is not None else {}
+
+    def get_status(self) -> Dict[str, str]:
+        status = {}
+        if self._selector is not None:
+            status["Speech Engine"] = self._selector.describe()
+        elif self._engine is not None:
+            status["Speech Engine"] = "vosk" if isinstance(self._engine, VoskSTT) else "sphinx"
+        if self._network_engine is not None:
+            status["Speech Engine"] = (
+                f"google (network, {self._network_engine.network_timeout:.0f} s timeout), "
+                f"offline {status.get('Speech Engine', 'unavailable')}"
+            )
+        if self._vosk_engines:
+            model = shared_model.get_stats()
+            name = os.path.basename(model["path"].rstrip(os.sep))
+            if model["state"] == "ready":
+                status["Speech Model"] = (
+                    f"{name}, loaded in {model['load_ms'] / 1000:.1f} s, "
+                    f"+{model['model_mb']:.0f} MB (process RSS {model['rss_mb']:.0f} MB)"
+                )
+            else:
+                status["Speech Model"] = f"{name}, {model['state']}"
+            grammar_size = self._vosk_engines[0].grammar_size
+            if grammar_size:
+                status["Speech Model"] += f", grammar of {grammar_size} phrases"
+        if self._calibrator is not None:
+            floor = self._calibrator.profile.floor_dbfs
+            if floor is None:
+                status["Noise Floor"] = "measuring"
+            else:
+                source = "live" if self._calibrator.refined else "saved profile"
+                status["Noise Floor"] = f"{floor:.0f} dBFS ({source})"
+        elif isinstance(self._engine, SpeechRecognitionSTT) and self._engine.energy_threshold:
+            status["Noise Floor"] = f"energy threshold {self._engine.energy_threshold:.0f}"
+        source = self._capture.source if self._capture is not None else None
+        if isinstance(source, MicrophoneSource) and source.device is not None:
+            status["Input Device"] = f"{source.device.name} ({source.sample_rate} Hz)"
+            if self._capture.switch_error:
+                status["Input Device"] += f", last switch failed: {self._capture.switch_error}"
+        return status
+
     def is_enabled(self) -> bool:
         return self._enabled
 
@@ -254,7 +970,9 @@ class SpeechToText:
         return self._engine is not None and self._engine.is_available()
 
     def calibrate(self, duration: float = 1.0):
-        if self._engine:
+        if self._calibrator is not None:
+            self._calibrator.recalibrate()
+        elif self._engine:
             self._engine.calibrate(duration)
 
     def set_cooldown(self, seconds: float):
@@ -0,0 +1,137 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MIN_FLOOR_DB = 30.0
+FLOOR_BLOCK_MS = 100
+
+
+@dataclass
+class VADResult:
+    speech: bool
+    started: bool = False
+    ended: bool = False
+
+
+class VoiceActivityDetector:
+    """Energy + zero-crossing endpointer over fixed 10-30 ms frames."""
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, hangover_ms: int = 300,
+                 onset_ms: int = 60, margin_db: float = 9.0, zcr_threshold: float = 0.25,
+                 floor_db: Optional[float] = None, adapt_rate: float = 0.05,
+                 floor_window_ms: int = 1500):
+        if np is None:
+            raise ImportError("Voice activity detection requires numpy")
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.onset_frames = max(1, onset_ms // frame_ms)
+        self.margin_db = margin_db
+        self.zcr_threshold = zcr_threshold
+        self.adapt_rate = adapt_rate
+        self.block_frames = max(1, FLOOR_BLOCK_MS // frame_ms)
+        self.floor_blocks = max(1, floor_window_ms // FLOOR_BLOCK_MS)
+        self.initial_floor_db = floor_db
+        self.reset()
+
+    def reset(self):
+        self.noise_floor_db = self.initial_floor_db
+        self._block_minima = deque(maxlen=self.floor_blocks)
+        self._block_min = float("inf")
+        self._block_count = 0
+        self.restart()
+
+    def restart(self):
+        """Start a new utterance, keeping the learned noise floor."""
+        self.in_speech = False
+        self.speech_frames = 0
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._remainder = b""
+
+    def set_floor(self, floor_db: float):
+        """Replace the tracked floor with an outside estimate, e.g. a saved
+        calibration profile, dropping minima learned before it."""
+        self.noise_floor_db = floor_db
+        self._block_minima.clear()
+        self._block_min = float("inf")
+        self._block_count = 0
+
+    def frame_features(self, pcm: bytes):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        count = len(samples) // self.frame_samples
+        frames = samples[:count * self.frame_samples].reshape(count, self.frame_samples).astype(np.float32)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1.0)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_samples - 1)
+        return energy_db, zcr
+
+    def feed(self, pcm: bytes) -> VADResult:
+        pcm = self._remainder + pcm
+        usable = len(pcm) - len(pcm) % (self.frame_samples * 2)
+        self._remainder = pcm[usable:]
+        if not usable:
+            return VADResult(self.in_speech)
+        energy_db, zcr = self.frame_features(pcm[:usable])
+        if self.noise_floor_db is None:
+            self.noise_floor_db = max(MIN_FLOOR_DB, float(np.percentile(energy_db, 10)))
+
+        result = VADResult(False)
+        floor = self.noise_floor_db
+        for energy, crossings in zip(energy_db.tolist(), zcr.tolist()):
+            loudness = energy - floor
+            # Quieter frames with many zero crossings are fricatives.
+            voiced = loudness > self.margin_db or (
+                loudness > self.margin_db / 2 and crossings > self.zcr_threshold
+            )
+            floor = self._track_floor(energy, floor)
+
+            if voiced:
+                result.speech = True
+                self._voiced_run += 1
+                self._silent_run = 0
+                if not self.in_speech and self._voiced_run >= self.onset_frames:
+                    self.in_speech = True
+                    result.started = True
+            else:
+                self._voiced_run = 0
+                self._silent_run += 1
+                if self.in_speech and self._silent_run >= self.hangover_frames:
+                    self.in_speech = False
+                    result.ended = True
+            if self.in_speech:
+                self.speech_frames += 1
+        self.noise_floor_db = floor
+        return result
+
+    def _track_floor(self, energy: float, floor: float) -> float:
+        # Minimum over a window: pauses between words hold the floor at the
+        # room level, while a fan turning on raises it within the window.
+        if energy < floor:
+            return max(MIN_FLOOR_DB, energy)
+        self._block_min = min(self._block_min, energy)
+        self._block_count += 1
+        if self._block_count >= self.block_frames:
+            self._block_minima.append(self._block_min)
+            self._block_min = float("inf")
+            self._block_count = 0
+        if len(self._block_minima) < self.floor_blocks:
+            return floor
+        target = min(self._block_minima)
+        return floor + (target - floor) * self.adapt_rate
+
+
+def create_vad(sample_rate: int, frame_ms: int = 20, hangover_ms: int = 300,
+               margin_db: float = 9.0, floor_db: Optional[float] = None) -> Optional[VoiceActivityDetector]:
+    if np is None:
+        return None
+    return VoiceActivityDetector(
+        sample_rate, frame_ms=frame_ms, hangover_ms=hangover_ms, margin_db=margin_db, floor_db=floor_db
+    )
@@ -0,0 +1,137 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Optional, Set
+
+
+MODEL_PATHS = [
+    "~/.vosk/model",
+    "~/vosk-model-small-en-us-0.15",
+    "model",
+    "vosk-model",
+]
+
+
+def find_model_path() -> Optional[str]:
+    for path in MODEL_PATHS:
+        path = os.path.expanduser(path)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def vosk_installed() -> bool:
+    return importlib.util.find_spec("vosk") is not None
+
+
+def resident_memory_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+
+class SharedModel:
+    """The process-wide Vosk model, loaded once on a background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self.path: Optional[str] = None
+        self.load_seconds = 0.0
+        self.model_mb = 0.0
+        self._vocabulary: Optional[Set[str]] = None
+
+    def load_async(self, path: Optional[str] = None) -> Future:
+        with self._lock:
+            if self._future is not None:
+                return self._future
+            self.path = path or find_model_path()
+            self._future = Future()
+            self._future.set_running_or_notify_cancel()
+            threading.Thread(target=self._load, args=(self._future, self.path), daemon=True).start()
+            return self._future
+
+    def wait_ready(self, timeout: Optional[float] = None):
+        """The loaded model, or None if not ready in time; raises if loading failed."""
+        future = self.load_async()
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            return None
+
+    def vocabulary(self) -> Optional[Set[str]]:
+        """Words the model can output, or None if it ships no words.txt."""
+        if self._vocabulary is None and self.path:
+            try:
+                with open(os.path.join(self.path, "graph", "words.txt"), encoding="utf-8") as f:
+                    self._vocabulary = {line.split(None, 1)[0] for line in f if line.strip()}
+            except OSError:
+                return None
+        return self._vocabulary
+
+    def is_ready(self) -> bool:
+        future = self._future
+        return future is not None and future.done() and future.exception() is None
+
+    def get_stats(self) -> Dict[str, object]:
+        future = self._future
+        if future is None:
+            state = "idle"
+        elif not future.done():
+            state = "loading"
+        elif future.exception() is not None:
+            state = f"failed: {future.exception()}"
+        else:
+            state = "ready"
+        return {
+            "state": state,
+            "path": self.path or "",
+            "load_ms": self.load_seconds * 1000,
+            "model_mb": self.model_mb,
+            "rss_mb": resident_memory_mb(),
+        }
+
+    def _load(self, future: Future, path: Optional[str]):
+        try:
+            if path is None:
+                raise FileNotFoundError("No Vosk model found")
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            rss_before = resident_memory_mb()
+            start = time.perf_counter()
+            model = Model(path)
+            self.load_seconds = time.perf_counter() - start
+            self.model_mb = max(0.0, resident_memory_mb() - rss_before)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        future.set_result(model)
+
+    def _after_fork_in_child(self):
+        # A loaded model is inherited copy-on-write, but the loader thread
+        # does not survive the fork, so a load in flight starts over.
+        self._lock = threading.Lock()
+        if self._future is not None and not self._future.done():
+            # The fork may have caught the loader halfway through importing vosk.
+            module = sys.modules.get("vosk")
+            if module is not None and not hasattr(module, "Model"):
+                for name in [n for n in sys.modules if n == "vosk" or n.startswith("vosk.")]:
+                    del sys.modules[name]
+            self._future = None
+            self.load_async(self.path)
+
+
+shared_model = SharedModel()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=shared_model._after_fork_in_child)
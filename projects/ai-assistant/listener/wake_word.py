@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from listener.stt import SAMPLE_WIDTH, AudioCaptureService
+from listener.vad import VoiceActivityDetector
+from listener.vosk_model import shared_model
+
+
+@dataclass
+class Detection:
+    phrase: str
+    end_position: int
+    latency: float
+
+
+class WakeWordDetector:
+    """Keyword spotter: a VAD gate in front of a Vosk recognizer whose
+    grammar holds only the wake phrases and ``[unk]``."""
+
+    def __init__(self, model, phrases: List[str], sample_rate: int = 16000,
+                 vad: Optional[VoiceActivityDetector] = None):
+        from vosk import KaldiRecognizer
+        self.phrases = [phrase.lower().split() for phrase in phrases]
+        self.sample_rate = sample_rate
+        self.vad = vad
+        self._recognizer = KaldiRecognizer(model, sample_rate, json.dumps(list(phrases) + ["[unk]"]))
+        try:
+            self._recognizer.SetPartialWords(True)
+            self.word_times = True
+        except AttributeError:
+            self.word_times = False
+        self._active = False
+        self._segment_start = 0
+        self._lead = b""
+        self._lead_position = 0
+        self.decoded_bytes = 0
+
+    def reset(self):
+        self._recognizer.Reset()
+        self._active = False
+        self._lead = b""
+        if self.vad is not None:
+            self.vad.restart()
+
+    def process(self, chunk: bytes, position: int) -> Optional[Detection]:
+        """Feed the chunk starting at byte ``position``; reports where a wake phrase ended."""
+        if self.vad is not None:
+            state = self.vad.feed(chunk)
+            if not self._active:
+                if not state.speech:
+                    self._lead, self._lead_position = chunk, position
+                    return None
+                self._active = True
+                self._recognizer.Reset()
+                if self._lead_position + len(self._lead) == position:
+                    chunk, position = self._lead + chunk, self._lead_position
+                self._segment_start = position
+            elif state.ended:
+                self._active = False
+        elif not self._active:
+            self._active = True
+            self._segment_start = position
+
+        self.decoded_bytes += len(chunk)
+        end = position + len(chunk)
+        if self._recognizer.AcceptWaveform(chunk):
+            words = json.loads(self._recognizer.Result()).get("result", [])
+            hypothesis = [(w.get("word", ""), w.get("end")) for w in words]
+            if self.vad is not None:
+                self._active = self.vad.in_speech
+        else:
+            partial = json.loads(self._recognizer.PartialResult())
+            if "partial_result" in partial:
+                hypothesis = [(w.get("word", ""), w.get("end")) for w in partial["partial_result"]]
+            else:
+                hypothesis = [(w, None) for w in partial.get("partial", "").split()]
+        detection = self._match(hypothesis, end)
+        if detection is not None:
+            self._recognizer.Reset()
+            self._active = False
+            self._lead = b""
+        return detection
+
+    def _match(self, hypothesis, end: int) -> Optional[Detection]:
+        words = [word for word, _ in hypothesis]
+        for phrase in self.phrases:
+            for i in range(len(words) - len(phrase) + 1):
+                if words[i:i + len(phrase)] == phrase:
+                    word_end = hypothesis[i + len(phrase) - 1][1]
+                    if word_end is None:
+                        return Detection(" ".join(phrase), end, 0.0)
+                    bytes_per_second = self.sample_rate * SAMPLE_WIDTH
+                    position = self._segment_start + int(word_end * self.sample_rate) * SAMPLE_WIDTH
+                    position = min(position, end)
+                    return Detection(" ".join(phrase), position, (end - position) / bytes_per_second)
+        return None
+
+
+class WakeWordSpotter:
+    """Runs a ``WakeWordDetector`` on its own reader of the capture ring
+    buffer and calls ``on_detect`` from that thread. Paused while a command
+    is being handled so the two recognizers never decode the same audio.
+    """
+
+    def __init__(self, capture: AudioCaptureService, phrases: List[str],
+                 on_detect: Callable[[Detection], None], vad: Optional[VoiceActivityDetector] = None,
+                 chunk_ms: int = 100):
+        self.capture = capture
+        self.phrases = phrases
+        self.on_detect = on_detect
+        self.vad = vad
+        self.chunk_bytes = capture.sample_rate * chunk_ms // 1000 * SAMPLE_WIDTH
+        self.detections = 0
+        self.error = ""
+        self._detector: Optional[WakeWordDetector] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._running = threading.Event()
+        self._started = 0.0
+        self._cpu_seconds = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.resume()
+            return
+        self._stop.clear()
+        self._running.set()
+        self.capture.start()
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._running.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def get_stats(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return {
+            "detections": self.detections,
+            "cpu_percent": self._cpu_seconds / elapsed * 100,
+            "paused": int(not self._running.is_set()),
+        }
+
+    def _run(self):
+        try:
+            model = shared_model.wait_ready()
+            self._detector = WakeWordDetector(model, self.phrases, self.capture.sample_rate, self.vad)
+        except Exception as e:
+            self.error = str(e)
+            return
+        cpu_start = time.thread_time()
+        reader = self.capture.reader(preroll_ms=0)
+        while not self._stop.is_set():
+            if not self._running.is_set():
+                self._cpu_seconds = time.thread_time() - cpu_start
+                self._running.wait()
+                self._detector.reset()
+                reader = self.capture.reader(preroll_ms=0)
+                continue
+            position = max(reader.position, self.capture.ring.oldest())
+            chunk = bytearray()
+            while len(chunk) < self.chunk_bytes and not reader.at_end and not self._stop.is_set():
+                chunk += reader.read(self.chunk_bytes - len(chunk), timeout=0.5)
+            if reader.at_end and not chunk:
+                break
+            if not chunk:
+                continue
+            detection = self._detector.process(bytes(chunk), position)
+            self._cpu_seconds = time.thread_time() - cpu_start
+            if detection is not None:
+                self.detections += 1
+                self.capture.resume_from(detection.end_position)
+                self.pause()
+                self.on_detect(detection)
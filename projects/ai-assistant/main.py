@@ -17,6 +17,10 @@ def parse_arguments():
 Examples:
   python main.py              Start GUI mode (default)
   python main.py --voice      Start GUI with voice support
+  python main.py --voice --audio-source cmd.wav
+                              Feed voice input from a mono WAV file
+  python main.py --transcribe notes/ --workers 4
+                              Transcribe a directory of recordings to JSON lines
   python main.py --cli        Start CLI mode
   python main.py --safe-mode  Start in safe mode (read-only)
   python main.py --version    Show version information
@@ -65,6 +69,26 @@ Examples:
         help="Enable voice input/output in GUI mode"
     )
     
+    parser.add_argument(
+        "--audio-source",
+        type=str,
+        help="Voice input source: 'mic' (default), 'mic:<device index or name>', a 16-bit mono WAV file, "
+             "'raw:<path>' or a .raw/.pcm file of 16-bit PCM, or '-' for WAV on stdin"
+    )
+    
+    parser.add_argument(
+        "--transcribe",
+        type=str,
+        metavar="DIR",
+        help="Transcribe every .wav/.raw/.pcm file in DIR with Vosk and print JSON lines"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --transcribe (default: one per CPU)"
+    )
+    
     return parser.parse_args()
 
 
@@ -97,6 +121,40 @@ def run_single_command(command: str, safe_mode: bool = False):
     return 0 if result.status.value == "success" else 1
 
 
+def run_transcribe(directory: str, workers=None):
+    import json
+    import time
+    from listener.batch import find_audio_files, transcribe_files
+    from listener.vosk_model import find_model_path, vosk_installed
+    
+    if not (vosk_installed() and find_model_path()):
+        print("Error: --transcribe needs the vosk package and a model (see README).", file=sys.stderr)
+        return 1
+    try:
+        paths = find_audio_files(directory)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not paths:
+        print(f"Error: no .wav/.raw/.pcm files in {directory}", file=sys.stderr)
+        return 1
+    
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    failures = 0
+    for record in transcribe_files(paths, workers):
+        audio_seconds += record.get("audio_s", 0.0)
+        failures += "error" in record
+        print(json.dumps(record), flush=True)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(paths)} files, {audio_seconds:.1f} s of audio in {elapsed:.1f} s "
+        f"({audio_seconds / max(elapsed, 1e-9):.1f}x real time), {failures} failed",
+        file=sys.stderr
+    )
+    return 0 if not failures else 1
+
+
 def run_interactive(safe_mode: bool = False, quiet: bool = False):
     from brain.router import CommandRouter
     from interfaces.cli import CLIInterface
@@ -135,6 +193,13 @@ def main():
         show_version()
         return 0
     
+    if args.audio_source:
+        from utils.config import config_manager
+        config_manager.config.audio.source = args.audio_source
+    
+    if args.transcribe:
+        return run_transcribe(args.transcribe, args.workers)
+    
     if args.command:
         return run_single_command(args.command, args.safe_mode)
     
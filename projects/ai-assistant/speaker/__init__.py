@@ -1,3 +1,4 @@
+from speaker.speech_queue import SpeechPriority
 from speaker.tts import TextToSpeech, TTSEngine
 
-__all__ = ["TextToSpeech", "TTSEngine"]
+__all__ = ["TextToSpeech", "TTSEngine", "SpeechPriority"]
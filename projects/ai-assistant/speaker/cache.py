@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+CACHE_SUFFIX = ".wav"
+
+
+def phrase_key(parts: Sequence[object], text: str) -> str:
+    """Stable file name for one rendering of ``text``; ``parts`` are the
+    engine, voice and rate it was rendered with."""
+    payload = json.dumps([*parts, text], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """Rendered phrases as WAV files in one directory, LRU-bounded by total size."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._scanned = False
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._scan()
+            return key in self._entries
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Path]:
+        with self._lock:
+            self._scan()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self.path_for(key)
+            if not path.exists():
+                self._total -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # The scan orders by mtime, so this keeps recency across restarts.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def add(self, key: str, render: Callable[[str], bool]) -> Optional[Path]:
+        """Render into a temporary file with ``render(path)`` and move it into
+        place, so a half-written file is never played."""
+        path = self.path_for(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if not render(str(tmp_path)):
+                tmp_path.unlink(missing_ok=True)
+                return None
+            size = tmp_path.stat().st_size
+            if size > self.max_bytes:
+                tmp_path.unlink(missing_ok=True)
+                return None
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        with self._lock:
+            self._scan()
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total += size
+            self._evict()
+        return path
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self.path_for(key).unlink(missing_ok=True)
+            self._entries.clear()
+            self._total = 0
+
+    def _scan(self):
+        if self._scanned:
+            return
+        self._scanned = True
+        found = []
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if entry.name.endswith(".tmp"):
+                        # Left behind by a render that never finished.
+                        Path(entry.path).unlink(missing_ok=True)
+                    elif entry.name.endswith(CACHE_SUFFIX) and entry.is_file():
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, entry.name[:-len(CACHE_SUFFIX)], stat.st_size))
+        except OSError:
+            return
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
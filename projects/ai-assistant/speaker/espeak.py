@@ -0,0 +1,114 @@
+import ctypes
+import ctypes.util
+import threading
+
+AUDIO_OUTPUT_PLAYBACK = 0
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+ESPEAK_INITIALIZE_DONT_EXIT = 0x8000
+ESPEAK_CHARS_UTF8 = 1
+ESPEAK_RATE = 1
+POS_CHARACTER = 1
+EE_OK = 0
+
+SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+# Kept alive for as long as the library may call it; 0 means carry on.
+_discard_samples = SYNTH_CALLBACK(lambda samples, count, events: 0)
+
+_lib = None
+_searched = False
+_lib_lock = threading.Lock()
+
+
+def load_libespeak():
+    """libespeak-ng (or the older libespeak), or None if neither is installed."""
+    global _lib, _searched
+    with _lib_lock:
+        if _searched:
+            return _lib
+        _searched = True
+        for name in ("espeak-ng", "espeak"):
+            path = ctypes.util.find_library(name)
+            if not path:
+                continue
+            try:
+                lib = ctypes.CDLL(path)
+            except OSError:
+                continue
+            lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+            lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+            lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+            lib.espeak_SetSynthCallback.argtypes = [SYNTH_CALLBACK]
+            lib.espeak_SetSynthCallback.restype = None
+            lib.espeak_Synth.argtypes = [
+                ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int, ctypes.c_uint, ctypes.c_uint,
+                ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p,
+            ]
+            _lib = lib
+            break
+        return _lib
+
+
+class EspeakLibrary:
+    """libespeak-ng loaded in process: voice and rate are set once, and each
+    utterance waits on ``espeak_Synchronize``, which returns when the audio
+    has finished playing or ``stop`` cancelled it."""
+
+    # The library keeps one synthesizer per process, so every instance shares it.
+    _initialized = False
+
+    def __init__(self, rate: int = 175, voice: str = "", playback: bool = True):
+        self.rate = rate
+        self.voice = voice
+        # Without playback, synthesis runs on the calling thread and the
+        # samples are dropped, which is what benchmarks time.
+        self.playback = playback
+        self.sample_rate = 0
+        self._lib = load_libespeak()
+        self._speaking = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self) -> bool:
+        if self._lib is None:
+            return False
+        with _lib_lock:
+            if not EspeakLibrary._initialized:
+                output = AUDIO_OUTPUT_PLAYBACK if self.playback else AUDIO_OUTPUT_SYNCHRONOUS
+                self.sample_rate = self._lib.espeak_Initialize(output, 0, None, ESPEAK_INITIALIZE_DONT_EXIT)
+                if self.sample_rate <= 0:
+                    return False
+                self._lib.espeak_SetSynthCallback(_discard_samples)
+                EspeakLibrary._initialized = True
+            self._lib.espeak_SetParameter(ESPEAK_RATE, self.rate, 0)
+            if self.voice:
+                self._lib.espeak_SetVoiceByName(self.voice.encode("utf-8"))
+        return True
+
+    def is_available(self) -> bool:
+        return self._lib is not None and EspeakLibrary._initialized
+
+    def speak(self, text: str) -> bool:
+        """Speak one utterance and wait for it to finish; False if it was
+        stopped or espeak reported an error."""
+        data = " ".join(text.split()).encode("utf-8")
+        if not data:
+            return True
+        if not self.is_available():
+            return False
+        with self._speaking:
+            self._stopped.clear()
+            buffer = ctypes.create_string_buffer(data)
+            result = self._lib.espeak_Synth(
+                buffer, len(data) + 1, 0, POS_CHARACTER, 0, ESPEAK_CHARS_UTF8, None, None
+            )
+            if result != EE_OK:
+                return False
+            self._lib.espeak_Synchronize()
+            return not self._stopped.is_set()
+
+    def stop(self):
+        self._stopped.set()
+        if self.is_available():
+            self._lib.espeak_Cancel()
+
+    def close(self):
+        self.stop()
@@ -0,0 +1,84 @@
+import platform
+import shutil
+import subprocess
+import threading
+from typing import List, Optional
+
+LINUX_PLAYERS = (["paplay"], ["pw-play"], ["aplay", "-q"])
+
+
+def player_command() -> Optional[List[str]]:
+    system = platform.system().lower()
+    if system == "darwin":
+        return ["afplay"] if shutil.which("afplay") else None
+    if system == "linux":
+        for command in LINUX_PLAYERS:
+            if shutil.which(command[0]):
+                return list(command)
+    return None
+
+
+class WavPlayer:
+    """Plays WAV files through the platform's command-line player, or
+    ``winsound`` on Windows."""
+    # A player process per file keeps PortAudio out of the output path, so
+    # playback never blocks rescanning the input device list.
+
+    def __init__(self):
+        self._system = platform.system().lower()
+        self._command = player_command()
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def is_available(self) -> bool:
+        return self._command is not None or self._system == "windows"
+
+    @property
+    def stopped(self) -> bool:
+        """Whether the last ``play`` was cut off by ``stop``."""
+        return self._stopped.is_set()
+
+    def play(self, path: str) -> bool:
+        """Play ``path`` to the end; False if stopped or it failed."""
+        self._stopped.clear()
+        if self._system == "windows":
+            return self._play_winsound(path)
+        if self._command is None:
+            return False
+        with self._lock:
+            if self._stopped.is_set():
+                return False
+            try:
+                self._process = subprocess.Popen(
+                    self._command + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                return False
+            process = self._process
+        returncode = process.wait()
+        with self._lock:
+            self._process = None
+        return returncode == 0 and not self._stopped.is_set()
+
+    def stop(self):
+        self._stopped.set()
+        if self._system == "windows":
+            try:
+                import winsound
+                winsound.PlaySound(None, winsound.SND_PURGE)
+            except (ImportError, RuntimeError):
+                pass
+            return
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.terminate()
+
+    def _play_winsound(self, path: str) -> bool:
+        try:
+            import winsound
+            # Synchronous; SND_PURGE from stop() ends it early.
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_NODEFAULT)
+            return not self._stopped.is_set()
+        except (ImportError, RuntimeError):
+            return False
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import List, Optional
+
+
+class SpeechPriority(IntEnum):
+    URGENT = 0  # confirmation prompts; cut off anything less urgent
+    NORMAL = 1  # command results
+    INFO = 2    # long informational output (help, status, lists)
+
+
+@dataclass
+class Utterance:
+    text: str
+    priority: SpeechPriority = SpeechPriority.NORMAL
+    kind: Optional[str] = None
+    spoken: bool = False
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def finish(self, spoken: bool):
+        self.spoken = spoken
+        self.done.set()
+
+    def supersedes(self, other: "Utterance") -> bool:
+        """Whether this should cut ``other`` off while it is being spoken."""
+        return self.priority < other.priority or (self.kind is not None and self.kind == other.kind)
+
+
+class SpeechQueue:
+    """Pending utterances, most urgent first and in arrival order within a
+    priority."""
+
+    def __init__(self):
+        self._heap: list = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def put(self, utterance: Utterance) -> List[Utterance]:
+        """Queue ``utterance``; returns the queued ones it replaced."""
+        with self._cond:
+            dropped = []
+            if utterance.kind is not None:
+                kept = [entry for entry in self._heap if entry[2].kind != utterance.kind]
+                if len(kept) != len(self._heap):
+                    dropped = [entry[2] for entry in self._heap if entry[2].kind == utterance.kind]
+                    self._heap = kept
+                    heapq.heapify(self._heap)
+            heapq.heappush(self._heap, (utterance.priority, next(self._order), utterance))
+            self._cond.notify()
+        return dropped
+
+    def get(self) -> Optional[Utterance]:
+        """Next utterance to speak, or None once the queue is closed."""
+        with self._cond:
+            while not self._heap and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def clear(self) -> List[Utterance]:
+        with self._cond:
+            dropped = [entry[2] for entry in sorted(self._heap)]
+            self._heap = []
+        return dropped
+
+    def close(self) -> List[Utterance]:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return self.clear()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
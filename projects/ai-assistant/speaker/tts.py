@@ -1,9 +1,20 @@
+import io
+import os
+import re
 import threading
-import queue
+import wave
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from enum import Enum, auto
 
+from speaker.cache import PhraseCache, phrase_key
+from speaker.playback import WavPlayer
+from speaker.speech_queue import SpeechPriority, SpeechQueue, Utterance
+from utils.config import config_manager
+
 
 class TTSEngine(Enum):
     PYTTSX3 = auto()
@@ -11,11 +22,83 @@ class TTSEngine(Enum):
     DISABLED = auto()
 
 
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+CLAUSE_BREAK = re.compile(r"(?<=[,;:])\s+")
+MAX_CHUNK_CHARS = 120
+SEEN_PHRASES = 1024
+
+
+def split_for_speech(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Sentences and lines, with long sentences split further at clause
+    punctuation, so the first chunk is short enough to start quickly."""
+    chunks = []
+    for sentence in SENTENCE_BREAK.split(text):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in CLAUSE_BREAK.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _is_wav(path: str) -> bool:
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getnframes() > 0
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+def _rewrap_wav(data: bytes, path: str) -> bool:
+    """Write a WAV stream from a pipe to ``path``. A synthesizer writing to
+    stdout cannot seek back to fill in the chunk sizes, so the samples are
+    taken from after the data chunk header and given a proper one."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as src:
+            params = (src.getnchannels(), src.getsampwidth(), src.getframerate())
+    except (wave.Error, EOFError):
+        return False
+    start = data.find(b"data", 12)
+    frames = data[start + 8:] if start >= 0 else b""
+    if not frames:
+        return False
+    with wave.open(path, "wb") as dst:
+        dst.setnchannels(params[0])
+        dst.setsampwidth(params[1])
+        dst.setframerate(params[2])
+        dst.writeframes(frames)
+    return True
+
+
 class BaseTTS(ABC):
     @abstractmethod
     def speak(self, text: str) -> bool:
         pass
 
+    def cache_key(self) -> Optional[Tuple]:
+        """Engine, voice and rate the rendered audio depends on, or None if
+        this engine cannot render to a file."""
+        return None
+
+    def render(self, text: str, path: str) -> bool:
+        """Synthesize ``text`` into a WAV file at ``path`` without playing it."""
+        return False
+
+    @property
+    def renders_concurrently(self) -> bool:
+        """Whether ``render`` can run while ``speak`` is talking."""
+        return False
+
     @abstractmethod
     def stop(self) -> None:
         pass
@@ -26,24 +109,32 @@ class BaseTTS(ABC):
 
 
 class Pyttsx3TTS(BaseTTS):
-    def __init__(self):
+    def __init__(self, rate: int = 175, voice: str = ""):
         self._engine = None
         self._lock = threading.Lock()
         self._initialized = False
+        self.rate = rate
+        self.voice = voice
         self._init_engine()
 
     def _init_engine(self):
         try:
             import pyttsx3
             self._engine = pyttsx3.init()
-            self._engine.setProperty('rate', 175)
+            self._engine.setProperty('rate', self.rate)
             self._engine.setProperty('volume', 0.9)
             voices = self._engine.getProperty('voices')
             if voices:
+                wanted = self.voice.lower()
                 for voice in voices:
-                    if 'english' in voice.name.lower() or 'en' in voice.id.lower():
+                    if wanted:
+                        match = wanted == voice.id.lower() or wanted in voice.name.lower()
+                    else:
+                        match = 'english' in voice.name.lower() or 'en' in voice.id.lower()
+                    if match:
                         self._engine.setProperty('voice', voice.id)
                         break
+            self.voice = self._engine.getProperty('voice') or self.voice
             self._initialized = True
         except Exception:
             self._initialized = False
@@ -69,12 +160,40 @@ class Pyttsx3TTS(BaseTTS):
     def is_available(self) -> bool:
         return self._initialized
 
+    def cache_key(self) -> Optional[Tuple]:
+        return ("pyttsx3", self.voice, self.rate)
+
+    def render(self, text: str, path: str) -> bool:
+        if not self._initialized or not self._engine:
+            return False
+        try:
+            with self._lock:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+            # Only the WAV output of the espeak and SAPI drivers is kept;
+            # the macOS driver writes AIFF.
+            return _is_wav(path)
+        except Exception:
+            return False
+
 
 class SystemTTS(BaseTTS):
-    def __init__(self):
+    def __init__(self, rate: int = 175, voice: str = ""):
         import platform
         self._system = platform.system().lower()
+        self.rate = rate
+        self.voice = voice
+        self._binary = ""
+        self._process = None
+        self._process_lock = threading.Lock()
+        self._stopped = threading.Event()
         self._available = self._check_availability()
+        self._espeak = None
+        if self._available and self._system == "linux":
+            from speaker.espeak import EspeakLibrary
+            espeak = EspeakLibrary(rate, voice)
+            if espeak.start():
+                self._espeak = espeak
 
     def _check_availability(self) -> bool:
         import subprocess
@@ -83,11 +202,12 @@ class SystemTTS(BaseTTS):
                 subprocess.run(["which", "say"], capture_output=True, check=True)
                 return True
             elif self._system == "linux":
-                result = subprocess.run(["which", "espeak"], capture_output=True)
-                if result.returncode == 0:
-                    return True
-                result = subprocess.run(["which", "espeak-ng"], capture_output=True)
-                return result.returncode == 0
+                for binary in ("espeak", "espeak-ng"):
+                    result = subprocess.run(["which", binary], capture_output=True)
+                    if result.returncode == 0:
+                        self._binary = binary
+                        return True
+                return False
             elif self._system == "windows":
                 return True
         except Exception:
@@ -95,53 +215,138 @@ class SystemTTS(BaseTTS):
         return False
 
     def speak(self, text: str) -> bool:
+        if not self._available:
+            return False
+        if self._espeak is not None:
+            return self._espeak.speak(text)
+        # Text is passed on stdin, as one argv entry or through the environment,
+        # never spliced into a command line, so it needs no escaping.
+        if self._system == "linux":
+            return self._run([self._binary] + self._voice_args(), input=" ".join(text.split()))
+        if self._system == "darwin":
+            return self._run(["say"] + self._voice_args() + [text])
+        if self._system == "windows":
+            ps_script = ('Add-Type -AssemblyName System.Speech; $synth = New-Object System.Speech.Synthesis.SpeechSynthesizer; '
+                         '$synth.Speak($env:TTS_SPEAK_TEXT)')
+            return self._run(["powershell", "-NoProfile", "-Command", ps_script],
+                             env=dict(os.environ, TTS_SPEAK_TEXT=text))
+        return False
+
+    def _run(self, args: list, env: Optional[Dict[str, str]] = None, input: Optional[str] = None) -> bool:
+        import subprocess
+        with self._process_lock:
+            self._stopped.clear()
+            try:
+                self._process = subprocess.Popen(
+                    args, stdin=subprocess.PIPE if input is not None else None,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env
+                )
+            except OSError:
+                return False
+            process = self._process
+        if input is not None:
+            # The process exits once it has spoken everything up to EOF.
+            try:
+                process.stdin.write(input.encode("utf-8"))
+                process.stdin.close()
+            except OSError:
+                pass
+        returncode = process.wait()
+        with self._process_lock:
+            self._process = None
+        return returncode == 0 and not self._stopped.is_set()
+
+    def stop(self) -> None:
+        if self._espeak is not None:
+            self._espeak.stop()
+        with self._process_lock:
+            self._stopped.set()
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+
+    def is_available(self) -> bool:
+        return self._available
+
+    def cache_key(self) -> Optional[Tuple]:
+        return (self._binary or self._system, self.voice, self.rate)
+
+    def render(self, text: str, path: str) -> bool:
         if not self._available:
             return False
         import subprocess
         try:
-            text = text.replace('"', '\\"').replace("'", "\\'")
+            if self._system == "linux":
+                result = subprocess.run([self._binary, "--stdout"] + self._voice_args(),
+                                        input=text.encode("utf-8"), check=True, capture_output=True)
+                return _rewrap_wav(result.stdout, path)
             if self._system == "darwin":
-                subprocess.run(["say", text], check=True)
-            elif self._system == "linux":
-                try:
-                    subprocess.run(["espeak", text], check=True, capture_output=True)
-                except FileNotFoundError:
-                    subprocess.run(["espeak-ng", text], check=True, capture_output=True)
+                subprocess.run(["say", "-o", path, "--file-format=WAVE", "--data-format=LEI16@22050"]
+                               + self._voice_args() + [text], check=True, capture_output=True)
             elif self._system == "windows":
-                ps_script = f'Add-Type -AssemblyName System.Speech; $synth = New-Object System.Speech.Synthesis.SpeechSynthesizer; $synth.Speak("{text}")'
-                subprocess.run(["powershell", "-Command", ps_script], check=True, capture_output=True)
-            return True
+                ps_script = ('Add-Type -AssemblyName System.Speech; $synth = New-Object System.Speech.Synthesis.SpeechSynthesizer; '
+                             '$synth.SetOutputToWaveFile($env:TTS_RENDER_PATH); $synth.Speak($env:TTS_RENDER_TEXT); $synth.Dispose()')
+                env = dict(os.environ, TTS_RENDER_PATH=path, TTS_RENDER_TEXT=text)
+                subprocess.run(["powershell", "-NoProfile", "-Command", ps_script],
+                               check=True, capture_output=True, env=env)
+            return _is_wav(path)
         except Exception:
             return False
 
-    def stop(self) -> None:
-        pass
+    @property
+    def renders_concurrently(self) -> bool:
+        # Every render is its own process, independent of the speaking one.
+        return True
 
-    def is_available(self) -> bool:
-        return self._available
+    def _voice_args(self) -> list:
+        if self._system == "darwin":
+            return ["-r", str(self.rate)] + (["-v", self.voice] if self.voice else [])
+        if self._system == "linux":
+            return ["-s", str(self.rate)] + (["-v", self.voice] if self.voice else [])
+        return []
 
 
 class TextToSpeech:
-    def __init__(self, engine: TTSEngine = TTSEngine.PYTTSX3):
+    """Speaks queued text a chunk at a time, playing cached renders when it can."""
+
+    def __init__(self, engine: TTSEngine = TTSEngine.PYTTSX3, cache: Optional[PhraseCache] = None):
         self._engine_type = engine
         self._engine: Optional[BaseTTS] = None
-        self._speech_queue: queue.Queue = queue.Queue()
+        self._speech_queue = SpeechQueue()
+        self._current: Optional[Utterance] = None
+        self._current_lock = threading.RLock()
         self._worker_thread: Optional[threading.Thread] = None
         self._running = False
         self._enabled = True
+        self._player = WavPlayer()
+        self._cache = cache if cache is not None else self._create_cache()
+        self._renderer: Optional[ThreadPoolExecutor] = None
+        self._renders: Dict[str, Future] = {}
+        self._render_lock = threading.Lock()
+        self._deferred: List[Tuple[str, str]] = []
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._deferred_renders: List[Future] = []
+        self._generation = 0
+        self._wake = threading.Event()
         self._init_engine(engine)
 
+    def _create_cache(self) -> Optional[PhraseCache]:
+        speech = config_manager.config.speech
+        if not speech.cache or not self._player.is_available():
+            return None
+        return PhraseCache(config_manager.config.config_dir / "tts-cache", speech.cache_mb * 1024 * 1024)
+
     def _init_engine(self, engine: TTSEngine):
         if engine == TTSEngine.DISABLED:
             self._engine = None
             return
 
+        speech = config_manager.config.speech
         if engine == TTSEngine.PYTTSX3:
-            self._engine = Pyttsx3TTS()
+            self._engine = Pyttsx3TTS(speech.rate, speech.voice)
             if not self._engine.is_available():
-                self._engine = SystemTTS()
+                self._engine = SystemTTS(speech.rate, speech.voice)
         elif engine == TTSEngine.SYSTEM:
-            self._engine = SystemTTS()
+            self._engine = SystemTTS(speech.rate, speech.voice)
 
         if self._engine and not self._engine.is_available():
             self._engine = None
@@ -150,45 +355,214 @@ class TextToSpeech:
         if self._running:
             return
         self._running = True
+        self._speech_queue.reopen()
         self._worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self._worker_thread.start()
 
     def stop(self):
         self._running = False
-        self._speech_queue.put(None)
-        if self._engine:
-            self._engine.stop()
+        for utterance in self._speech_queue.close():
+            utterance.finish(False)
+        self._cancel()
+        with self._render_lock:
+            if self._renderer is not None:
+                self._renderer.shutdown(wait=False, cancel_futures=True)
+                self._renderer = None
+
+    def _cancel(self):
+        """Cut off the chunk being spoken and drop the ones after it."""
+        # Under the worker's start lock, so the stop can't hit the next utterance.
+        with self._current_lock:
+            self._generation += 1
+            self._wake.set()
+            self._player.stop()
+            if self._engine:
+                self._engine.stop()
+        with self._render_lock:
+            for future in list(self._renders.values()):
+                future.cancel()
 
     def _process_queue(self):
         while self._running:
+            utterance = self._speech_queue.get()
+            if utterance is None:
+                break
+            with self._current_lock:
+                self._current = utterance
+                generation = self._generation
+            spoken = False
             try:
-                text = self._speech_queue.get(timeout=0.5)
-                if text is None:
-                    break
                 if self._enabled and self._engine:
-                    self._engine.speak(text)
-            except queue.Empty:
-                continue
+                    spoken = self._say(utterance.text, generation)
             except Exception:
-                continue
+                pass
+            finally:
+                with self._current_lock:
+                    self._current = None
+                utterance.finish(spoken)
+            if not len(self._speech_queue):
+                self._run_deferred()
+
+    def _say(self, text: str, generation: Optional[int] = None) -> bool:
+        if generation is None:
+            generation = self._generation
+        self._drop_deferred()
+        chunks = split_for_speech(text)
+        keys = [self._phrase_key(chunk) for chunk in chunks]
+        concurrent = self._engine.renders_concurrently
+        deferred = []
+        for i, (chunk, key) in enumerate(zip(chunks, keys)):
+            if self._generation != generation:
+                return False
+            path = None
+            pending = None
+            if key is not None:
+                pending = self._renders.get(key)
+                path = self._cache.get(key)
+                if path is None and concurrent:
+                    # Synthesize once, into the cache, and play that.
+                    pending = pending or self._render_async(key, chunk)
+            # Double buffering: the next chunk renders while this one plays.
+            # pyttsx3 renders and speaks on one driver, so there the render
+            # would run first and delay this chunk; only prefetch behind
+            # cached audio, and only phrases that have come up before.
+            next_key = keys[i + 1] if i + 1 < len(chunks) else None
+            if next_key is not None and next_key not in self._cache and (
+                    concurrent or (path is not None and next_key in self._seen)):
+                self._render_async(next_key, chunks[i + 1])
+            if path is None and pending is not None:
+                path = self._wait(pending, generation)
+                if self._generation != generation:
+                    return False
+            if path is not None:
+                if self._player.play(str(path)):
+                    continue
+                if self._player.stopped:
+                    return False
+            if not self._engine.speak(chunk):
+                return False
+            if key is not None and not concurrent and self._seen_before(key):
+                # A repeat: cache it for next time once nothing is waiting to be said.
+                deferred.append((key, chunk))
+        self._deferred = deferred
+        return True
+
+    def _seen_before(self, key: str) -> bool:
+        """Whether ``key`` was spoken live before, remembering it if not, so
+        one-off text is never rendered a second time just to be cached."""
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > SEEN_PHRASES:
+            self._seen.popitem(last=False)
+        return False
 
-    def speak(self, text: str):
+    def _run_deferred(self):
+        """Render the last response's uncached chunks while the queue is idle."""
+        deferred, self._deferred = self._deferred, []
+        for key, chunk in deferred:
+            future = self._render_async(key, chunk, idle_only=True)
+            if future is not None:
+                self._deferred_renders.append(future)
+
+    def _drop_deferred(self):
+        """Forget renders kept for idle time; they would hold the driver the
+        next response needs."""
+        self._deferred = []
+        renders, self._deferred_renders = self._deferred_renders, []
+        for future in renders:
+            future.cancel()
+
+    def _wait(self, future: Future, generation: int) -> Optional[Path]:
+        """Wait for a render, returning early if speech is cancelled."""
+        self._wake.clear()
+        future.add_done_callback(lambda _: self._wake.set())
+        if self._generation == generation:
+            self._wake.wait()
+        if not future.done() or future.cancelled():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def _phrase_key(self, text: str) -> Optional[str]:
+        if self._cache is None or self._engine is None:
+            return None
+        parts = self._engine.cache_key()
+        return phrase_key(parts, text) if parts is not None else None
+
+    def _render_async(self, key: str, text: str, idle_only: bool = False) -> Optional[Future]:
+        engine = self._engine
+
+        def render(path: str) -> bool:
+            # A render that would start with speech waiting is skipped.
+            if idle_only and self.is_speaking():
+                return False
+            return engine.render(text, path)
+
+        with self._render_lock:
+            if key in self._renders:
+                return self._renders[key]
+            if self._renderer is None:
+                self._renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-render")
+            future = self._renderer.submit(self._cache.add, key, render)
+            self._renders[key] = future
+        future.add_done_callback(lambda _: self._renders.pop(key, None))
+        return future
+
+    def speak(self, text: str, priority: SpeechPriority = SpeechPriority.NORMAL,
+              kind: Optional[str] = None) -> Optional[Utterance]:
+        """Queue ``text``. A queued utterance of the same ``kind`` is dropped,
+        and one being spoken is cut off if this supersedes it."""
         if not text or not self._enabled:
-            return
-        self._speech_queue.put(text)
-
-    def speak_sync(self, text: str) -> bool:
+            return None
+        utterance = Utterance(text, priority, kind)
+        self._drop_deferred()
+        for dropped in self._speech_queue.put(utterance):
+            dropped.finish(False)
+        with self._current_lock:
+            current = self._current
+            if current is not None and current is not utterance and utterance.supersedes(current):
+                self._cancel()
+        return utterance
+
+    def speak_sync(self, text: str, priority: SpeechPriority = SpeechPriority.NORMAL,
+                   kind: Optional[str] = None) -> bool:
+        """Speak ``text`` and wait for it; False if it was superseded,
+        interrupted or could not be spoken."""
         if not text or not self._enabled or not self._engine:
             return False
-        return self._engine.speak(text)
+        if not self._running:
+            spoken = self._say(text)
+            self._run_deferred()
+            return spoken
+        utterance = self.speak(text, priority, kind)
+        utterance.done.wait()
+        return utterance.spoken
+
+    def interrupt(self) -> bool:
+        """Barge-in: stop speaking at once and forget everything queued.
+        Returns whether anything was cut off."""
+        dropped = self._speech_queue.clear()
+        for utterance in dropped:
+            utterance.finish(False)
+        with self._current_lock:
+            speaking = self._current is not None
+            if speaking:
+                self._cancel()
+        return speaking or bool(dropped)
+
+    def is_speaking(self) -> bool:
+        return self._current is not None or len(self._speech_queue) > 0
 
     def enable(self):
         self._enabled = True
 
     def disable(self):
         self._enabled = False
-        if self._engine:
-            self._engine.stop()
+        self._cancel()
 
     def is_enabled(self) -> bool:
         return self._enabled
@@ -196,9 +570,15 @@ class TextToSpeech:
     def is_available(self) -> bool:
         return self._engine is not None and self._engine.is_available()
 
+    def get_status(self) -> Dict[str, str]:
+        if self._cache is None:
+            return {}
+        lookups = self._cache.hits + self._cache.misses
+        hit_rate = f", {self._cache.hits / lookups:.0%} hits" if lookups else ""
+        return {
+            "Speech Cache": f"{len(self._cache)} phrases, {self._cache.total_bytes / 1e6:.1f} MB{hit_rate}",
+        }
+
     def clear_queue(self):
-        while not self._speech_queue.empty():
-            try:
-                self._speech_queue.get_nowait()
-            except queue.Empty:
-                break
+        for utterance in self._speech_queue.clear():
+            utterance.finish(False)
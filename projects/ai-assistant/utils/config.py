@@ -1,11 +1,14 @@
 import json
+import logging
 import os
 import time
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import Dict, Optional
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
 
 class PermissionTier(Enum):
     SAFE = "safe"
@@ -27,6 +30,66 @@ class SafetyConfig:
     max_commands_per_minute: int = 30
 
 
+@dataclass
+class CaptureConfig:
+    screenshot_format: str = "png"
+    recording_format: str = "png"
+    recording_memory_mb: int = 256
+    recording_fps: float = 5.0
+    default_interval_seconds: float = 5.0
+    default_duration_seconds: float = 60.0
+    max_duration_seconds: float = 3600.0
+
+
+@dataclass
+class AudioConfig:
+    source: str = "mic"
+    input_device: str = ""
+    sample_rate: int = 16000
+    device_rate: int = 0
+    agc: bool = False
+    noise_suppression: bool = False
+    noise_profiles: bool = True
+    chunk_ms: int = 20
+    buffer_seconds: float = 10.0
+    preroll_ms: int = 300
+    early_commit_ms: int = 200
+    max_phrase_seconds: float = 10.0
+    vad_frame_ms: int = 20
+    vad_hangover_ms: int = 300
+    vad_margin_db: float = 9.0
+    vosk_grammar: bool = True
+    engine_max_rtf: float = 0.5
+    network_stt: bool = False
+    network_timeout: float = 3.0
+
+
+@dataclass
+class SpeechConfig:
+    rate: int = 175
+    voice: str = ""
+    cache: bool = True
+    cache_mb: int = 50
+
+
+DEFAULT_EXCLUDE = [
+    "node_modules", "__pycache__", "site-packages", "venv", ".venv",
+    "build", "dist", "target", "Trash",
+]
+
+
+@dataclass
+class FileIndexConfig:
+    enabled: bool = True
+    roots: List[str] = field(default_factory=lambda: ["~"])
+    exclude: List[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDE))
+    include_hidden: bool = False
+    max_entries: int = 2_000_000
+    max_watches: int = 65536
+    rescan_hours: float = 24.0
+    crawl_threads: int = 8
+
+
 @dataclass
 class AppConfig:
     app_name: str = "AI Assistant"
@@ -34,6 +97,10 @@ class AppConfig:
     config_dir: Path = field(default_factory=lambda: Path.home() / ".ai-assistant")
     log_level: str = "INFO"
     safety: SafetyConfig = field(default_factory=SafetyConfig)
+    capture: CaptureConfig = field(default_factory=CaptureConfig)
+    file_index: FileIndexConfig = field(default_factory=FileIndexConfig)
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    speech: SpeechConfig = field(default_factory=SpeechConfig)
 
 
 class ConfigManager:
@@ -53,12 +120,32 @@ class ConfigManager:
             try:
                 with open(self.config_path, "r") as f:
                     data = json.load(f)
-                    if "safety" in data:
-                        self.config.safety = SafetyConfig(**data["safety"])
-                    if "log_level" in data:
-                        self.config.log_level = data["log_level"]
             except (json.JSONDecodeError, IOError):
-                pass
+                return
+            sections = {
+                "safety": SafetyConfig,
+                "capture": CaptureConfig,
+                "file_index": FileIndexConfig,
+                "audio": AudioConfig,
+                "speech": SpeechConfig,
+            }
+            for name, cls in sections.items():
+                if isinstance(data.get(name), dict):
+                    setattr(self.config, name, self._load_section(name, cls, data[name]))
+            if "log_level" in data:
+                self.config.log_level = data["log_level"]
+
+    def _load_section(self, name: str, cls, values: dict):
+        known = {f.name for f in fields(cls)}
+        ignored = sorted(set(values) - known)
+        if ignored:
+            logger.warning("Ignoring unknown %s settings in %s: %s",
+                           name, self.config_path, ", ".join(ignored))
+        try:
+            return cls(**{k: v for k, v in values.items() if k in known})
+        except TypeError as e:
+            logger.warning("Ignoring %s settings in %s: %s", name, self.config_path, e)
+            return cls()
 
     def save_config(self):
         data = {
@@ -68,7 +155,11 @@ class ConfigManager:
                 "cooldown_seconds": self.config.safety.cooldown_seconds,
                 "safe_mode": self.config.safety.safe_mode,
                 "max_commands_per_minute": self.config.safety.max_commands_per_minute,
-            }
+            },
+            "capture": asdict(self.config.capture),
+            "file_index": asdict(self.config.file_index),
+            "audio": asdict(self.config.audio),
+            "speech": asdict(self.config.speech),
         }
         with open(self.config_path, "w") as f:
             json.dump(data, f, indent=2)
@@ -113,7 +204,7 @@ class ConfigManager:
 
     def get_permission_tier(self, action: str) -> PermissionTier:
         critical_actions = {"shutdown", "restart", "delete_file", "empty_trash"}
-        restricted_actions = {"adjust_volume", "take_screenshot", "open_app"}
+        restricted_actions = {"adjust_volume", "take_screenshot", "record_screen", "open_app"}
         
         if action in critical_actions:
             return PermissionTier.CRITICAL